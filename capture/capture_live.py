@@ -7,9 +7,18 @@ If you cannot run live capture, use capture_from_pcap.py to parse pcap files.
 import argparse
 import csv
 import os
-from scapy.all import sniff
+import sys
+from scapy.sendrecv import sniff
+from scapy.layers.inet import IP  # noqa: F401  (registers IP/TCP/UDP/ICMP dissectors)
 import time
 
+# Ensure project root on PYTHONPATH (script may be run directly)
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from capture.capture_utils import DEFAULT_BPF, resolve_bpf, flow_sampled, add_capture_args
+
 OUT_DIR = "capture"
 
 def ensure_dir():
@@ -26,12 +35,16 @@ def packet_to_row(pkt):
     length = len(pkt)
     return [ts, src, dst, sport, dport, proto, length]
 
-def capture_to_csv(interface=None, timeout=None, count=None):
+def capture_to_csv(interface=None, timeout=None, count=None, bpf=DEFAULT_BPF, sample_n=1):
     ensure_dir()
     rows = []
     def cb(pkt):
-        rows.append(packet_to_row(pkt))
-    sniff(iface=interface, prn=cb, timeout=timeout, count=count)
+        row = packet_to_row(pkt)
+        # flow key matches preprocess/flow_splitter.py (src_dst_proto)
+        if flow_sampled(f"{row[1]}_{row[2]}_{row[5]}", sample_n):
+            rows.append(row)
+    sniff(iface=interface, prn=cb, timeout=timeout, count=count,
+          filter=resolve_bpf(bpf), store=False)
     out = os.path.join(OUT_DIR, f"capture_{int(time.time())}.csv")
     with open(out, "w", newline="") as f:
         w = csv.writer(f)
@@ -42,9 +55,10 @@ def capture_to_csv(interface=None, timeout=None, count=None):
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
-    parser.add_argument("--iface", help="capture interface (optional)")
+    add_capture_args(parser)
     parser.add_argument("--timeout", type=int, help="capture timeout (seconds)", default=10)
     parser.add_argument("--count", type=int, help="max packet count", default=None)
     args = parser.parse_args()
     print("WARNING: live capture may require admin privileges. Run in lab only.")
-    capture_to_csv(interface=args.iface, timeout=args.timeout, count=args.count)
+    capture_to_csv(interface=args.iface, timeout=args.timeout, count=args.count,
+                   bpf=args.bpf, sample_n=args.sample)
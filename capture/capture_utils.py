@@ -0,0 +1,98 @@
+# capture/capture_utils.py
+"""
+Capture-side helpers shared by the live tools:
+- BPF filter expressions (applied in the kernel by sniff)
+- Deterministic flow-hash sampling (analyse 1/N flows)
+- Capture timestamps in integer nanoseconds
+"""
+
+import time
+import zlib
+from decimal import Decimal
+
+import numpy as np
+
+# Only IP traffic of protocols we actually score reaches Python
+DEFAULT_BPF = "ip and (tcp or udp or icmp)"
+
+# ---------------- BPF FILTERS ----------------
+def resolve_bpf(expr):
+    """
+    Normalize a user supplied BPF expression.
+    Empty string / "none" disables kernel filtering.
+    """
+    if expr is None:
+        return None
+    expr = expr.strip()
+    if not expr or expr.lower() == "none":
+        return None
+    return expr
+
+# ---------------- FLOW SAMPLING ----------------
+def flow_hash(flow):
+    """
+    Stable 32-bit hash of a flow key.
+    (Python's hash() is salted per process, so it cannot be used here.)
+    """
+    return zlib.crc32(flow.encode("utf-8"))
+
+def flow_sampled(flow, sample_n=1):
+    """
+    Deterministic 1/N flow sampling: the same flow is always kept
+    (or always dropped) across packets, restarts and machines.
+    """
+    if sample_n <= 1:
+        return True
+    return flow_hash(flow) % sample_n == 0
+
+def sample_rate(sample_n=1):
+    """Fraction of flows analysed for a 1/N sampling setting."""
+    return 1.0 / max(1, sample_n)
+
+# ---------------- TIMESTAMPS ----------------
+NS_PER_S = 1_000_000_000
+
+def packet_time_ns(pkt):
+    """
+    Capture timestamp of a packet in integer nanoseconds.
+
+    Uses the time stamped by the capture source (pkt.time), never the
+    callback wall clock, so queueing delay in Python does not leak into IPDs.
+    Nanosecond pcaps give scapy an EDecimal, which is converted exactly;
+    float timestamps keep whatever resolution the source provided.
+    """
+    t = getattr(pkt, "time", None)
+    if t is None:
+        return time.time_ns()
+    if isinstance(t, Decimal):
+        return int(t * NS_PER_S)
+    return int(round(float(t) * NS_PER_S))
+
+def ns_to_s(ts_ns):
+    """Integer nanoseconds → float seconds (for CSV / display)."""
+    return ts_ns / NS_PER_S
+
+def ipds_from_ns(times_ns):
+    """
+    IPDs in seconds from a sequence of integer-ns timestamps.
+    Differences are taken in int64, before the float conversion,
+    so no precision is lost on large epoch values.
+    """
+    return np.diff(np.asarray(times_ns, dtype=np.int64)) / NS_PER_S
+
+# ---------------- CLI HELPERS ----------------
+def add_capture_args(parser, default_bpf=DEFAULT_BPF):
+    """Register --iface / --bpf / --sample on an argparse parser."""
+    parser.add_argument("--iface", default=None, help="capture interface (optional)")
+    parser.add_argument(
+        "--bpf",
+        default=default_bpf,
+        help=f"kernel BPF filter expression ('' or 'none' disables, default: {default_bpf!r})"
+    )
+    parser.add_argument(
+        "--sample",
+        type=int,
+        default=1,
+        help="analyse 1/N flows using a deterministic flow hash (default: 1 = all flows)"
+    )
+    return parser
@@ -1,15 +1,30 @@
+import os
+import sys
+import time
 import streamlit as st
 import pandas as pd
 import plotly.express as px
 from datetime import datetime
 
+# ---------------- PROJECT ROOT ----------------
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from storage.alert_store import DB_PATH, AlertStore
+from dashboard.downsample import CHART_WIDTH_PX, point_budget, downsample_frame
+from dashboard.live_feed import FEED_URL, FeedSubscriber
+
 # ---------------- CONFIG ----------------
 st.set_page_config(
     page_title="Covert Timing Channel IDS",
     layout="wide",
 )
 
-ALERT_LOG = "live/alerts.csv"
+# Alerts are read from the detector's store with indexed, filtered queries;
+# only the rows on screen are loaded
+ALERT_STORE = DB_PATH
+TIMELINE_ROWS = 500_000     # read from the store, then min/max-downsampled to the chart width
 
 # ---------------- STYLES ----------------
 st.markdown("""
@@ -29,18 +44,10 @@ body { background-color: #0e1117; }
 """, unsafe_allow_html=True)
 
 # ---------------- HELPERS ----------------
-def load_alerts(path):
-    if not st.session_state.get("alerts_cache"):
-        try:
-            df = pd.read_csv(
-                path,
-                on_bad_lines="skip",
-                engine="python"
-            )
-            st.session_state.alerts_cache = df
-        except:
-            return pd.DataFrame()
-    return st.session_state.alerts_cache.copy()
+def open_store(path):
+    if not os.path.exists(path):
+        return None
+    return AlertStore(path, readonly=True)
 
 def severity_label(risk):
     if risk >= 70:
@@ -61,22 +68,60 @@ def sev_badge(sev):
 def proto_badge(p):
     return f"<span class='badge-proto'>{p}</span>"
 
+def add_columns(df):
+    df["time"] = df["timestamp"].apply(
+        lambda x: datetime.fromtimestamp(x).strftime("%H:%M:%S")
+    )
+    df["Severity"] = df["final_risk"].apply(severity_label)
+    return df
+
+@st.cache_resource
+def feed_subscriber(url):
+    """One SSE subscription per dashboard server, shared by all sessions."""
+    return FeedSubscriber(url).start()
+
+# ---------------- LIVE FEED ----------------
+# Pushed by the detector (live/alert_feed.py); redrawn every second from the
+# subscriber's in-memory window, no file or store reads
+st.markdown("## 🛡️ Covert Timing Channel IDS — Real-Time SOC Dashboard")
+feed = feed_subscriber(FEED_URL)
+
+@st.fragment(run_every=1.0)
+def live_panel():
+    st.markdown("### 📡 Live Feed")
+    alerts, incidents, risk = feed.snapshot()
+    if not feed.connected:
+        st.caption(f"Detector feed not connected ({FEED_URL}); showing stored history only.")
+    c1, c2 = st.columns([3, 2])
+    with c1:
+        if alerts:
+            live = add_columns(pd.DataFrame(alerts[-15:][::-1]))
+            st.dataframe(live[["time", "flow", "protocol", "final_risk", "Severity"]],
+                         hide_index=True, use_container_width=True)
+        open_now = [i for i in incidents if i["state"] in ("open", "update")]
+        st.caption(f"{len(alerts)} alerts in the live window, {len(open_now)} open incidents")
+    with c2:
+        if risk:
+            now = time.time()
+            flows = pd.DataFrame(
+                [(f, r, now - t) for f, (r, t) in risk.items()],
+                columns=["flow", "risk", "age_s"],
+            ).sort_values("risk", ascending=False)
+            st.dataframe(flows.head(10).round(1), hide_index=True, use_container_width=True)
+
+live_panel()
+
 # ---------------- LOAD DATA ----------------
-alerts = load_alerts(ALERT_LOG)
-if alerts.empty:
+t_load = time.perf_counter()
+store = open_store(ALERT_STORE)
+protocols = store.alert_protocols() if store else []
+if not protocols:
     st.warning("No alerts available yet. Start realtime detector.")
     st.stop()
 
-alerts["time"] = alerts["timestamp"].apply(
-    lambda x: datetime.fromtimestamp(x).strftime("%H:%M:%S")
-)
-alerts["Severity"] = alerts["final_risk"].apply(severity_label)
-alerts["protocol"] = alerts["flow"].apply(lambda x: x.split("_")[-1])
-
 # ---------------- SIDEBAR FILTERS ----------------
 st.sidebar.header("🔎 Filters")
 
-protocols = sorted(alerts["protocol"].unique())
 proto_filter = st.sidebar.multiselect(
     "Protocol",
     protocols,
@@ -88,43 +133,56 @@ risk_range = st.sidebar.slider(
     0, 100, (60, 100)
 )
 
+chart_width = st.sidebar.number_input("Chart width (px)", 300, 4000, CHART_WIDTH_PX, step=100)
+budget = point_budget(chart_width)
+
 # ---------------- FILTER ----------------
-filtered = alerts[
-    (alerts["protocol"].isin(proto_filter)) &
-    (alerts["final_risk"].between(*risk_range))
-]
+filters = {
+    "protocols": proto_filter,
+    "min_risk": risk_range[0],
+    "max_risk": risk_range[1],
+}
+summary = store.alert_summary(**filters)
 
-# ---------------- HEADER ----------------
-st.markdown("## 🛡️ Covert Timing Channel IDS — Real-Time SOC Dashboard")
+# ---------------- HISTORY (alert store) ----------------
+st.markdown("### 🗄️ History")
 
 col1, col2, col3, col4 = st.columns(4)
 
 with col1:
-    st.metric("Total Alerts", len(filtered))
+    st.metric("Total Alerts", summary["count"])
 with col2:
-    st.metric("High Risk", (filtered["Severity"]=="High").sum())
+    st.metric("High Risk", summary["high"])
 with col3:
-    st.metric("Medium Risk", (filtered["Severity"]=="Medium").sum())
+    st.metric("Medium Risk", summary["medium"])
 with col4:
-    st.metric("Low Risk", (filtered["Severity"]=="Low").sum())
+    st.metric("Low Risk", summary["low"])
 
 st.markdown("---")
 
+if summary["count"] == 0:
+    st.info("No alerts match the filters.")
+    st.stop()
+
 # ---------------- TIMELINE REPLAY ----------------
 st.markdown("### ⏱️ Attack Timeline Replay")
 
-min_t = filtered["timestamp"].min()
-max_t = filtered["timestamp"].max()
+min_t = summary["first_ts"]
+max_t = summary["last_ts"]
 
 replay_t = st.slider(
     "Replay alerts up to time",
     min_value=float(min_t),
-    max_value=float(max_t),
-    value=float(max_t),
+    max_value=float(max_t) + 1.0,
+    value=float(max_t) + 1.0,
     step=1.0
 )
+filters["end"] = replay_t
 
-timeline = filtered[filtered["timestamp"] <= replay_t]
+series = store.alert_series(limit=TIMELINE_ROWS, **filters)
+series["time"] = pd.to_datetime(series["timestamp"], unit="s")
+# min/max per bucket keeps every risk spike visible
+timeline = downsample_frame(series, "timestamp", "final_risk", budget, method="minmax")
 
 fig = px.line(
     timeline,
@@ -134,6 +192,8 @@ fig = px.line(
 )
 fig.update_layout(height=300)
 st.plotly_chart(fig, use_container_width=True)
+st.caption(f"{len(timeline):,} of {len(series):,} alerts plotted"
+           + (f" (latest {TIMELINE_ROWS:,})" if len(series) == TIMELINE_ROWS else ""))
 
 # ---------------- LIVE ALERTS ----------------
 st.markdown("### 🚨 Live Alerts")
@@ -143,11 +203,11 @@ rows_to_show = st.selectbox(
     [5, 10, 15, 25, 50, 100],
     index=2
 )
+pages = max(1, -(-store.alert_summary(**filters)["count"] // rows_to_show))
+page = st.number_input("Page", min_value=1, max_value=pages, value=1)
 
-latest = (
-    timeline
-    .sort_values("timestamp", ascending=False)
-    .head(rows_to_show)
+latest = add_columns(
+    store.query_alerts(limit=rows_to_show, offset=(page - 1) * rows_to_show, **filters)
 )
 
 latest["Severity"] = latest["Severity"].apply(sev_badge)
@@ -161,16 +221,25 @@ st.write(
     unsafe_allow_html=True
 )
 
+# ---------------- INCIDENTS ----------------
+st.markdown("### 🧩 Incidents")
+
+incidents = store.query_incidents(limit=rows_to_show, min_risk=risk_range[0])
+if incidents.empty:
+    st.info("No incidents yet.")
+else:
+    for c in ("first_ts", "last_ts"):
+        incidents[c] = incidents[c].apply(
+            lambda x: datetime.fromtimestamp(x).strftime("%H:%M:%S")
+        )
+    st.dataframe(incidents)
+
 # ---------------- TOP FLOWS ----------------
 st.markdown("### 🔥 Top Suspicious Flows")
 
-top_flows = (
-    timeline.groupby("flow")["final_risk"]
-    .mean()
-    .reset_index()
-    .sort_values("final_risk", ascending=False)
-    .head(5)
-)
+top_flows = store.top_flows(5, **filters)
+store.close()
+st.sidebar.caption(f"Store queries: {(time.perf_counter() - t_load) * 1e3:.0f} ms")
 
 st.dataframe(top_flows)
 
@@ -1,12 +1,22 @@
 # dashboard/app_alerts.py
 """
 SOC-style IDS Alerts Dashboard
-Reads fusion_output/final_risk_report.csv
+Reads the latest risk-engine run from the alert store (storage/alert_store.py)
 """
 
+import os
+import sys
+import time
 import streamlit as st
 import pandas as pd
-import os
+import plotly.express as px
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from storage.alert_store import DB_PATH, AlertStore
+from dashboard.downsample import CHART_WIDTH_PX, point_budget, downsample_frame
 
 st.set_page_config(
     page_title="Covert Channel IDS Alerts",
@@ -15,13 +25,25 @@ st.set_page_config(
 
 st.title("🚨 Covert Timing Channel — IDS Alerts")
 
-DATA_PATH = "fusion_output/final_risk_report.csv"
+STORE_PATH = DB_PATH
+TABLE_COLUMNS = [
+    "flow",
+    "window_start",
+    "window_end",
+    "ml_prob",
+    "suspicion_score",
+    "final_risk",
+    "decision",
+    "explanation",
+]
 
-if not os.path.exists(DATA_PATH):
+t_load = time.perf_counter()
+store = AlertStore(STORE_PATH, readonly=True) if os.path.exists(STORE_PATH) else None
+if store is None or store.latest_run() is None:
     st.error("❌ No fused risk report found. Run fusion/risk_engine.py first.")
     st.stop()
 
-df = pd.read_csv(DATA_PATH)
+counts = store.decision_counts()
 
 # -------------------------------------------------
 # Sidebar filters
@@ -35,34 +57,56 @@ risk_range = st.sidebar.slider(
 
 decision_filter = st.sidebar.multiselect(
     "Decision",
-    options=df["decision"].unique().tolist(),
-    default=df["decision"].unique().tolist()
+    options=list(counts),
+    default=list(counts)
 )
 
-df_filt = df[
-    (df["final_risk"] >= risk_range[0]) &
-    (df["final_risk"] <= risk_range[1]) &
-    (df["decision"].isin(decision_filter))
-]
+chart_width = st.sidebar.number_input("Chart width (px)", 300, 4000, CHART_WIDTH_PX, step=100)
+
+filters = {
+    "min_risk": risk_range[0],
+    "max_risk": risk_range[1],
+    "decisions": decision_filter,
+}
 
 # -------------------------------------------------
 # Summary metrics
 # -------------------------------------------------
 c1, c2, c3, c4 = st.columns(4)
 
-c1.metric("Total Windows", len(df))
-c2.metric("🟢 Normal", (df["decision"] == "Normal").sum())
-c3.metric("🟡 Suspicious", (df["decision"] == "Suspicious").sum())
-c4.metric("🔴 Likely Covert", (df["decision"] == "Likely Covert").sum())
+c1.metric("Total Windows", sum(counts.values()))
+c2.metric("🟢 Normal", counts.get("Normal", 0))
+c3.metric("🟡 Suspicious", counts.get("Suspicious", 0))
+c4.metric("🔴 Likely Covert", counts.get("Likely Covert", 0))
 
 st.markdown("---")
 
+# -------------------------------------------------
+# Risk timeline (min/max-downsampled per flow to the chart width)
+# -------------------------------------------------
+st.subheader("Risk per Window")
+
+series = store.window_series(**filters)
+total = store.count_windows(**filters)
+if not series.empty:
+    per_flow = max(100, point_budget(chart_width) // series["flow"].nunique())
+    plotted = pd.concat(
+        [downsample_frame(g, "window_start", "final_risk", per_flow, method="minmax")
+         for _, g in series.groupby("flow", sort=False)],
+        ignore_index=True,
+    )
+    fig = px.line(plotted, x="window_start", y="final_risk", color="flow")
+    fig.update_layout(height=300, margin=dict(l=10, r=10, t=10, b=10))
+    st.plotly_chart(fig, use_container_width=True)
+    note = "" if len(series) == total else f"; long flows thinned to {len(series):,} rows by the store"
+    st.caption(f"{len(plotted):,} of {total:,} windows plotted{note}")
+
 # -------------------------------------------------
 # Alert cards
 # -------------------------------------------------
 st.subheader("Active Alerts")
 
-alerts = df_filt.sort_values("final_risk", ascending=False)
+alerts = store.query_windows(limit=5, **filters)
 
 if alerts.empty:
     st.success("No alerts in selected range.")
@@ -97,18 +141,13 @@ else:
 # -------------------------------------------------
 st.subheader("Full Detection Report")
 
+page_size = st.selectbox("Rows per page", [50, 100, 500, 1000], index=1)
+pages = max(1, -(-total // page_size))
+page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1)
+
 st.dataframe(
-    df_filt[
-        [
-            "flow",
-            "window_start",
-            "window_end",
-            "ml_prob",
-            "suspicion_score",
-            "final_risk",
-            "decision",
-            "explanation",
-        ]
-    ].sort_values("final_risk", ascending=False),
+    store.query_windows(limit=page_size, offset=(page - 1) * page_size, **filters)[TABLE_COLUMNS],
     use_container_width=True,
 )
+store.close()
+st.sidebar.caption(f"Store queries: {(time.perf_counter() - t_load) * 1e3:.0f} ms")
@@ -2,6 +2,8 @@
 """
 Streamlit dashboard (SolarWinds-like) for visualizing flow traffic as stacked area,
 top conversations, and quick stats. Uses capture CSVs or preprocessed flow CSVs.
+Charts and tables are slices of pre-aggregated rollups (dashboard/rollups.py),
+updated incrementally as captures grow.
 Run:
     streamlit run dashboard/app_v2.py
 """
@@ -9,11 +11,22 @@ Run:
 import streamlit as st
 import pandas as pd
 import numpy as np
-import glob, os, math
+import os, sys, threading
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
 
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+# cached, incremental CSV loading shared by the dashboards
+from dashboard.data_access import (
+    CAPTURE_GLOB, FLOW_GLOB, load_captures, load_flows, readers, format_stats
+)
+from dashboard.rollups import RESOLUTIONS, RollupFeed, flow_column, window_rollup
+from dashboard.downsample import CHART_WIDTH_PX, point_budget, lttb
+
 st.set_page_config(layout="wide", page_title="CovertChannel — Traffic Dashboard")
 
 st.title("Covert Timing Channel — Traffic Summary (SolarWinds style)")
@@ -21,79 +34,29 @@ st.title("Covert Timing Channel — Traffic Summary (SolarWinds style)")
 # ------------------------
 # Helpers
 # ------------------------
-def load_capture_csvs(capture_glob="capture/*.csv"):
-    files = sorted(glob.glob(capture_glob))
-    if not files:
-        return None, []
-    dfs = []
-    for f in files:
-        try:
-            df = pd.read_csv(f)
-            df['source_file'] = os.path.basename(f)
-            dfs.append(df)
-        except Exception:
-            continue
-    if not dfs:
-        return None, files
-    df = pd.concat(dfs, ignore_index=True)
-    # ensure types
-    if 'ts' in df.columns:
-        df['ts'] = df['ts'].astype(float)
-    if 'length' in df.columns:
-        df['length'] = df['length'].astype(float)
-    return df, files
-
-def flows_from_preprocessed(flow_glob="preprocessed/flows/*.csv"):
-    files = sorted(glob.glob(flow_glob))
-    dfs = []
-    for f in files:
-        try:
-            df = pd.read_csv(f)
-            # ensure ts and length exist; if not, keep index as pseudo-ts
-            if 'ts' not in df.columns:
-                # create synthetic ts from ipd
-                if 'ipd' in df.columns:
-                    df['ts'] = df['ipd'].cumsum()
-                else:
-                    df['ts'] = np.arange(len(df)) * 0.001
-            if 'length' not in df.columns:
-                df['length'] = df.get('pkt_len', df.get('len', 64))
-            df['flow'] = os.path.basename(f).replace('.csv','')
-            dfs.append(df[['ts','flow','length','src','dst']])
-        except Exception:
-            continue
-    if not dfs:
-        return None, files
-    return pd.concat(dfs, ignore_index=True), files
-
-def prepare_time_series(df, time_col='ts', length_col='length', flow_col='flow',
-                        bin_s=1.0, start=None, end=None):
-    """Aggregate bytes per flow into time bins of bin_s seconds."""
-    # build time index (in seconds relative)
-    if start is None:
-        start = df[time_col].min()
-    if end is None:
-        end = df[time_col].max()
-    # create bins
-    n_bins = max(1, math.ceil((end - start) / bin_s))
-    bins = np.linspace(start, start + n_bins*bin_s, n_bins+1)
-    labels = [start + i*bin_s for i in range(n_bins)]
-    df['time_bin'] = pd.cut(df[time_col], bins=bins, labels=labels, include_lowest=True)
-    # sum bytes per bin-flow
-    agg = df.groupby(['time_bin', flow_col])[length_col].sum().reset_index()
-    # pivot to wide form
-    pivot = agg.pivot(index='time_bin', columns=flow_col, values=length_col).fillna(0)
-    # convert index to datetime for plotting convenience
-    pivot = pivot.reset_index()
-    pivot['time_dt'] = pd.to_datetime(pivot['time_bin'].astype(float), unit='s')
-    return pivot.sort_values('time_dt').reset_index(drop=True)
-
-def top_n_summary(df, flow_col='flow', length_col='length', n=5):
-    s = df.groupby(flow_col)[length_col].sum().sort_values(ascending=False)
-    top = s.head(n).reset_index().rename(columns={length_col:'bytes'})
-    total = s.sum()
-    top['percent'] = (top['bytes'] / total * 100).round(2)
-    return top, total
+MAX_MANUAL_BINS = 200_000
+
+def capture_flows(path, frame):
+    return flow_column(frame)
+
+def file_flows(path, frame):
+    name = os.path.basename(path).replace('.csv', '')
+    return pd.Categorical.from_codes(np.zeros(len(frame), dtype=np.int8), [name])
+
+@st.cache_resource
+def rollup_feed(pattern):
+    """One rollup set per data source, shared by every session of this server."""
+    flow_of = capture_flows if pattern == CAPTURE_GLOB else file_flows
+    return RollupFeed(flow_of), threading.Lock()
+
+def res_label(res):
+    if res < 1:
+        return f"{res * 1000:g} ms"
+    if res < 60:
+        return f"{res:g} s"
+    if res < 3600:
+        return f"{res / 60:g} min"
+    return f"{res / 3600:g} h"
 
 # ------------------------
 # Load data
@@ -102,54 +65,90 @@ st.sidebar.header("Data source")
 use_capture = st.sidebar.radio("Load data from", ("capture CSVs", "preprocessed flows (recommended)"))
 
 if use_capture == "capture CSVs":
-    df_capture, cap_files = load_capture_csvs()
-    if df_capture is None:
+    pattern = CAPTURE_GLOB
+    df_data, data_files, load_stats = load_captures()
+    if df_data is None:
         st.sidebar.error("No capture CSVs found in capture/*.csv")
         st.stop()
-    st.sidebar.write(f"Found {len(cap_files)} capture file(s)")
-    df_data = df_capture.copy()
-    # create a 'flow' column if not present
-    if 'flow' not in df_data.columns:
-        df_data['flow'] = df_data.apply(lambda r: f"{r.get('src','?')}_{r.get('dst','?')}_{r.get('proto','?')}", axis=1)
+    st.sidebar.write(f"Found {len(data_files)} capture file(s)")
 else:
-    df_data, flow_files = flows_from_preprocessed()
+    pattern = FLOW_GLOB
+    df_data, data_files, load_stats = load_flows()
     if df_data is None:
         st.sidebar.error("No preprocessed flows found in preprocessed/flows/*.csv")
         st.stop()
-    st.sidebar.write(f"Found {len(flow_files)} flow file(s)")
+    st.sidebar.write(f"Found {len(data_files)} flow file(s)")
+
+feed, feed_lock = rollup_feed(pattern)
+with feed_lock:
+    rows_added = feed.update(readers(pattern))
+    rollups = feed.rollups
+st.sidebar.caption("Load: " + format_stats(load_stats))
+st.sidebar.caption(f"Rollups: {rollups.packets_added:,} packets, {rows_added:,} added this run")
 
 # time range controls
-min_ts = float(df_data['ts'].min())
-max_ts = float(df_data['ts'].max())
+min_ts = rollups.t_min
+max_ts = rollups.t_max
 duration = max_ts - min_ts
 st.sidebar.markdown(f"**Time span:**** {duration:.2f} s**")
-bin_s = st.sidebar.slider("Bin size (seconds)", min_value=0.01, max_value=5.0, value=0.5, step=0.01)
 start_offset = st.sidebar.slider("Start offset (seconds from start)", 0.0, float(duration), 0.0, step=0.1)
 end_offset = st.sidebar.slider("End offset (seconds from start)", 0.0, float(duration), float(duration), step=0.1)
 start = min_ts + start_offset
 end = min_ts + end_offset
-top_n = st.sidebar.slider("Top N flows to show (stacked)", 1, 12, 6)
-
-# filter data by time window
-df_window = df_data[(df_data['ts'] >= start) & (df_data['ts'] <= end)].copy()
-if df_window.empty:
+if end <= start:
     st.error("No packets in selected time window. Adjust sliders.")
     st.stop()
 
-# compute summary & aggregated time series
-pivot = prepare_time_series(df_window, bin_s=bin_s, flow_col='flow')
-# compute total bytes per flow in the window
-flow_sums = df_window.groupby('flow')['length'].sum().sort_values(ascending=False)
+# the coarsest resolution that still gives enough bins for the range
+auto_res = rollups.pick(start, end)
+bin_choice = st.sidebar.select_slider(
+    "Bin size", options=["auto"] + RESOLUTIONS, value="auto",
+    format_func=lambda r: f"auto ({res_label(auto_res)})" if r == "auto" else res_label(r))
+bin_s = auto_res if bin_choice == "auto" else bin_choice
+if (end - start) / bin_s > MAX_MANUAL_BINS:
+    st.sidebar.warning(f"{res_label(bin_s)} bins over {end - start:.0f} s is too many; using {res_label(auto_res)}")
+    bin_s = auto_res
+top_n = st.sidebar.slider("Top N flows to show (stacked)", 1, 12, 6)
+chart_width = st.sidebar.number_input("Chart width (px)", 300, 4000, CHART_WIDTH_PX, step=100)
+
+# bytes / packets per (bin, flow) over the window: a slice of the rollup,
+# or binned from the raw packets when this resolution was too fine to keep
+series = rollups.series(start, end, bin_s)
+if series is not None:
+    times, bytes_bf, packets_bf = series
+    labels = rollups.labels
+else:
+    window = df_data[(df_data['ts'] >= start) & (df_data['ts'] <= end)]
+    flows = window['flow'] if 'flow' in window.columns else flow_column(window)
+    times, bytes_bf, packets_bf, labels = window_rollup(
+        window['ts'].to_numpy(), flows, window['length'].to_numpy(), start, end, bin_s)
+
+flow_sums = pd.Series(bytes_bf.sum(axis=0), index=labels, dtype=float)
+flow_sums = flow_sums[packets_bf.sum(axis=0) > 0].sort_values(ascending=False)
+if flow_sums.empty:
+    st.error("No packets in selected time window. Adjust sliders.")
+    st.stop()
 top_flows = list(flow_sums.head(top_n).index)
 
-# fill other flows into "Other"
-all_flow_cols = [c for c in pivot.columns if c not in ('time_bin','time_dt')]
-# ensure the top flows exist in pivot (if some flows absent, they'll be ignored)
-stack_cols = [c for c in all_flow_cols if c in top_flows]
-other_cols = [c for c in all_flow_cols if c not in stack_cols]
-if other_cols:
-    pivot['Other'] = pivot[other_cols].sum(axis=1)
-    stack_cols = stack_cols + (['Other'] if 'Other' not in stack_cols else [])
+# stacked columns: top flows + "Other"
+col_of = {f: i for i, f in enumerate(labels)}
+pivot = pd.DataFrame({'time_dt': pd.to_datetime(times, unit='s')})
+for f in top_flows:
+    pivot[f] = bytes_bf[:, col_of[f]]
+stack_cols = list(top_flows)
+total_per_bin = bytes_bf.sum(axis=1)
+if len(flow_sums) > len(top_flows):
+    pivot['Other'] = total_per_bin - pivot[top_flows].sum(axis=1).to_numpy()
+    stack_cols.append('Other')
+
+# more bins than pixels: keep the LTTB rows of the total, the same rows for
+# every stacked flow so the areas still stack
+n_bins = len(pivot)
+budget = point_budget(chart_width)
+if n_bins > budget:
+    keep = lttb(times, total_per_bin, budget)
+    pivot = pivot.iloc[keep].reset_index(drop=True)
+    total_per_bin = total_per_bin[keep]
 
 # ------------------------
 # Layout: main large area + scrubber + right summary
@@ -168,11 +167,12 @@ with col1:
                       margin=dict(l=10,r=10,t=10,b=10), showlegend=True)
     # Y-axis display in kbps-like: convert bytes per bin to kbps if desired
     st.plotly_chart(fig, use_container_width=True, height=420)
+    if n_bins > budget:
+        st.caption(f"{len(pivot):,} of {n_bins:,} bins plotted (LTTB, {budget} points)")
 
     # scrubber / mini chart (sparkline)
     st.subheader("Mini timeline (scrubber)")
-    mini = pivot.copy()
-    mini['total'] = mini[all_flow_cols].sum(axis=1) if all_flow_cols else mini[stack_cols].sum(axis=1)
+    mini = pd.DataFrame({'time_dt': pivot['time_dt'], 'total': total_per_bin})
     fig2 = go.Figure()
     fig2.add_trace(go.Scatter(x=mini['time_dt'], y=mini['total'], mode='lines', fill='tozeroy', name='total'))
     fig2.update_layout(margin=dict(l=10,r=10,t=10,b=10), height=140, showlegend=False, xaxis_title="")
@@ -180,7 +180,9 @@ with col1:
 
 with col2:
     st.subheader("Top Conversations")
-    top_table, total_bytes = top_n_summary(df_window, flow_col='flow', length_col='length', n=top_n)
+    total_bytes = flow_sums.sum()
+    top_table = flow_sums.head(top_n).rename_axis('flow').reset_index(name='bytes')
+    top_table['percent'] = (top_table['bytes'] / total_bytes * 100).round(2)
     # display stacked bar for top N
     # build bar: each flow's total bytes
     bar_fig = px.bar(top_table, x='flow', y='bytes', text='percent', labels={'bytes':'Bytes','flow':'Flow'})
@@ -193,16 +195,18 @@ with col2:
     st.markdown("**Quick stats**")
     colA, colB = st.columns(2)
     with colA:
-        st.metric("Total flows", int(df_window['flow'].nunique()))
-        st.metric("Total bytes", f"{int(df_window['length'].sum()):,}")
+        st.metric("Total flows", len(flow_sums))
+        st.metric("Total bytes", f"{int(total_bytes):,}")
     with colB:
         st.metric("Time span (s)", f"{(end-start):.2f}")
-        st.metric("Bin size (s)", f"{bin_s:.2f}")
+        st.metric("Bin size", res_label(bin_s))
 
 # bottom: small table of top endpoints (src or dst summary)
 st.markdown("---")
 st.subheader("Top endpoints (source IP)")
-src_summary = df_window.groupby('src')['length'].sum().sort_values(ascending=False).reset_index().rename(columns={'length':'bytes'})
+# flow labels start with the source IP (src_dst_proto, or the flow file name)
+src_summary = (flow_sums.groupby(flow_sums.index.str.split('_').str[0]).sum()
+               .sort_values(ascending=False).rename_axis('src').reset_index(name='bytes'))
 st.table(src_summary.head(8))
 
 st.markdown("""
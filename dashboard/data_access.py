@@ -0,0 +1,199 @@
+# dashboard/data_access.py
+"""
+Shared data access for the Streamlit dashboards.
+
+Streamlit reruns the whole script on every widget change; this module is
+imported once per server process, so its readers persist across reruns and
+sessions:
+- each CSV is cached by (size, mtime); an unchanged file costs one stat()
+- a growing log (capture/*.csv written by capture_live.py) is tailed: only
+  the bytes appended since the last read are parsed, up to the last full line
+- a file that shrank or was replaced is read again from the start
+- frames are columnar with compact dtypes; repeated strings (src, dst,
+  proto, flow, source file) are categoricals
+Every load returns timing stats for the sidebar.
+"""
+
+import io
+import os
+import glob
+import time
+import threading
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+CAPTURE_GLOB = "capture/*.csv"
+FLOW_GLOB = "preprocessed/flows/*.csv"
+
+CATEGORICAL = ["src", "dst", "proto", "flow", "source_file"]
+DTYPES = {"ts": "float64", "sport": "int32", "dport": "int32", "length": "int64", "ipd": "float64"}
+
+# -------------------------------------------------
+# Frames
+# -------------------------------------------------
+def compact(df):
+    """Categorical strings, narrow numerics (in place)."""
+    for c in df.columns:
+        if c in CATEGORICAL and not isinstance(df[c].dtype, pd.CategoricalDtype):
+            df[c] = df[c].astype("category")
+        elif c in DTYPES and df[c].dtype != DTYPES[c] and not df[c].isna().any():
+            df[c] = df[c].astype(DTYPES[c])
+    return df
+
+def concat_frames(frames):
+    """pd.concat that keeps categoricals categorical (union of the categories)."""
+    frames = [f for f in frames if len(f)]
+    if not frames:
+        return pd.DataFrame()
+    if len(frames) == 1:
+        return frames[0]
+    cats = {c for f in frames for c in f.columns if isinstance(f[c].dtype, pd.CategoricalDtype)}
+    out = pd.concat([f.drop(columns=[c for c in cats if c in f.columns]) for f in frames],
+                    ignore_index=True)
+    for c in cats:
+        if all(c in f.columns for f in frames):
+            out[c] = union_categoricals([f[c] for f in frames])
+    return out[[c for c in frames[0].columns if c in out.columns]]
+
+# -------------------------------------------------
+# Incremental CSV reader
+# -------------------------------------------------
+class TailReader:
+    """Cached, append-aware reader of one CSV file."""
+
+    def __init__(self, path):
+        self.path = path
+        self.signature = None
+        self.inode = None
+        self.offset = 0
+        self.header = None
+        self.frame = pd.DataFrame()
+        self.version = 0
+        self.generation = 0     # bumped when the file is read from the start again
+
+    def _parse(self, data):
+        df = pd.read_csv(io.BytesIO(data), header=None, names=self.header,
+                         on_bad_lines="skip", engine="c")
+        return compact(df)
+
+    def read(self):
+        """(frame, stats); stats["mode"] is cached / tail / full."""
+        t0 = time.perf_counter()
+        st = os.stat(self.path)
+        signature = (st.st_size, st.st_mtime_ns)
+        if signature == self.signature:
+            return self.frame, {"mode": "cached", "bytes": 0, "rows": 0,
+                                "ms": (time.perf_counter() - t0) * 1e3}
+
+        mode = "tail"
+        if self.header is None or st.st_ino != self.inode or st.st_size < self.offset:
+            mode = "full"
+            self.offset, self.header, self.frame = 0, None, pd.DataFrame()
+            self.generation += 1
+
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            data = f.read(st.st_size - self.offset)
+        if self.header is None:
+            line, sep, data = data.partition(b"\n")
+            if not sep:                       # header not complete yet
+                return self.frame, {"mode": mode, "bytes": 0, "rows": 0,
+                                    "ms": (time.perf_counter() - t0) * 1e3}
+            self.header = line.decode().strip().split(",")
+            self.offset += len(line) + 1
+        end = data.rfind(b"\n") + 1           # a partially written last line waits
+        rows = 0
+        if end:
+            new = self._parse(data[:end])
+            rows = len(new)
+            self.frame = concat_frames([self.frame, new]) if len(self.frame) else new
+            self.offset += end
+            self.version += 1
+        self.inode = st.st_ino
+        # stay "changed" while a partial line is pending
+        self.signature = signature if end == len(data) else None
+        return self.frame, {"mode": mode, "bytes": end, "rows": rows,
+                            "ms": (time.perf_counter() - t0) * 1e3}
+
+# -------------------------------------------------
+# Multi-file loads (cached across reruns)
+# -------------------------------------------------
+_readers = {}
+_combined = {}
+_lock = threading.Lock()
+
+def _load(pattern, prepare):
+    """Concatenation of every file matching `pattern`, rebuilt only when one changed."""
+    t0 = time.perf_counter()
+    files = sorted(glob.glob(pattern))
+    stats = {"files": len(files), "bytes": 0, "rows_added": 0, "failed": 0,
+             "cached": 0, "tail": 0, "full": 0}
+    frames, key = [], [pattern]
+    with _lock:
+        for path in files:
+            reader = _readers.setdefault(path, TailReader(path))
+            try:
+                frame, s = reader.read()
+            except (OSError, ValueError, pd.errors.ParserError):
+                stats["failed"] += 1
+                continue
+            stats[s["mode"]] += 1
+            stats["bytes"] += s["bytes"]
+            stats["rows_added"] += s["rows"]
+            key.append((path, reader.version))
+            frames.append((path, frame))
+
+        key = tuple(key)
+        cached = _combined.get(pattern)
+        if cached is not None and cached[0] == key:
+            df = cached[1]
+        else:
+            df = concat_frames([prepare(path, frame) for path, frame in frames])
+            _combined[pattern] = (key, df)
+
+    stats["rows"] = len(df)
+    stats["memory_mb"] = df.memory_usage(deep=True).sum() / 1e6 if len(df) else 0.0
+    stats["ms"] = (time.perf_counter() - t0) * 1e3
+    return (df if len(df) else None), files, stats
+
+def _with_file(path, frame):
+    df = frame.copy(deep=False)
+    df["source_file"] = pd.Categorical.from_codes(np.zeros(len(df), dtype=np.int8),
+                                                  [os.path.basename(path)])
+    return df
+
+def _flow_frame(path, frame):
+    df = frame.copy(deep=False)
+    if "ts" not in df.columns:
+        # synthetic ts from ipd
+        df["ts"] = df["ipd"].cumsum() if "ipd" in df.columns else np.arange(len(df)) * 0.001
+    if "length" not in df.columns:
+        df["length"] = df["pkt_len"] if "pkt_len" in df.columns else df.get("len", 64)
+    df["flow"] = pd.Categorical.from_codes(np.zeros(len(df), dtype=np.int8),
+                                           [os.path.basename(path).replace(".csv", "")])
+    return df[["ts", "flow", "length", "src", "dst"]]
+
+def load_captures(pattern=CAPTURE_GLOB):
+    """(df, files, stats) of every capture CSV, with a categorical source_file."""
+    return _load(pattern, _with_file)
+
+def load_flows(pattern=FLOW_GLOB):
+    """(df, files, stats) of the preprocessed flows; flow = file name."""
+    return _load(pattern, _flow_frame)
+
+def readers(pattern):
+    """[(path, TailReader)] behind the last load of `pattern` (rows appended in place)."""
+    with _lock:
+        return [(p, _readers[p]) for p in sorted(glob.glob(pattern)) if p in _readers]
+
+def format_stats(stats):
+    return (f"{stats['rows']:,} rows from {stats['files']} files in {stats['ms']:.0f} ms "
+            f"({stats['bytes'] / 1e6:.1f} MB parsed; {stats['cached']} cached, "
+            f"{stats['tail']} tailed, {stats['full']} read; {stats['memory_mb']:.1f} MB in memory)")
+
+def clear_cache():
+    with _lock:
+        _readers.clear()
+        _combined.clear()
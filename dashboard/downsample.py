@@ -0,0 +1,95 @@
+# dashboard/downsample.py
+"""
+Server-side downsampling of plotted series.
+
+A chart cannot show more than about one point per horizontal pixel. Above
+that, extra points only cost serialisation and browser rendering. The point
+budget is therefore derived from the chart width (point_budget). Series longer
+than the budget are reduced before they are handed to Plotly:
+- lttb            Largest-Triangle-Three-Buckets: keeps the visual shape
+                  (trend lines, stacked areas)
+- minmax_indices  min and max of every bucket: never drops a spike (risk
+                  timelines, where the peaks are the point)
+Both return sorted row indices, so several series sharing an x axis (a
+stacked area) can be cut at the same rows.
+"""
+
+import numpy as np
+
+CHART_WIDTH_PX = 1200
+POINTS_PER_PX = 1.0
+
+def point_budget(width_px=CHART_WIDTH_PX, points_per_px=POINTS_PER_PX, minimum=100):
+    return max(minimum, int(width_px * points_per_px))
+
+def _bucket_edges(n, n_buckets):
+    return np.linspace(0, n, n_buckets + 1).astype(np.int64)
+
+def minmax_indices(y, n_out):
+    """Indices of the min and max of each of n_out // 2 buckets (first and last kept)."""
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if n <= n_out:
+        return np.arange(n)
+    n_buckets = max(1, (n_out - 2) // 2)
+    edges = _bucket_edges(n - 2, n_buckets) + 1
+    starts = edges[:-1]
+    bucket = np.repeat(np.arange(n_buckets), np.diff(edges))
+    inner = y[1:-1]
+    filled = np.where(np.isnan(inner), np.inf, inner)
+    lo = np.minimum.reduceat(filled, starts - 1)
+    filled = np.where(np.isnan(inner), -np.inf, inner)
+    hi = np.maximum.reduceat(filled, starts - 1)
+    # first row of each bucket reaching its min / max
+    pos = np.arange(1, n - 1)
+    idx = np.concatenate([[0], bucket_first(bucket, inner == lo[bucket], pos),
+                          bucket_first(bucket, inner == hi[bucket], pos), [n - 1]])
+    return np.unique(idx)
+
+def bucket_first(bucket, mask, pos):
+    """pos of the first True of `mask` in every bucket that has one."""
+    b = bucket[mask]
+    if not len(b):
+        return np.empty(0, dtype=np.int64)
+    first = np.flatnonzero(np.r_[True, b[1:] != b[:-1]])
+    return pos[mask][first]
+
+def lttb(x, y, n_out):
+    """Row indices chosen by Largest-Triangle-Three-Buckets (first and last kept)."""
+    x = np.asarray(x, dtype=np.float64)
+    y = np.nan_to_num(np.asarray(y, dtype=np.float64))
+    n = len(y)
+    if n <= n_out or n_out < 3:
+        return np.arange(n)
+    edges = _bucket_edges(n - 2, n_out - 2) + 1
+    # average point of every bucket (the "next bucket" corner of each triangle)
+    counts = np.diff(edges)
+    avg_x = np.add.reduceat(x[1:-1], edges[:-1] - 1) / counts
+    avg_y = np.add.reduceat(y[1:-1], edges[:-1] - 1) / counts
+    avg_x = np.append(avg_x, x[-1])
+    avg_y = np.append(avg_y, y[-1])
+
+    out = np.empty(n_out, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        s, e = edges[i], edges[i + 1]
+        cx, cy = avg_x[i + 1], avg_y[i + 1]
+        # twice the triangle area (a, candidate, next-bucket average)
+        area = np.abs((x[a] - cx) * (y[s:e] - y[a]) - (x[a] - x[s:e]) * (cy - y[a]))
+        a = s + int(np.argmax(area))
+        out[i + 1] = a
+    return out
+
+def downsample_frame(df, x, y, n_out, method="lttb"):
+    """Rows of df chosen on column y against x (sorted by x)."""
+    if len(df) <= n_out:
+        return df
+    xs = df[x].to_numpy()
+    if np.issubdtype(xs.dtype, np.datetime64):
+        xs = xs.astype("datetime64[ns]").astype(np.int64)
+    if method == "minmax":
+        idx = minmax_indices(df[y].to_numpy(), n_out)
+    else:
+        idx = lttb(xs, df[y].to_numpy(), n_out)
+    return df.iloc[idx]
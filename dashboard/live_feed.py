@@ -0,0 +1,110 @@
+# dashboard/live_feed.py
+"""
+Subscriber for the detector's server-sent event feed (live/alert_feed.py).
+
+A daemon thread keeps one HTTP stream open and appends every event to
+bounded in-memory state; the dashboard only reads that state, so new alerts
+show up on the next (1 s) refresh without re-reading any file:
+    alerts     last `window` alert rows (deque)
+    incidents  latest record per incident id (last `window` ids)
+    risk       latest risk per flow, with the time it was received
+               (last `window` flows updated)
+Older history comes from the alert store. On disconnect it reconnects with
+Last-Event-ID, so events still in the detector's ring are not lost.
+"""
+
+import json
+import threading
+import urllib.request
+from collections import OrderedDict, deque
+
+from live.alert_feed import FEED_HOST, FEED_PORT
+
+FEED_URL = f"http://{FEED_HOST}:{FEED_PORT}/events"
+FEED_WINDOW = 1000
+RECONNECT_S = 2.0
+
+def parse_events(lines):
+    """(id, event, data) from an iterable of SSE text lines."""
+    seq, kind, data = None, "message", []
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if not line:
+            if data:
+                yield seq, kind, "\n".join(data)
+            seq, kind, data = None, "message", []
+        elif line.startswith(":"):
+            continue
+        else:
+            field, _, value = line.partition(":")
+            value = value[1:] if value.startswith(" ") else value
+            if field == "id":
+                seq = value
+            elif field == "event":
+                kind = value
+            elif field == "data":
+                data.append(value)
+
+class FeedSubscriber:
+    def __init__(self, url=FEED_URL, window=FEED_WINDOW):
+        self.url = url
+        self.window = window
+        self.alerts = deque(maxlen=window)
+        self.incidents = OrderedDict()
+        self.risk = OrderedDict()
+        self.last_id = None
+        self.connected = False
+        self.error = None
+        self.received = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, name="feed-subscriber", daemon=True)
+
+    def _apply(self, kind, data):
+        with self._lock:
+            self.received += 1
+            if kind == "alert":
+                self.alerts.append(data)
+            elif kind == "incident":
+                self.incidents[data["incident_id"]] = data
+                self.incidents.move_to_end(data["incident_id"])
+                while len(self.incidents) > self.window:
+                    self.incidents.popitem(last=False)
+            elif kind == "risk":
+                for flow, risk in data["flows"].items():
+                    self.risk[flow] = (risk, data["ts"])
+                    self.risk.move_to_end(flow)
+                while len(self.risk) > self.window:
+                    self.risk.popitem(last=False)
+
+    def _loop(self):
+        while not self._stop.is_set():
+            req = urllib.request.Request(self.url, headers={"Accept": "text/event-stream"})
+            if self.last_id is not None:
+                req.add_header("Last-Event-ID", self.last_id)
+            try:
+                with urllib.request.urlopen(req, timeout=30) as resp:
+                    self.connected, self.error = True, None
+                    lines = (raw.decode() for raw in resp)
+                    for seq, kind, data in parse_events(lines):
+                        if self._stop.is_set():
+                            break
+                        if seq is not None:
+                            self.last_id = seq
+                        self._apply(kind, json.loads(data))
+            except (OSError, ValueError) as e:
+                self.error = str(e)
+            self.connected = False
+            self._stop.wait(RECONNECT_S)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def snapshot(self):
+        """Copies of (alerts, incidents, risk) for rendering."""
+        with self._lock:
+            return list(self.alerts), list(self.incidents.values()), dict(self.risk)
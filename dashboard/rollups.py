@@ -0,0 +1,228 @@
+# dashboard/rollups.py
+"""
+Multi-resolution traffic rollups for dashboard/app_v2.py.
+
+Bytes and packets per (time bin, flow) are accumulated once per packet at
+every resolution in RESOLUTIONS (10 ms … 1 h) with np.bincount, as dense
+(bins, flows) arrays indexed by absolute bin number floor(ts / res). New
+packets (captures being appended, new files) are added incrementally; bins
+and flows grow as needed. Zoom / pan / bin-size changes are then slices of
+the coarsest resolution that still gives enough bins for the range.
+
+A resolution whose array would exceed max_cells (e.g. 10 ms over days of
+traffic) is dropped; the dashboard bins the raw packets of the selected
+window for it instead (window_rollup, same bincount).
+"""
+
+import numpy as np
+import pandas as pd
+
+RESOLUTIONS = [0.01, 0.1, 1.0, 10.0, 60.0, 600.0, 3600.0]
+MAX_CELLS = 4_000_000      # per resolution: bins × flows
+MAX_BINS = 1500            # "auto": finest resolution with at most this many bins
+
+# -------------------------------------------------
+# Flow keys
+# -------------------------------------------------
+def flow_column(df):
+    """
+    Categorical "src_dst_proto" without a per-row Python call: the string is
+    built once per distinct (src, dst, proto) and indexed by combined codes.
+    """
+    parts = [df[c].astype("category") for c in ("src", "dst", "proto")]
+    codes = [p.cat.codes.to_numpy().astype(np.int64) for p in parts]
+    sizes = [len(p.cat.categories) + 1 for p in parts]      # +1: code -1 (missing)
+    key = ((codes[0] + 1) * sizes[1] + codes[1] + 1) * sizes[2] + codes[2] + 1
+    uniq, inverse = np.unique(key, return_inverse=True)
+    labels = []
+    for k in uniq:
+        k, c2 = divmod(int(k), sizes[2])
+        c0, c1 = divmod(k, sizes[1])
+        names = [("?" if c == 0 else str(p.cat.categories[c - 1]))
+                 for p, c in zip(parts, (c0, c1, c2))]
+        labels.append("_".join(names))
+    # distinct keys may map to the same label (e.g. missing vs "?")
+    labels = pd.Index(labels)
+    cats = labels.unique()
+    return pd.Categorical.from_codes(cats.get_indexer(labels)[inverse], cats)
+
+# -------------------------------------------------
+# Accumulation
+# -------------------------------------------------
+def bin_counts(bins, flows, n_bins, n_flows, length):
+    """(bytes, packets) as (n_bins, n_flows) arrays; bins / flows are 0-based indices."""
+    idx = bins * n_flows + flows
+    size = n_bins * n_flows
+    b = np.bincount(idx, weights=length, minlength=size).reshape(n_bins, n_flows)
+    p = np.bincount(idx, minlength=size).reshape(n_bins, n_flows)
+    return b, p
+
+class Level:
+    """Dense rollup at one resolution; rows cover absolute bins [lo, hi)."""
+
+    def __init__(self, res):
+        self.res = res
+        self.lo = self.hi = None
+        self.bytes = np.zeros((0, 0))
+        self.packets = np.zeros((0, 0), dtype=np.int64)
+
+    def cells(self, lo, hi, n_flows):
+        if self.lo is not None:
+            lo, hi = min(lo, self.lo), max(hi, self.hi)
+        return (hi - lo) * n_flows
+
+    def _grow(self, lo, hi, n_flows):
+        """Make room for bins [lo, hi) and n_flows columns (25% slack past the end)."""
+        if self.lo is None:
+            self.lo = self.hi = lo
+        cap_hi = self.lo + self.bytes.shape[0]
+        if lo >= self.lo and hi <= cap_hi and n_flows <= self.bytes.shape[1]:
+            self.hi = max(self.hi, hi)
+            return
+        new_lo = min(lo, self.lo)
+        new_hi = max(hi, self.hi)
+        if hi > cap_hi:
+            new_hi += (new_hi - new_lo) // 4
+        width = max(n_flows, self.bytes.shape[1])
+        if n_flows > self.bytes.shape[1]:
+            width += n_flows // 4
+        b = np.zeros((new_hi - new_lo, width))
+        p = np.zeros((new_hi - new_lo, width), dtype=np.int64)
+        off = self.lo - new_lo
+        used = self.hi - self.lo
+        b[off:off + used, :self.bytes.shape[1]] = self.bytes[:used]
+        p[off:off + used, :self.packets.shape[1]] = self.packets[:used]
+        self.lo, self.hi = new_lo, max(hi, self.hi)
+        self.bytes, self.packets = b, p
+
+    def add(self, abs_bins, flows, n_flows, length):
+        lo, hi = int(abs_bins.min()), int(abs_bins.max()) + 1
+        self._grow(lo, hi, n_flows)
+        b, p = bin_counts(abs_bins - lo, flows, hi - lo, n_flows, length)
+        r0 = lo - self.lo
+        self.bytes[r0:r0 + hi - lo, :n_flows] += b
+        self.packets[r0:r0 + hi - lo, :n_flows] += p
+
+class Rollups:
+    """Bytes / packets per flow at every resolution, fed batch by batch."""
+
+    def __init__(self, resolutions=RESOLUTIONS, max_cells=MAX_CELLS):
+        self.levels = {r: Level(r) for r in resolutions}
+        self.max_cells = max_cells
+        self.dropped = set()
+        self.labels = []
+        self._index = {}
+        self.packets_added = 0
+        self.t_min = self.t_max = None
+
+    def _flow_ids(self, flows):
+        """Global flow index of each row of a Categorical."""
+        cats = flows.categories
+        mapping = np.empty(len(cats) + 1, dtype=np.int64)
+        for i, label in enumerate(cats):
+            if label not in self._index:
+                self._index[label] = len(self.labels)
+                self.labels.append(label)
+            mapping[i] = self._index[label]
+        mapping[-1] = -1
+        return mapping[flows.codes]
+
+    def add(self, ts, flows, length):
+        ts = np.asarray(ts, dtype=np.float64)
+        length = np.asarray(length, dtype=np.float64)
+        ids = self._flow_ids(pd.Categorical(flows))
+        ok = (ids >= 0) & np.isfinite(ts) & np.isfinite(length)
+        if not ok.all():
+            ts, ids, length = ts[ok], ids[ok], length[ok]
+        if not len(ts):
+            return
+        lo, hi = float(ts.min()), float(ts.max())
+        self.t_min = lo if self.t_min is None else min(self.t_min, lo)
+        self.t_max = hi if self.t_max is None else max(self.t_max, hi)
+        n_flows = len(self.labels)
+        for res, level in self.levels.items():
+            if res in self.dropped:
+                continue
+            abs_bins = np.floor(ts / res).astype(np.int64)
+            if level.cells(int(abs_bins.min()), int(abs_bins.max()) + 1, n_flows) > self.max_cells:
+                self.dropped.add(res)
+                self.levels[res] = Level(res)     # free it
+                continue
+            level.add(abs_bins, ids, n_flows, length)
+        self.packets_added += len(ts)
+
+    # ---------------- lookups ----------------
+    def available(self):
+        return [r for r in self.levels if r not in self.dropped]
+
+    def pick(self, start, end, max_bins=MAX_BINS):
+        """Finest resolution with at most max_bins bins over [start, end]."""
+        for res in sorted(self.levels):
+            if (end - start) / res <= max_bins:
+                return res
+        return max(self.levels)
+
+    def series(self, start, end, res):
+        """
+        (times, bytes, packets) of bins overlapping [start, end] at `res`:
+        bin start times (s) and (n_bins, n_flows) arrays, columns = self.labels.
+        None if `res` was dropped.
+        """
+        if res in self.dropped:
+            return None
+        level = self.levels[res]
+        n_flows = len(self.labels)
+        lo, hi = int(np.floor(start / res)), int(np.floor(end / res)) + 1
+        times = np.arange(lo, hi) * res
+        b = np.zeros((hi - lo, n_flows))
+        p = np.zeros((hi - lo, n_flows), dtype=np.int64)
+        if level.lo is not None:
+            a0, a1 = max(lo, level.lo), min(hi, level.hi)
+            if a1 > a0:
+                b[a0 - lo:a1 - lo] = level.bytes[a0 - level.lo:a1 - level.lo, :n_flows]
+                p[a0 - lo:a1 - lo] = level.packets[a0 - level.lo:a1 - level.lo, :n_flows]
+        return times, b, p
+
+def window_rollup(ts, flows, length, start, end, res):
+    """Same (times, bytes, packets, labels) as Rollups.series, from raw packets of a window."""
+    r = Rollups([res], max_cells=np.inf)
+    ts = np.asarray(ts, dtype=np.float64)
+    keep = (ts >= start) & (ts <= end)
+    r.add(ts[keep], pd.Categorical(flows)[keep], np.asarray(length)[keep])
+    times, b, p = r.series(start, end, res)
+    return times, b, p, r.labels
+
+# -------------------------------------------------
+# Incremental feed from dashboard/data_access readers
+# -------------------------------------------------
+class RollupFeed:
+    """
+    Rollups of every file behind a data_access pattern. Only rows appended
+    since the last call are added; a file that was re-read from scratch
+    rebuilds everything.
+    """
+
+    def __init__(self, flow_of, resolutions=RESOLUTIONS, max_cells=MAX_CELLS):
+        self.flow_of = flow_of          # (path, frame) → Categorical of flow labels
+        self.resolutions = resolutions
+        self.max_cells = max_cells
+        self.rollups = Rollups(resolutions, max_cells)
+        self._done = {}                 # path → (generation, rows added)
+
+    def update(self, readers):
+        """readers: [(path, TailReader)]; returns the number of rows added."""
+        if any(path in self._done and (r.generation != self._done[path][0]
+                                       or len(r.frame) < self._done[path][1])
+               for path, r in readers):
+            self.rollups = Rollups(self.resolutions, self.max_cells)
+            self._done = {}
+        added = 0
+        for path, reader in readers:
+            frame = reader.frame
+            n0 = self._done.get(path, (reader.generation, 0))[1]
+            if len(frame) > n0:
+                new = frame.iloc[n0:]
+                self.rollups.add(new["ts"].to_numpy(), self.flow_of(path, new), new["length"].to_numpy())
+                added += len(new)
+            self._done[path] = (reader.generation, len(frame))
+        return added
@@ -4,28 +4,15 @@ import json
 import os
 from datetime import datetime
 
-import numpy as np
 import pandas as pd
 
 from feature_utils import (
+    basic_features,
     fft_features,
     autocorr_features,
     entropy_features
 )
 
-# =========================================================
-# Basic Statistical Features
-# =========================================================
-def basic_features(ipd):
-    return {
-        "ipd_mean": float(np.mean(ipd)),
-        "ipd_std": float(np.std(ipd)),
-        "ipd_min": float(np.min(ipd)),
-        "ipd_max": float(np.max(ipd)),
-        "ipd_median": float(np.median(ipd)),
-        "ipd_iqr": float(np.percentile(ipd, 75) - np.percentile(ipd, 25))
-    }
-
 # =========================================================
 # Feature Extraction Per Window
 # =========================================================
@@ -0,0 +1,91 @@
+# features/feature_io.py
+"""
+Bounded-memory readers for window feature files.
+
+Feature files can be:
+- features_*.json   one JSON array of window dicts (feature_extractor.py)
+- *.jsonl           one window dict per line
+- *.csv             one window per row
+
+iter_feature_chunks() yields DataFrames of at most `chunk_size` windows,
+so files far larger than RAM can be scored or trained on.
+"""
+
+import os
+import json
+
+import pandas as pd
+
+CHUNK_SIZE = 50_000
+READ_BYTES = 1 << 20
+
+def iter_json_array(path, read_bytes=READ_BYTES):
+    """
+    Stream the objects of a top-level JSON array without loading the file.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, "r") as f:
+        buf = f.read(read_bytes)
+        pos = 0
+        eof = False
+
+        def skip(chars):
+            nonlocal pos
+            while pos < len(buf) and buf[pos] in chars:
+                pos += 1
+
+        skip(" \t\r\n")
+        if buf[pos:pos + 1] != "[":
+            raise ValueError(f"{path}: expected a JSON array")
+        pos += 1
+
+        while True:
+            skip(" \t\r\n,")
+            if pos >= len(buf):
+                if eof:
+                    raise ValueError(f"{path}: truncated JSON array")
+                more = f.read(read_bytes)
+                eof = not more
+                buf, pos = buf[pos:] + more, 0
+                continue
+            if buf[pos] == "]":
+                return
+            try:
+                obj, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                # object straddles the buffer boundary: read more and retry
+                more = f.read(read_bytes)
+                eof = not more
+                buf, pos = buf[pos:] + more, 0
+                continue
+            yield obj
+            pos = end
+
+def iter_records(path):
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".jsonl":
+        with open(path) as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    elif ext == ".json":
+        yield from iter_json_array(path)
+    else:
+        raise ValueError(f"Unsupported feature file: {path}")
+
+def iter_feature_chunks(path, chunk_size=CHUNK_SIZE):
+    """Yield DataFrames of at most chunk_size windows from a feature file."""
+    if os.path.splitext(path)[1].lower() == ".csv":
+        yield from pd.read_csv(path, chunksize=chunk_size)
+        return
+
+    rows = []
+    for rec in iter_records(path):
+        rows.append(rec)
+        if len(rows) >= chunk_size:
+            yield pd.DataFrame(rows)
+            rows = []
+    if rows:
+        yield pd.DataFrame(rows)
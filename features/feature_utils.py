@@ -5,14 +5,16 @@ Feature utilities for covert timing channel detection
 """
 
 import numpy as np
-from scipy.stats import entropy
-from scipy.signal import correlate
-from scipy.fft import rfft
+
+# scipy is imported on first use: importing it costs ~1 s, which every
+# short-lived CLI and detector restart would otherwise pay up front
 
 # -------------------------------------------------
 # BASIC FEATURES (Real-time safe)
 # -------------------------------------------------
 def compute_basic_features(ipds):
+    from scipy.stats import entropy
+
     ipds = np.asarray(ipds)
 
     if len(ipds) < 2:
@@ -37,10 +39,26 @@ def compute_basic_features(ipds):
         "ipd_std_norm": float(np.std(ipds) / (np.mean(ipds) + 1e-9)),
     }
 
+# -------------------------------------------------
+# WINDOW STATISTICS (offline extractor + detector)
+# -------------------------------------------------
+def basic_features(ipd):
+    return {
+        "ipd_mean": float(np.mean(ipd)),
+        "ipd_std": float(np.std(ipd)),
+        "ipd_min": float(np.min(ipd)),
+        "ipd_max": float(np.max(ipd)),
+        "ipd_median": float(np.median(ipd)),
+        "ipd_iqr": float(np.percentile(ipd, 75) - np.percentile(ipd, 25))
+    }
+
 # -------------------------------------------------
 # FFT FEATURES
 # -------------------------------------------------
 def fft_features(ipd):
+    from scipy.stats import entropy
+    from scipy.fft import rfft
+
     ipd = np.asarray(ipd)
     if len(ipd) < 4:
         return {
@@ -73,6 +91,8 @@ def fft_features(ipd):
 # AUTOCORRELATION FEATURES
 # -------------------------------------------------
 def autocorr_features(ipd, max_lag=10):
+    from scipy.signal import correlate
+
     ipd = np.asarray(ipd)
     if len(ipd) < max_lag + 2:
         return {
@@ -98,6 +118,8 @@ def autocorr_features(ipd, max_lag=10):
 # ENTROPY WRAPPER (compat)
 # -------------------------------------------------
 def entropy_features(ipd):
+    from scipy.stats import entropy
+
     ipd = np.asarray(ipd)
     if len(ipd) < 5:
         return {
@@ -112,3 +134,39 @@ def entropy_features(ipd):
         "ipd_entropy": float(entropy(hist)),
         "ipd_std_norm": float(np.std(ipd) / (np.mean(ipd) + 1e-9))
     }
+
+# -------------------------------------------------
+# FEATURE GROUPS (cost-aware planning)
+# -------------------------------------------------
+# Each group is computed by one function; a model only needs the groups
+# whose outputs appear in its columns, the rest are skipped entirely.
+FEATURE_GROUPS = {
+    "basic": (basic_features,
+              ["ipd_mean", "ipd_std", "ipd_min", "ipd_max", "ipd_median", "ipd_iqr"]),
+    "fft": (fft_features,
+            ["fft_dom_freq", "fft_energy_ratio", "fft_spectral_entropy"]),
+    "autocorr": (autocorr_features,
+                 ["ac_max", "ac_lag", "ac_mean"]),
+    "entropy": (entropy_features,
+                ["ipd_entropy", "ipd_std_norm"]),
+}
+
+def groups_for(columns):
+    """Feature groups needed to produce `columns`, in extraction order."""
+    columns = set(columns)
+    return [g for g, (_, cols) in FEATURE_GROUPS.items() if columns & set(cols)]
+
+def group_columns(groups):
+    return [c for g in groups for c in FEATURE_GROUPS[g][1]]
+
+def compute_features(ipd, groups=None, feats=None):
+    """
+    Window features for the given groups (all by default). Groups already
+    present in `feats` are not recomputed.
+    """
+    feats = {} if feats is None else feats
+    for g in (FEATURE_GROUPS if groups is None else groups):
+        fn, cols = FEATURE_GROUPS[g]
+        if cols[0] not in feats:
+            feats.update(fn(ipd))
+    return feats
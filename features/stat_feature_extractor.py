@@ -24,36 +24,27 @@ import pandas as pd
 import numpy as np
 
 from stats.stat_tests import (
-    ks_test,
-    ad_test,
-    js_divergence,
-    suspicion_score
+    baseline_profile,
+    window_stat_scores
 )
 
 # -------------------------------------------------
 def extract_stat_features(df, window, step, flow_name, baseline_ipd):
     results = []
     ipd = df["ipd"].values
+    profile = baseline_profile(baseline_ipd)
 
     for start in range(0, len(ipd) - window + 1, step):
         end = start + window
         w = ipd[start:end]
 
-        ks_stat, ks_p = ks_test(w, baseline_ipd)
-        ad_stat = ad_test(w)
-        jsd = js_divergence(w, baseline_ipd)
-        score = suspicion_score(ks_stat, ks_p, ad_stat, jsd)
-
-        results.append({
+        row = {
             "flow": flow_name,
             "window_start": start,
-            "window_end": end,
-            "ks_stat": ks_stat,
-            "ks_pvalue": ks_p,
-            "ad_stat": ad_stat,
-            "js_divergence": jsd,
-            "suspicion_score": score
-        })
+            "window_end": end
+        }
+        row.update(window_stat_scores(w, profile))
+        results.append(row)
 
     return results
 
@@ -0,0 +1,208 @@
+# fusion/pipeline.py
+"""
+Single-pass offline pipeline: flow CSVs → fused risk report.
+
+Replaces the file hand-offs between
+    features/feature_extractor.py  → features_*.json
+    features/stat_feature_extractor.py → stat_features_*.json
+    models/iforest_detect.py       → models/iforest_scores.csv
+    fusion/risk_engine.py          → fusion_output/final_risk_report.csv
+Each flow is read once. Its windows are zero-copy views
+(sliding_window_view), shared by the ML features, the statistical tests and
+both models. RF and IF are scored in one batch per flow and fused in memory,
+using the same functions as the stand-alone scripts, so the report is
+identical to the multi-step run.
+
+Usage:
+    python fusion/pipeline.py preprocessed/flows/*.csv --baseline preprocessed/flows/10.0.0.1_10.0.0.2_TCP.csv
+    python fusion/pipeline.py preprocessed/flows/*.csv --save-features --save-stats --save-iforest
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+# -------------------------------------------------
+# Ensure project root on PYTHONPATH
+# -------------------------------------------------
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(THIS_DIR, ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from features.feature_utils import compute_features, groups_for, FEATURE_GROUPS
+from models.artifacts import load_model_artifact
+from models.backends import load_backend
+from models.compiled_forest import ensure_compiled, iforest_score_samples
+from models.iforest_calibration import calibrated_risk, resolve_calibration
+from fusion.profiles import PROFILE_PATH, load_profile
+from fusion.risk_engine import fuse_risk, add_decisions, KEEP_RUNS
+from storage.alert_store import DB_PATH, AlertStore
+
+WINDOW = 50
+STEP = 25
+KEY_COLS = ["flow", "window_start", "window_end"]
+STAT_COLS = ["suspicion_score", "ks_pvalue", "ad_stat", "js_divergence"]
+REPORT_PATH = "fusion_output/final_risk_report.csv"
+
+# -------------------------------------------------
+# Windows
+# -------------------------------------------------
+def window_views(ipd, window=WINDOW, step=STEP):
+    """(starts, windows): read-only (n, window) view, no copies."""
+    if len(ipd) < window:
+        return np.empty(0, dtype=np.int64), np.empty((0, window), dtype=ipd.dtype)
+    views = sliding_window_view(ipd, window)[::step]
+    return np.arange(len(views), dtype=np.int64) * step, views
+
+# -------------------------------------------------
+# Assets
+# -------------------------------------------------
+def load_assets(model_path, iforest_path, baseline_flows=None, profile_path=PROFILE_PATH):
+    from stats.stat_tests import baseline_profile
+
+    profile = load_profile(profile_path)
+    if baseline_flows:
+        ipds = np.concatenate([pd.read_csv(f, usecols=["ipd"])["ipd"].to_numpy(dtype=float)
+                               for f in baseline_flows])
+        stat_profile = baseline_profile(ipds)
+    elif profile is not None:
+        stat_profile = profile
+    else:
+        raise RuntimeError(f"no baseline: pass --baseline or build {profile_path} with fusion/profiles.py")
+
+    backend = load_backend(model_path)
+    iforest = load_model_artifact(iforest_path)
+    calibration = resolve_calibration(iforest, profile)
+    if calibration is None:
+        raise RuntimeError(f"{iforest_path} has no score calibration (see models/iforest_detect.py)")
+
+    groups = groups_for(list(backend.columns) + list(iforest["columns"]))
+    return {
+        "backend": backend,
+        "iforest": ensure_compiled(iforest),
+        "if_columns": list(iforest["columns"]),
+        "calibration": calibration,
+        "stat_profile": stat_profile,
+        "groups": groups,
+        "feature_columns": [c for g in FEATURE_GROUPS if g in groups for c in FEATURE_GROUPS[g][1]],
+    }
+
+# -------------------------------------------------
+# One flow
+# -------------------------------------------------
+def process_flow(path, assets, window=WINDOW, step=STEP):
+    """Per-window features, stat scores, model scores and fused risk of one flow."""
+    from stats.stat_tests import window_stat_scores
+
+    ipd = pd.read_csv(path, usecols=["ipd"])["ipd"].to_numpy()
+    flow = os.path.basename(path).replace(".csv", "")
+    starts, views = window_views(ipd, window, step)
+
+    feats, stats = [], []
+    for w in views:
+        feats.append(compute_features(w, assets["groups"]))
+        stats.append(window_stat_scores(w, assets["stat_profile"]))
+
+    df = pd.DataFrame({"flow": flow, "window_start": starts, "window_end": starts + window})
+    feat_df = pd.DataFrame(feats)
+    stat_df = pd.DataFrame(stats)
+    detail = pd.concat([df, feat_df, stat_df], axis=1)
+    if not len(df):
+        return df, detail
+
+    X = feat_df.reindex(columns=assets["backend"].columns, fill_value=0.0).fillna(0)
+    df["ml_prob"] = assets["backend"].predict_proba(X.to_numpy(dtype=float)) * 100
+    for c in STAT_COLS:
+        df[c] = stat_df[c].to_numpy()
+    X_if = feat_df.reindex(columns=assets["if_columns"], fill_value=0.0).to_numpy(dtype=float)
+    df["iforest_risk"] = calibrated_risk(iforest_score_samples(assets["iforest"], X_if),
+                                         assets["calibration"])
+    df["final_risk"] = fuse_risk(df["ml_prob"].to_numpy(), df["suspicion_score"].to_numpy(),
+                                 df["iforest_risk"].to_numpy())
+    return df, detail
+
+# -------------------------------------------------
+def run(flow_files, model_path="models/rf_detector.joblib", iforest_path="models/iforest_detector.joblib",
+        baseline_flows=None, window=WINDOW, step=STEP, out=REPORT_PATH,
+        save_features=False, save_stats=False, save_iforest=False, store_path=DB_PATH):
+    t0 = time.perf_counter()
+    assets = load_assets(model_path, iforest_path, baseline_flows)
+    t1 = time.perf_counter()
+
+    reports, details = [], []
+    for path in flow_files:
+        report, detail = process_flow(path, assets, window, step)
+        reports.append(report)
+        details.append(detail)
+    fused = pd.concat(reports, ignore_index=True)
+    detail = pd.concat(details, ignore_index=True)
+    if fused.empty:
+        raise RuntimeError("no windows: flows shorter than --window")
+    t2 = time.perf_counter()
+
+    add_decisions(fused)
+
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    fused.to_csv(out, index=False)
+    print(f"[+] {len(fused)} windows from {len(flow_files)} flows: assets {t1 - t0:.2f}s, "
+          f"windows {t2 - t1:.2f}s, total {time.perf_counter() - t0:.2f}s")
+    print(f"[+] Final fused risk report saved → {out}")
+    if store_path:
+        store = AlertStore(store_path)
+        run_id = store.begin_run(os.path.basename(out))
+        store.insert_windows(run_id, fused)
+        store.apply_retention(keep_runs=KEEP_RUNS)
+        store.close()
+        print(f"[+] Stored as run {run_id} → {store_path}")
+
+    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+    if save_features:
+        path = f"features/features_{ts}.json"
+        cols = KEY_COLS + assets["feature_columns"]
+        with open(path, "w") as f:
+            json.dump(detail[cols].to_dict("records"), f, indent=2)
+        print(f"[+] Features → {path}")
+    if save_stats:
+        os.makedirs("stats_output", exist_ok=True)
+        path = f"stats_output/stat_features_{ts}.json"
+        cols = KEY_COLS + ["ks_stat", "ks_pvalue", "ad_stat", "js_divergence", "suspicion_score"]
+        with open(path, "w") as f:
+            json.dump(detail[cols].to_dict("records"), f, indent=2)
+        print(f"[+] Stat features → {path}")
+    if save_iforest:
+        path = "models/iforest_scores.csv"
+        fused[KEY_COLS + ["iforest_risk"]].to_csv(path, index=False)
+        print(f"[+] Isolation Forest scores → {path}")
+
+    print("\nTop Alerts:\n" + "-" * 40)
+    print(fused.sort_values("final_risk", ascending=False)
+          .head(5)[["flow", "final_risk", "decision", "explanation"]])
+    return fused
+
+# -------------------------------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Flows → fused risk report in one pass")
+    parser.add_argument("flow_files", nargs="+", help="flow CSVs with an 'ipd' column")
+    parser.add_argument("--baseline", nargs="+", help="normal flow CSV(s) for the stat tests "
+                                                      f"(default: {PROFILE_PATH})")
+    parser.add_argument("--model", default="models/rf_detector.joblib")
+    parser.add_argument("--iforest", default="models/iforest_detector.joblib")
+    parser.add_argument("--window", type=int, default=WINDOW)
+    parser.add_argument("--step", type=int, default=STEP)
+    parser.add_argument("--out", default=REPORT_PATH)
+    parser.add_argument("--save-features", action="store_true", help="also write features/features_<ts>.json")
+    parser.add_argument("--save-stats", action="store_true", help="also write stats_output/stat_features_<ts>.json")
+    parser.add_argument("--save-iforest", action="store_true", help="also write models/iforest_scores.csv")
+    parser.add_argument("--store", default=DB_PATH, help="SQLite store the dashboards read ('' = none)")
+    args = parser.parse_args()
+
+    run(args.flow_files, args.model, args.iforest, args.baseline, args.window, args.step, args.out,
+        args.save_features, args.save_stats, args.save_iforest, args.store)
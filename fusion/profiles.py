@@ -0,0 +1,86 @@
+# fusion/profiles.py
+"""
+Precomputed baseline profile for streaming fusion.
+
+Holds everything the live detector needs to compute the same fused risk
+as fusion/risk_engine.py for a single window:
+- baseline IPD sample + histogram for the KS / AD / JSD suspicion score
+- Isolation Forest score calibration (empirical CDF of normal windows)
+
+Build:
+    python fusion/profiles.py preprocessed/flows/10.0.0.1_10.0.0.2_TCP.csv \\
+        --features features/features_<ts>.json
+"""
+
+import os
+import sys
+import argparse
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# -------------------------------------------------
+# Ensure project root on PYTHONPATH
+# -------------------------------------------------
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(THIS_DIR, ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from models.iforest_calibration import fit_calibration
+from models.artifacts import save_artifact, load_artifact
+
+PROFILE_PATH = "models/fusion_profile.joblib"
+PROFILE_VERSION = 1
+
+# -------------------------------------------------
+def build_profile(baseline_flows, features_json=None,
+                  iforest_path="models/iforest_detector.joblib", out=PROFILE_PATH):
+    from stats.stat_tests import baseline_profile
+
+    # Baseline IPDs (normal traffic), same input as stat_feature_extractor.py
+    ipds = np.concatenate([pd.read_csv(f)["ipd"].to_numpy(dtype=float) for f in baseline_flows])
+    profile = baseline_profile(ipds)
+
+    # Isolation Forest calibration on normal windows of a feature set
+    if features_json and os.path.exists(iforest_path):
+        from models.train_model import load_features_json
+
+        X, y = load_features_json(features_json)
+        art = load_artifact(iforest_path)
+        normal = X[y == 0] if (y == 0).any() else X
+        scores = art["model"].score_samples(normal.reindex(columns=art["columns"], fill_value=0.0))
+        profile["iforest_calibration"] = fit_calibration(scores)
+        print(f"[+] IF calibration from {len(normal)} normal windows")
+
+    profile["version"] = PROFILE_VERSION
+    profile["source"] = {
+        "baseline_flows": [os.path.basename(f) for f in baseline_flows],
+        "features": os.path.basename(features_json) if features_json else None,
+        "created": datetime.now().isoformat(timespec="seconds"),
+    }
+
+    save_artifact(profile, out)
+    print(f"[+] Baseline profile ({len(ipds)} IPDs) saved → {out}")
+    return profile
+
+def load_profile(path=PROFILE_PATH):
+    """Profile dict, or None when it has not been built yet."""
+    if not path or not os.path.exists(path):
+        return None
+    profile = load_artifact(path)
+    if profile.get("version") != PROFILE_VERSION:
+        raise ValueError(f"{path}: unsupported profile version {profile.get('version')}")
+    return profile
+
+# -------------------------------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the fusion baseline profile")
+    parser.add_argument("baseline_flows", nargs="+", help="Normal traffic flow CSV(s)")
+    parser.add_argument("--features", help="features_*.json for the Isolation Forest calibration")
+    parser.add_argument("--iforest", default="models/iforest_detector.joblib")
+    parser.add_argument("--out", default=PROFILE_PATH)
+    args = parser.parse_args()
+
+    build_profile(args.baseline_flows, args.features, args.iforest, args.out)
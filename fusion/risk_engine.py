@@ -11,7 +11,6 @@ into one final IDS risk score.
 import os
 import sys
 import json
-import joblib
 import numpy as np
 import pandas as pd
 
@@ -23,117 +22,257 @@ PROJECT_ROOT = os.path.abspath(os.path.join(THIS_DIR, ".."))
 if PROJECT_ROOT not in sys.path:
     sys.path.insert(0, PROJECT_ROOT)
 
+from storage.alert_store import DB_PATH, AlertStore
+
+# -------------------------------------------------
+# Fusion (fusion/weights.py, shared with live/realtime_detector.py)
 # -------------------------------------------------
+from fusion.weights import FUSION_WEIGHTS, fuse_risk
+
+# Decision bands on final_risk: below 30 Normal, below 60 Suspicious
+DECISIONS = [(30, "Normal"), (60, "Suspicious")]
+TOP_DECISION = "Likely Covert"
+
+def decision_label(score):
+    for bound, label in DECISIONS:
+        if score < bound:
+            return label
+    return TOP_DECISION
+
+def decision_labels(scores):
+    """Vectorised decision_label (NaN → TOP_DECISION, like the scalar version)."""
+    scores = np.asarray(scores, dtype=float)
+    return np.select([scores < bound for bound, _ in DECISIONS],
+                     [label for _, label in DECISIONS], TOP_DECISION).astype(object)
+
+# -------------------------------------------------
+# Explanations: one bit per reason, one precomputed text per bitmask
+# -------------------------------------------------
+REASONS = [
+    ("ml_prob", 70, "ML model strongly predicts covert behavior"),
+    ("suspicion_score", 40, "Statistical tests indicate abnormal timing"),
+    ("iforest_risk", 60, "Unsupervised model flags anomalous behavior"),
+]
+NO_REASON = "No strong anomaly detected"
+EXPLANATIONS = np.array([
+    "; ".join(text for bit, (_, _, text) in enumerate(REASONS) if mask >> bit & 1) or NO_REASON
+    for mask in range(1 << len(REASONS))
+], dtype=object)
+
+def reason_mask(df):
+    """uint8 bitmask of REASONS met by each row (NaN never meets one)."""
+    mask = np.zeros(len(df), dtype=np.uint8)
+    for bit, (col, bound, _) in enumerate(REASONS):
+        mask |= (df[col].to_numpy(dtype=float) > bound).astype(np.uint8) << bit
+    return mask
+
+def explain_all(df):
+    return EXPLANATIONS[reason_mask(df)]
+
+def add_decisions(df):
+    df["decision"] = decision_labels(df["final_risk"].to_numpy())
+    df["explanation"] = explain_all(df)
+    return df
+
+# -------------------------------------------------
+# Inputs (whole tables, or sorted chunks for the streaming join)
+# -------------------------------------------------
+KEY_COLS = ["flow", "window_start", "window_end"]
+STAT_COLS = ["suspicion_score", "ks_pvalue", "ad_stat", "js_divergence"]
+CHUNK_SIZE = 50_000
+KEEP_RUNS = 10
+
+def ml_predictions(df, backend):
+    # backend applies the artifact's scaler (the model was trained on scaled features)
+    X = df.reindex(columns=backend.columns, fill_value=0.0).fillna(0)
+    out = df[KEY_COLS].reset_index(drop=True)
+    out["ml_prob"] = backend.predict_proba(X.to_numpy(dtype=float)) * 100
+    return out
+
 def load_ml_predictions(features_json, model_path):
-    artifact = joblib.load(model_path)
-    model = artifact["model"]
-    columns = artifact["columns"]
+    from models.backends import load_backend
 
     with open(features_json, "r") as f:
         feats = json.load(f)
+    return ml_predictions(pd.DataFrame(feats), load_backend(model_path))
 
-    df = pd.DataFrame(feats)
-    X = df[columns]
+def iter_ml_predictions(features_path, model_path, chunk_size=CHUNK_SIZE):
+    from models.backends import load_backend
+    from features.feature_io import iter_feature_chunks
 
-    probs = model.predict_proba(X)[:, 1] * 100
+    backend = load_backend(model_path)
+    for chunk in iter_feature_chunks(features_path, chunk_size):
+        yield ml_predictions(chunk, backend)
 
-    return pd.DataFrame({
-        "flow": df["flow"],
-        "window_start": df["window_start"],
-        "window_end": df["window_end"],
-        "ml_prob": probs
-    })
-
-# -------------------------------------------------
 def load_stat_scores(stat_json):
     with open(stat_json, "r") as f:
         stats = json.load(f)
+    return pd.DataFrame(stats)[KEY_COLS + STAT_COLS]
 
-    return pd.DataFrame(stats)[[
-        "flow",
-        "window_start",
-        "window_end",
-        "suspicion_score",
-        "ks_pvalue",
-        "ad_stat",
-        "js_divergence"
-    ]]
+def iter_stat_scores(stat_path, chunk_size=CHUNK_SIZE):
+    from features.feature_io import iter_feature_chunks
+
+    for chunk in iter_feature_chunks(stat_path, chunk_size):
+        yield chunk[KEY_COLS + STAT_COLS].reset_index(drop=True)
 
-# -------------------------------------------------
 def load_iforest_scores(iforest_csv):
-    df = pd.read_csv(iforest_csv)
-    return df[[
-        "flow",
-        "window_start",
-        "window_end",
-        "iforest_risk"
-    ]]
+    return pd.read_csv(iforest_csv)[KEY_COLS + ["iforest_risk"]]
+
+def iter_iforest_scores(iforest_csv, chunk_size=CHUNK_SIZE):
+    for chunk in pd.read_csv(iforest_csv, chunksize=chunk_size):
+        yield chunk[KEY_COLS + ["iforest_risk"]].reset_index(drop=True)
 
 # -------------------------------------------------
-def fuse_scores(ml_df, stat_df, if_df):
-    merged = ml_df.merge(
-        stat_df,
-        on=["flow", "window_start", "window_end"],
-        how="inner"
-    ).merge(
-        if_df,
-        on=["flow", "window_start", "window_end"],
-        how="inner"
-    )
+# Sort-merge join on (flow, window_start, window_end)
+# -------------------------------------------------
+def _keys(df):
+    return (df["flow"].to_numpy(dtype=object), df["window_start"].to_numpy(), df["window_end"].to_numpy())
 
-    # Final weighted risk
-    merged["final_risk"] = (
-        0.50 * merged["ml_prob"] +
-        0.30 * merged["suspicion_score"] +
-        0.20 * merged["iforest_risk"]
-    )
+def _last_key(df):
+    f, s, e = _keys(df)
+    return (f[-1], s[-1], e[-1])
 
-    # Decision
-    def label(score):
-        if score < 30:
-            return "Normal"
-        elif score < 60:
-            return "Suspicious"
-        else:
-            return "Likely Covert"
+def _below(df, key):
+    """Boolean mask of rows whose key sorts strictly before `key`."""
+    f, s, e = _keys(df)
+    flow, ws, we = key
+    return (f < flow) | ((f == flow) & ((s < ws) | ((s == ws) & (e < we))))
 
-    merged["decision"] = merged["final_risk"].apply(label)
-    return merged
+def _is_sorted(df):
+    f, s, e = _keys(df)
+    return bool(np.all((f[:-1] < f[1:]) | ((f[:-1] == f[1:]) & (s[:-1] <= s[1:]))))
 
-# -------------------------------------------------
-def explain(row):
-    reasons = []
+def sorted_chunks(chunks, name="input"):
+    """Pass chunks through, raising ValueError if the key order is violated."""
+    last = None
+    for chunk in chunks:
+        if chunk.empty:
+            continue
+        if not _is_sorted(chunk) or (last is not None and _below(chunk.iloc[:1], last)[0]):
+            raise ValueError(f"{name} is not sorted by (flow, window_start); "
+                             "sort it or use --in-memory")
+        last = _last_key(chunk)
+        yield chunk
 
-    if row["ml_prob"] > 70:
-        reasons.append("ML model strongly predicts covert behavior")
+def merge_join(left, right):
+    """
+    Inner join of two chunk streams sorted by KEY_COLS. Rows below the
+    smaller of the two buffers' last keys are final on both sides, so they
+    are joined and dropped; memory stays around two chunks per input.
+    """
+    streams = [iter(left), iter(right)]
+    bufs = [pd.DataFrame(), pd.DataFrame()]
+    done = [False, False]
 
-    if row["suspicion_score"] > 40:
-        reasons.append("Statistical tests indicate abnormal timing")
+    def pull(i):
+        chunk = next(streams[i], None)
+        if chunk is None:
+            done[i] = True
+        else:
+            bufs[i] = chunk if bufs[i].empty else pd.concat([bufs[i], chunk], ignore_index=True)
 
-    if row["iforest_risk"] > 60:
-        reasons.append("Unsupervised model flags anomalous behavior")
+    while True:
+        for i in (0, 1):
+            if bufs[i].empty and not done[i]:
+                pull(i)
+        if any(bufs[i].empty and done[i] for i in (0, 1)):
+            return
+        if all(done):
+            yield bufs[0].merge(bufs[1], on=KEY_COLS, how="inner")
+            return
 
-    return "; ".join(reasons) if reasons else "No strong anomaly detected"
+        # the bound comes from the sides that can still grow
+        open_sides = [i for i in (0, 1) if not done[i]]
+        bound_side = min(open_sides, key=lambda i: _last_key(bufs[i]))
+        bound = _last_key(bufs[bound_side])
+        ready = [_below(b, bound) for b in bufs]
+        if not (ready[0].any() or ready[1].any()):
+            pull(bound_side)   # only rows equal to the bound buffered: read on
+            continue
+        out = bufs[0][ready[0]].merge(bufs[1][ready[1]], on=KEY_COLS, how="inner")
+        bufs = [b[~r].reset_index(drop=True) for b, r in zip(bufs, ready)]
+        if len(out):
+            yield out
 
 # -------------------------------------------------
-def main(features_json, stat_json, iforest_csv, model_path):
-    ml_df = load_ml_predictions(features_json, model_path)
-    stat_df = load_stat_scores(stat_json)
-    if_df = load_iforest_scores(iforest_csv)
+# Fusion
+# -------------------------------------------------
+def fuse_frame(merged):
+    merged["final_risk"] = fuse_risk(
+        merged["ml_prob"].to_numpy(),
+        merged["suspicion_score"].to_numpy(),
+        merged["iforest_risk"].to_numpy()
+    )
+    return merged
+
+def fuse_scores(ml_df, stat_df, if_df):
+    """In-memory fusion of three whole tables (any order)."""
+    merged = ml_df.merge(stat_df, on=KEY_COLS, how="inner").merge(if_df, on=KEY_COLS, how="inner")
+    merged = fuse_frame(merged)
+    merged["decision"] = decision_labels(merged["final_risk"].to_numpy())
+    return merged
+
+def fuse_streams(ml_chunks, stat_chunks, if_chunks):
+    """Fused, decided and explained chunks from three sorted chunk streams."""
+    joined = merge_join(
+        merge_join(sorted_chunks(ml_chunks, "features"), sorted_chunks(stat_chunks, "stats")),
+        sorted_chunks(if_chunks, "iforest scores")
+    )
+    for chunk in joined:
+        yield add_decisions(fuse_frame(chunk))
 
-    fused = fuse_scores(ml_df, stat_df, if_df)
-    fused["explanation"] = fused.apply(explain, axis=1)
+def explain(row):
+    """Explanation of one row (same texts as explain_all)."""
+    mask = 0
+    for bit, (col, bound, _) in enumerate(REASONS):
+        if row[col] > bound:
+            mask |= 1 << bit
+    return EXPLANATIONS[mask]
 
-    os.makedirs("fusion_output", exist_ok=True)
-    out = "fusion_output/final_risk_report.csv"
-    fused.to_csv(out, index=False)
+# -------------------------------------------------
+def main(features_json, stat_json, iforest_csv, model_path,
+         out="fusion_output/final_risk_report.csv", chunk_size=CHUNK_SIZE, in_memory=False,
+         store_path=DB_PATH, keep_runs=KEEP_RUNS):
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    if in_memory:
+        fused = fuse_scores(load_ml_predictions(features_json, model_path),
+                            load_stat_scores(stat_json), load_iforest_scores(iforest_csv))
+        fused["explanation"] = explain_all(fused)
+        chunks = [fused]
+    else:
+        chunks = fuse_streams(
+            iter_ml_predictions(features_json, model_path, chunk_size),
+            iter_stat_scores(stat_json, chunk_size),
+            iter_iforest_scores(iforest_csv, chunk_size)
+        )
 
-    print(f"[+] Final fused risk report saved → {out}")
+    # Each chunk is also one insert transaction into the dashboards' store
+    store = AlertStore(store_path) if store_path else None
+    run_id = None
+    tmp = out + ".tmp"
+    n = 0
+    top = pd.DataFrame()
+    for chunk in chunks:
+        chunk.to_csv(tmp, mode="w" if n == 0 else "a", header=(n == 0), index=False)
+        if store is not None:
+            run_id = run_id or store.begin_run(os.path.basename(out))
+            store.insert_windows(run_id, chunk)
+        n += len(chunk)
+        top = pd.concat([top, chunk.nlargest(5, "final_risk")]).nlargest(5, "final_risk")
+    if n == 0:
+        if store is not None:
+            store.close()
+        print("[!] No windows in common between the three inputs")
+        return
+    os.replace(tmp, out)
+
+    print(f"[+] Final fused risk report ({n} windows) saved → {out}")
+    if store is not None:
+        store.apply_retention(keep_runs=keep_runs)
+        store.close()
+        print(f"[+] Stored as run {run_id} → {store_path} (last {keep_runs} runs kept)")
     print("\nTop Alerts:\n" + "-" * 40)
-    print(
-        fused.sort_values("final_risk", ascending=False)
-        .head(5)[["flow", "final_risk", "decision", "explanation"]]
-    )
+    print(top[["flow", "final_risk", "decision", "explanation"]])
 
 # -------------------------------------------------
 if __name__ == "__main__":
@@ -144,6 +283,13 @@ if __name__ == "__main__":
     parser.add_argument("--stats", required=True)
     parser.add_argument("--iforest", required=True)
     parser.add_argument("--model", default="models/rf_detector.joblib")
+    parser.add_argument("--out", default="fusion_output/final_risk_report.csv")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="windows per chunk and input")
+    parser.add_argument("--in-memory", action="store_true",
+                        help="load and hash-join whole tables (inputs not sorted by flow, window_start)")
+    parser.add_argument("--store", default=DB_PATH, help="SQLite store the dashboards read ('' = none)")
+    parser.add_argument("--keep-runs", type=int, default=KEEP_RUNS, help="runs kept in the store")
     args = parser.parse_args()
 
-    main(args.features, args.stats, args.iforest, args.model)
+    main(args.features, args.stats, args.iforest, args.model, args.out, args.chunk_size, args.in_memory,
+         args.store, args.keep_runs)
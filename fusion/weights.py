@@ -0,0 +1,45 @@
+# fusion/weights.py
+"""
+Fusion weights and the weighted 0–100 risk, shared by the offline risk
+engine (fusion/risk_engine.py), the live detector and its cascade.
+NumPy only, so the detector can import it without pandas.
+"""
+
+import numpy as np
+
+FUSION_WEIGHTS = {
+    "ml_prob": 0.50,
+    "suspicion_score": 0.30,
+    "iforest_risk": 0.20,
+}
+
+def fuse_risk(ml_prob, suspicion_score, iforest_risk):
+    """
+    Weighted 0–100 risk from the three detectors.
+    Works on scalars or arrays. A missing component (NaN, e.g. skipped by the
+    live latency budget) is left out and the remaining weights renormalised.
+    """
+    parts = np.stack(np.broadcast_arrays(
+        np.asarray(ml_prob, dtype=float),
+        np.asarray(suspicion_score, dtype=float),
+        np.asarray(iforest_risk, dtype=float),
+    ))
+    w = np.array(list(FUSION_WEIGHTS.values())).reshape((3,) + (1,) * (parts.ndim - 1))
+    present = ~np.isnan(parts)
+    total = np.sum(np.where(present, w * parts, 0.0), axis=0)
+    weight = np.sum(np.where(present, w, 0.0), axis=0)
+    risk = total / np.where(weight > 0, weight, 1.0)
+    return float(risk) if risk.ndim == 0 else risk
+
+def max_fused_risk(ml_risk):
+    """
+    Highest fused risk a window with this RF risk can reach (stat and IF at
+    100). With ml_risk < 100 the full weight set is the worst case: dropping
+    a component only removes a 100 from the average.
+    """
+    return fuse_risk(ml_risk, 100.0, 100.0)
+
+def ml_clear_bound(risk_threshold):
+    """RF risk below which no window can reach risk_threshold after fusion."""
+    w = FUSION_WEIGHTS["ml_prob"] / sum(FUSION_WEIGHTS.values())
+    return max(0.0, (risk_threshold - 100.0 * (1.0 - w)) / w)
@@ -0,0 +1,154 @@
+# live/alert_feed.py
+"""
+Push feed of live detector events over local HTTP server-sent events.
+
+    GET http://127.0.0.1:8765/events      text/event-stream
+
+Events (data = one JSON object):
+    alert     an alert row as logged (ALERT_FIELDS; incident open / update)
+    incident  an incident record (live/incidents.py)
+    risk      {"ts": ..., "flows": {flow: last risk}} — every flow scored
+              since the previous one, coalesced to one event per `risk_s`
+
+publish() is called from the packet path: it appends to a bounded ring
+(`history` events) and wakes the client threads, nothing else. Each client
+is served by its own thread (ThreadingHTTPServer); a client that reconnects
+with Last-Event-ID gets the events it missed, if still in the ring. Event ids
+are "<epoch>-<seq>", the epoch being fixed per feed instance: an id from an
+earlier detector process starts the client at the oldest retained event
+instead of waiting for the new sequence to catch up with the old one.
+Stdlib only; binds to localhost by default.
+"""
+
+import json
+import time
+import threading
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FEED_HOST = "127.0.0.1"
+FEED_PORT = 8765
+FEED_HISTORY = 2000
+RISK_INTERVAL_S = 1.0
+KEEPALIVE_S = 15.0
+
+def format_event(event_id, kind, data):
+    return f"id: {event_id}\nevent: {kind}\ndata: {json.dumps(data, default=float)}\n\n".encode()
+
+def parse_event_id(value, epoch):
+    """Sequence number of an "<epoch>-<seq>" id, or None if it is from another feed."""
+    ep, _, seq = (value or "").partition("-")
+    if ep != epoch or not seq.isdigit():
+        return None
+    return int(seq)
+
+class AlertFeed:
+    """SSE publisher; start() binds the server, stop() closes every stream."""
+
+    def __init__(self, host=FEED_HOST, port=FEED_PORT, history=FEED_HISTORY, risk_s=RISK_INTERVAL_S):
+        self.host = host
+        self.port = port
+        self.risk_s = risk_s
+        self.events = deque(maxlen=history)     # (seq, encoded event)
+        self.seq = 0
+        self.epoch = f"{time.time_ns():x}"
+        self.clients = 0
+        self._cond = threading.Condition()
+        self._risk = {}
+        self._risk_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._server = None
+        self._threads = []
+
+    # ---------------- publishing ----------------
+    def publish(self, kind, data):
+        with self._cond:
+            self.seq += 1
+            self.events.append((self.seq, format_event(f"{self.epoch}-{self.seq}", kind, data)))
+            self._cond.notify_all()
+
+    def update_risk(self, flow, risk):
+        """Latest risk of a flow; sent with the next coalesced "risk" event."""
+        with self._risk_lock:
+            self._risk[flow] = risk
+
+    def _flush_risk(self):
+        while not self._stop.wait(self.risk_s):
+            with self._risk_lock:
+                flows, self._risk = self._risk, {}
+            if flows:
+                self.publish("risk", {"ts": time.time(), "flows": {f: round(r, 2) for f, r in flows.items()}})
+
+    def since(self, last_seq):
+        """Encoded events after last_seq still in the ring."""
+        return [e for s, e in self.events if s > last_seq]
+
+    # ---------------- serving ----------------
+    def _handler(self):
+        feed = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                if self.path.split("?")[0] != "/events":
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Cache-Control", "no-cache")
+                self.send_header("Connection", "keep-alive")
+                self.end_headers()
+                last_id = self.headers.get("Last-Event-ID")
+                if last_id is None:
+                    last = feed.seq                 # new client: live events only
+                else:
+                    last = parse_event_id(last_id, feed.epoch)
+                    if last is None or last > feed.seq:
+                        last = 0                    # id from another feed: all retained events
+                feed.clients += 1
+                try:
+                    self.wfile.write(b": connected\n\n")
+                    self.wfile.flush()
+                    while not feed._stop.is_set():
+                        with feed._cond:
+                            if feed.seq <= last:
+                                feed._cond.wait(KEEPALIVE_S)
+                            pending = feed.since(last)
+                            last = feed.seq
+                        self.wfile.write(b"".join(pending) if pending else b": keepalive\n\n")
+                        self.wfile.flush()
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+                finally:
+                    feed.clients -= 1
+                    # the keep-alive header would otherwise hold the socket open
+                    # for another request, and the client would never reconnect
+                    self.close_connection = True
+
+        return Handler
+
+    def start(self):
+        self._server = ThreadingHTTPServer((self.host, self.port), self._handler())
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]     # port 0 → the one picked
+        self._threads = [
+            threading.Thread(target=self._server.serve_forever, name="alert-feed", daemon=True),
+            threading.Thread(target=self._flush_risk, name="alert-feed-risk", daemon=True),
+        ]
+        for t in self._threads:
+            t.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}/events"
@@ -0,0 +1,181 @@
+# live/cascade.py
+"""
+Detection cascade for the real-time detector.
+
+Tier 1 — O(1) incremental statistics (coefficient of variation of the
+         window, from live/flow_state.FlowState). Windows inside the benign
+         band are cleared without computing any features.
+Tier 2 — Random Forest on the full feature set. Windows scoring below
+         `clear_below` are cleared; the bound is capped so that a cleared
+         window could not have reached the alert threshold after fusion,
+         even with the stat and IF scores at 100 (fusion/weights.py).
+Tier 3 — Statistical tests (stats/stat_tests.py) + Isolation Forest,
+         only for windows that survived tiers 1 and 2.
+
+Thresholds are tuned offline from a labelled feature set the RF was not
+trained on (tuning on its training windows overstates how cleanly tier 2
+separates the classes):
+    python -m live.cascade features/features_<ts>.json --max-miss 0.01
+"""
+
+import os
+import sys
+import json
+import argparse
+
+import numpy as np
+
+# -------------------------------------------------
+# Ensure project root on PYTHONPATH
+# -------------------------------------------------
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(THIS_DIR, ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from fusion.weights import ml_clear_bound
+
+CASCADE_CONFIG = "models/cascade_thresholds.json"
+
+# Untuned defaults: tier 1 disabled, tier 2 clears what fusion calls "Normal"
+# (further capped by ml_clear_bound: RF risk < 20 at the default threshold 60)
+DEFAULT_CONFIG = {
+    "tier1": {"ipd_std_norm_low": None, "ipd_std_norm_high": None},
+    "tier2": {"clear_below": 30.0},
+}
+
+# ---------------- CONFIG ----------------
+def load_cascade_config(path=CASCADE_CONFIG, risk_threshold=None):
+    cfg = json.loads(json.dumps(DEFAULT_CONFIG))
+    if path and os.path.exists(path):
+        with open(path) as f:
+            user = json.load(f)
+        for tier in ("tier1", "tier2"):
+            cfg[tier].update(user.get(tier, {}))
+
+    # Never clear a window at tier 2 that could have raised an alert
+    if risk_threshold is not None:
+        cfg["tier2"]["clear_below"] = min(cfg["tier2"]["clear_below"], ml_clear_bound(risk_threshold))
+    return cfg
+
+def tier1_clears(cfg, ipd_std_norm):
+    lo = cfg["tier1"]["ipd_std_norm_low"]
+    hi = cfg["tier1"]["ipd_std_norm_high"]
+    if lo is None or hi is None:
+        return False
+    return lo <= ipd_std_norm <= hi
+
+def tier2_clears(cfg, ml_risk):
+    return ml_risk < cfg["tier2"]["clear_below"]
+
+# ---------------- REACH STATISTICS ----------------
+class CascadeStats:
+    """Counts how many scored windows reach each tier."""
+
+    def __init__(self):
+        self.reached = {"tier1": 0, "tier2": 0, "tier3": 0}
+
+    def hit(self, tier):
+        self.reached[tier] += 1
+
+    def reset(self):
+        for k in self.reached:
+            self.reached[k] = 0
+
+    def summary(self):
+        total = self.reached["tier1"]
+        return {
+            tier: {"windows": n, "fraction": (n / total) if total else 0.0}
+            for tier, n in self.reached.items()
+        }
+
+    def format(self):
+        return " | ".join(
+            f"{tier}: {s['windows']} ({s['fraction'] * 100:.1f}%)"
+            for tier, s in self.summary().items()
+        )
+
+# ---------------- OFFLINE TUNING ----------------
+def tune_tier1(cv, y, max_miss=0.01, n_quantiles=51):
+    """
+    Widest benign coefficient-of-variation band [low, high] (benign quantile
+    grid) that lets at most `max_miss` of covert windows be cleared.
+    """
+    benign, covert = cv[y == 0], cv[y == 1]
+    if len(benign) == 0:
+        return None, None, 0.0, 0.0
+
+    qs = np.unique(np.quantile(benign, np.linspace(0, 1, n_quantiles)))
+    best = (None, None, 0.0, 0.0)
+    for i, lo in enumerate(qs):
+        for hi in qs[i:]:
+            miss = np.mean((covert >= lo) & (covert <= hi)) if len(covert) else 0.0
+            if miss > max_miss:
+                continue
+            cleared = np.mean((benign >= lo) & (benign <= hi))
+            if cleared > best[2]:
+                best = (float(lo), float(hi), float(cleared), float(miss))
+    return best
+
+def tune_tier2(ml_risk, y, max_miss=0.0, risk_threshold=60.0):
+    """
+    Highest RF risk below which windows are cleared while losing at most
+    `max_miss` of the covert windows that reach tier 2, capped at the RF
+    risk that fusion could still lift to risk_threshold.
+    """
+    bound = ml_clear_bound(risk_threshold)
+    covert = np.sort(ml_risk[y == 1])
+    if len(covert) == 0:
+        return min(DEFAULT_CONFIG["tier2"]["clear_below"], bound)
+    k = int(np.floor(max_miss * len(covert)))
+    return float(min(covert[min(k, len(covert) - 1)], bound))
+
+def tune(features_json, model_path="models/rf_detector.joblib",
+         max_miss=0.01, tier2_max_miss=0.0, risk_threshold=60.0, out=CASCADE_CONFIG):
+    from models.train_model import load_features_json
+    from models.backends import load_backend
+
+    X, y = load_features_json(features_json)
+    cv = X["ipd_std_norm"].to_numpy(dtype=float)
+
+    lo, hi, cleared, miss = tune_tier1(cv, y, max_miss)
+    at_tier2 = ~((cv >= lo) & (cv <= hi)) if lo is not None else np.ones(len(y), bool)
+
+    backend = load_backend(model_path)
+    ml_risk = backend.predict_proba(X.reindex(columns=backend.columns, fill_value=0.0).to_numpy(dtype=float)) * 100
+    clear_below = tune_tier2(ml_risk[at_tier2], y[at_tier2], tier2_max_miss, risk_threshold)
+    at_tier3 = at_tier2 & (ml_risk >= clear_below)
+
+    cfg = {
+        "tier1": {"ipd_std_norm_low": lo, "ipd_std_norm_high": hi},
+        "tier2": {"clear_below": clear_below},
+        "tuned_on": os.path.basename(features_json),
+        "expected": {
+            "tier2_fraction": float(at_tier2.mean()),
+            "tier3_fraction": float(at_tier3.mean()),
+            "tier1_covert_miss": miss,
+        },
+    }
+
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(cfg, f, indent=2)
+
+    print(f"[+] Tier 1 clears ipd_std_norm in [{lo}, {hi}] ({cleared * 100:.1f}% of benign, {miss * 100:.1f}% covert miss)")
+    print(f"[+] Tier 2 clears RF risk < {clear_below:.2f}")
+    print(f"[+] Expected reach: tier2 {at_tier2.mean() * 100:.1f}% | tier3 {at_tier3.mean() * 100:.1f}%")
+    print(f"[+] Cascade thresholds saved → {out}")
+    return cfg
+
+# ---------------- MAIN ----------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tune detection cascade thresholds")
+    parser.add_argument("features_json", help="labelled features_*.json")
+    parser.add_argument("--model", default="models/rf_detector.joblib")
+    parser.add_argument("--max-miss", type=float, default=0.01, help="max fraction of covert windows tier 1 may clear")
+    parser.add_argument("--tier2-max-miss", type=float, default=0.0, help="max fraction of covert windows tier 2 may clear")
+    parser.add_argument("--risk-threshold", type=float, default=60.0)
+    parser.add_argument("--out", default=CASCADE_CONFIG)
+    args = parser.parse_args()
+
+    tune(args.features_json, args.model, args.max_miss, args.tier2_max_miss, args.risk_threshold, args.out)
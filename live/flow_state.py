@@ -0,0 +1,64 @@
+# live/flow_state.py
+"""
+Per-flow state for the real-time detector:
+- ring buffer of the last WINDOW_SIZE capture timestamps (integer ns)
+- O(1) incremental IPD statistics over the same window
+- last risk score
+"""
+
+import math
+from collections import deque
+
+NS_PER_S = 1_000_000_000
+
+class FlowState:
+    """
+    Sliding window of capture timestamps with running IPD sums.
+
+    IPDs are kept as integer nanoseconds, so the running sum and sum of
+    squares are exact Python ints: adding / evicting one IPD per packet is
+    O(1) and never drifts, however long the flow lives.
+    """
+
+    __slots__ = ("times", "ipds", "ipd_sum", "ipd_sumsq", "last_risk", "last_seen_ns")
+
+    def __init__(self, window_size):
+        self.times = deque(maxlen=window_size)
+        self.ipds = deque(maxlen=window_size - 1)
+        self.ipd_sum = 0
+        self.ipd_sumsq = 0
+        self.last_risk = None
+        self.last_seen_ns = 0
+
+    def push(self, ts_ns):
+        if self.times:
+            ipd = ts_ns - self.times[-1]
+            if len(self.ipds) == self.ipds.maxlen:
+                old = self.ipds[0]
+                self.ipd_sum -= old
+                self.ipd_sumsq -= old * old
+            self.ipds.append(ipd)
+            self.ipd_sum += ipd
+            self.ipd_sumsq += ipd * ipd
+        self.times.append(ts_ns)
+        self.last_seen_ns = ts_ns
+
+    def ready(self):
+        return len(self.times) == self.times.maxlen
+
+    # ---------------- O(1) STATISTICS ----------------
+    def ipd_mean(self):
+        n = len(self.ipds)
+        return self.ipd_sum / n / NS_PER_S if n else 0.0
+
+    def ipd_std(self):
+        n = len(self.ipds)
+        if n == 0:
+            return 0.0
+        # population variance, exact in integer ns² before the division
+        var_ns2 = (n * self.ipd_sumsq - self.ipd_sum * self.ipd_sum) / (n * n)
+        return math.sqrt(max(var_ns2, 0.0)) / NS_PER_S
+
+    def ipd_std_norm(self):
+        """Coefficient of variation, same definition as features.feature_utils."""
+        return self.ipd_std() / (self.ipd_mean() + 1e-9)
@@ -0,0 +1,142 @@
+# live/hot_reload.py
+"""
+Zero-downtime model / threshold reload for the live detector.
+
+A daemon thread polls the model artifact (the .joblib and its .mmap export)
+and the thresholds config. When one changes, it is loaded and validated in
+the background: the model's columns must be producible by the feature
+planner (features/feature_utils.FEATURE_GROUPS), and the thresholds must be
+in range. The result is staged. The packet path picks it up between packets
+(take_model / take_thresholds) and swaps it in one step, so flow state and
+capture are never interrupted. An invalid artifact or config is reported
+and the running one is kept.
+
+Thresholds config (live/thresholds.json):
+    {"risk_threshold": 60, "block_threshold": 70}
+"""
+
+import os
+import json
+import threading
+
+from features.feature_utils import groups_for, group_columns
+from models.artifacts import MANIFEST, mmap_path
+
+THRESHOLDS_CONFIG = "live/thresholds.json"
+RELOAD_INTERVAL_S = 2.0
+
+# ---------------- VALIDATION ----------------
+def validate_columns(columns):
+    """Raise ValueError if the feature planner cannot compute every column."""
+    if not columns:
+        raise ValueError("artifact has no columns")
+    plannable = set(group_columns(groups_for(columns)))
+    unknown = [c for c in columns if c not in plannable]
+    if unknown:
+        raise ValueError(f"columns not produced by any feature group: {unknown}")
+    return columns
+
+def load_thresholds(path=THRESHOLDS_CONFIG):
+    """{"risk_threshold", "block_threshold"} from the config, validated."""
+    with open(path) as f:
+        cfg = json.load(f)
+    risk = float(cfg["risk_threshold"])
+    block = float(cfg.get("block_threshold", risk))
+    if not 0.0 <= risk <= 100.0 or not 0.0 <= block <= 100.0:
+        raise ValueError(f"thresholds must be within 0–100 (risk {risk}, block {block})")
+    if block < risk:
+        raise ValueError(f"block_threshold {block} is below risk_threshold {risk}")
+    return {"risk_threshold": risk, "block_threshold": block}
+
+def file_signature(*paths):
+    """(size, mtime_ns) of every existing path; changes when any is rewritten."""
+    sig = []
+    for p in paths:
+        try:
+            st = os.stat(p)
+            sig.append((p, st.st_size, st.st_mtime_ns))
+        except OSError:
+            sig.append((p, None, None))
+    return tuple(sig)
+
+def model_signature(model_path):
+    return file_signature(model_path, os.path.join(mmap_path(model_path), MANIFEST))
+
+# ---------------- WATCHER ----------------
+class ReloadWatcher:
+    """
+    Polls `model_path` / `thresholds_path` every `interval` seconds.
+
+    prepare_model(path) loads + validates a model off the packet path and
+    returns whatever the detector installs; exceptions keep the old model.
+    """
+
+    def __init__(self, model_path, prepare_model, thresholds_path=THRESHOLDS_CONFIG,
+                 interval=RELOAD_INTERVAL_S):
+        self.model_path = model_path
+        self.thresholds_path = thresholds_path
+        self.prepare_model = prepare_model
+        self.interval = interval
+        self._model_sig = model_signature(model_path)
+        self._thr_sig = file_signature(thresholds_path)
+        self._lock = threading.Lock()
+        self._pending_model = None
+        self._pending_thresholds = None
+        self._stop = threading.Event()
+        self._thread = None
+        self.reloads = {"model": 0, "thresholds": 0, "rejected": 0}
+
+    def check_once(self):
+        """One poll: stage anything that changed and validated."""
+        sig = model_signature(self.model_path)
+        if sig != self._model_sig:
+            self._model_sig = sig
+            try:
+                staged = self.prepare_model(self.model_path)
+                with self._lock:
+                    self._pending_model = staged
+                print(f"[+] New model staged from {self.model_path}")
+            except Exception as e:
+                self.reloads["rejected"] += 1
+                print(f"[WARN] Model reload rejected, keeping the current one: {e}")
+
+        sig = file_signature(self.thresholds_path)
+        if sig != self._thr_sig:
+            self._thr_sig = sig
+            try:
+                staged = load_thresholds(self.thresholds_path)
+                with self._lock:
+                    self._pending_thresholds = staged
+            except (OSError, KeyError, ValueError) as e:
+                self.reloads["rejected"] += 1
+                print(f"[WARN] Threshold reload rejected, keeping the current ones: {e}")
+
+    def take_model(self):
+        if self._pending_model is None:   # fast path, no lock
+            return None
+        with self._lock:
+            staged, self._pending_model = self._pending_model, None
+        self.reloads["model"] += 1
+        return staged
+
+    def take_thresholds(self):
+        if self._pending_thresholds is None:
+            return None
+        with self._lock:
+            staged, self._pending_thresholds = self._pending_thresholds, None
+        self.reloads["thresholds"] += 1
+        return staged
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            self.check_once()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._loop, name="reload-watcher", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
@@ -0,0 +1,118 @@
+# live/incidents.py
+"""
+Alert aggregation into incidents.
+
+Once a flow crosses the risk threshold, every scored packet is an alert: a
+covert flow produces thousands of near-identical rows. The aggregator keeps
+one open incident per flow (first/last seen, peak and mean risk, window
+count) and emits
+    open    on the first alert of a flow
+    update  at most every `update_s` seconds per incident
+    close   after `quiet_s` seconds without an alert (or eviction / shutdown)
+All times are capture time (seconds), so replay behaves like live capture.
+
+Memory is bounded: open incidents are kept in an OrderedDict by last alert
+(oldest first), quiet ones are closed from the front as time advances, and
+past `max_open` the least recently alerting incident is closed early.
+"""
+
+from collections import OrderedDict
+
+QUIET_PERIOD_S = 60.0
+UPDATE_INTERVAL_S = 10.0
+MAX_OPEN = 10_000
+
+class Incident:
+    __slots__ = ("id", "flow", "protocol", "src_ip", "first_ts", "last_ts",
+                 "peak_risk", "risk_sum", "windows", "last_emit_ts")
+
+    def __init__(self, incident_id, flow, protocol, src_ip, ts, risk):
+        self.id = incident_id
+        self.flow = flow
+        self.protocol = protocol
+        self.src_ip = src_ip
+        self.first_ts = self.last_ts = self.last_emit_ts = ts
+        self.peak_risk = self.risk_sum = risk
+        self.windows = 1
+
+    def add(self, ts, risk):
+        self.last_ts = ts
+        self.peak_risk = max(self.peak_risk, risk)
+        self.risk_sum += risk
+        self.windows += 1
+
+    def record(self, state):
+        return {
+            "incident_id": self.id,
+            "state": state,
+            "flow": self.flow,
+            "protocol": self.protocol,
+            "src_ip": self.src_ip,
+            "first_ts": self.first_ts,
+            "last_ts": self.last_ts,
+            "peak_risk": round(self.peak_risk, 2),
+            "mean_risk": round(self.risk_sum / self.windows, 2),
+            "windows": self.windows,
+        }
+
+class IncidentAggregator:
+    """
+    observe() alerts; emit(record) is called for every open / update / close.
+    Not thread-safe: call from the packet path (the detector holds FLOW_LOCK).
+    """
+
+    def __init__(self, emit=None, quiet_s=QUIET_PERIOD_S, update_s=UPDATE_INTERVAL_S,
+                 max_open=MAX_OPEN):
+        self.emit = emit or (lambda record: None)
+        self.quiet_s = quiet_s
+        self.update_s = update_s
+        self.max_open = max_open
+        self.open = OrderedDict()
+        self.next_id = 1
+        self.counts = {"alerts": 0, "opened": 0, "updates": 0, "closed": 0, "evicted": 0}
+
+    def _close(self, incident, state="close"):
+        self.counts["closed"] += 1
+        self.emit(incident.record(state))
+
+    def observe(self, flow, protocol, src_ip, ts, risk):
+        """Add one alert; returns the flow's incident."""
+        self.counts["alerts"] += 1
+        self.expire(ts)
+        incident = self.open.get(flow)
+        if incident is None:
+            incident = Incident(self.next_id, flow, protocol, src_ip, ts, risk)
+            self.next_id += 1
+            self.open[flow] = incident
+            self.counts["opened"] += 1
+            self.emit(incident.record("open"))
+            while len(self.open) > self.max_open:
+                _, oldest = self.open.popitem(last=False)
+                self.counts["evicted"] += 1
+                self._close(oldest, "evicted")
+            return incident
+
+        incident.add(ts, risk)
+        self.open.move_to_end(flow)
+        if ts - incident.last_emit_ts >= self.update_s:
+            incident.last_emit_ts = ts
+            self.counts["updates"] += 1
+            self.emit(incident.record("update"))
+        return incident
+
+    def expire(self, now_ts):
+        """Close incidents quiet for longer than quiet_s (cheap: looks at the oldest only)."""
+        closed = 0
+        while self.open:
+            incident = next(iter(self.open.values()))
+            if now_ts - incident.last_ts <= self.quiet_s:
+                break
+            del self.open[incident.flow]
+            self._close(incident)
+            closed += 1
+        return closed
+
+    def close_all(self):
+        while self.open:
+            _, incident = self.open.popitem(last=False)
+            self._close(incident)
@@ -3,29 +3,58 @@
 Real-time packet capture for covert timing detection
 """
 
-import time
+import os
+import sys
+
+# -------------------------------------------------
+# Ensure project root on PYTHONPATH
+# -------------------------------------------------
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(THIS_DIR, ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+import argparse
 import pandas as pd
-from scapy.all import sniff, IP
+from scapy.sendrecv import sniff
+from scapy.layers.inet import IP
 from collections import defaultdict
 
+from capture.capture_utils import (
+    DEFAULT_BPF,
+    resolve_bpf,
+    flow_sampled,
+    packet_time_ns,
+    ns_to_s,
+    add_capture_args
+)
+
 packets = defaultdict(list)
+SAMPLE_N = 1
 
 def handle_packet(pkt):
     if IP in pkt:
         flow = f"{pkt[IP].src}_{pkt[IP].dst}"
-        packets[flow].append(time.time())
+        if not flow_sampled(flow, SAMPLE_N):
+            return
+        packets[flow].append(packet_time_ns(pkt))
+
+def start_capture(duration=30, iface=None, bpf=DEFAULT_BPF, sample_n=1):
+    global SAMPLE_N
+    SAMPLE_N = sample_n
 
-def start_capture(duration=30):
+    bpf = resolve_bpf(bpf)
     print(f"[+] Capturing live traffic for {duration} seconds...")
-    sniff(prn=handle_packet, timeout=duration)
+    print(f"[+] BPF filter: {bpf or 'none'} | sampling 1/{sample_n} flows")
+    sniff(prn=handle_packet, timeout=duration, iface=iface, filter=bpf, store=False)
 
     rows = []
     for flow, times in packets.items():
         for i in range(1, len(times)):
             rows.append({
                 "flow": flow,
-                "ts": times[i],
-                "ipd": times[i] - times[i-1]
+                "ts": ns_to_s(times[i]),
+                "ipd": ns_to_s(times[i] - times[i-1])
             })
 
     df = pd.DataFrame(rows)
@@ -33,4 +62,8 @@ def start_capture(duration=30):
     print("[+] Live IPD data saved → live/live_ipd.csv")
 
 if __name__ == "__main__":
-    start_capture()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--duration", type=int, default=30, help="capture duration (seconds)")
+    add_capture_args(parser)
+    args = parser.parse_args()
+    start_capture(args.duration, args.iface, args.bpf, args.sample)
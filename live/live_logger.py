@@ -3,44 +3,81 @@
 Continuous live packet logger for covert timing analysis
 """
 
-import time
+import os
+import sys
+
+# -------------------------------------------------
+# Ensure project root on PYTHONPATH
+# -------------------------------------------------
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(THIS_DIR, ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
 import csv
+import argparse
 from collections import defaultdict, deque
-from scapy.all import sniff, IP
+from scapy.layers.inet import IP
+
+from capture.capture_utils import (
+    DEFAULT_BPF,
+    resolve_bpf,
+    flow_sampled,
+    packet_time_ns,
+    ns_to_s,
+    add_capture_args
+)
 
 LOG_FILE = "live/live_ipd_log.csv"
 WINDOW_SIZE = 50
+SAMPLE_N = 1
 
 buffers = defaultdict(lambda: deque(maxlen=WINDOW_SIZE))
 
-# Initialize CSV
-with open(LOG_FILE, "w", newline="") as f:
-    writer = csv.writer(f)
-    writer.writerow(["timestamp", "flow", "ipd"])
-
 last_seen = {}
 
+def init_log():
+    """Start a fresh log (only when capture starts, never at import)."""
+    with open(LOG_FILE, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["timestamp", "flow", "ipd"])
+
 def handle_packet(pkt):
     if IP not in pkt:
         return
 
     flow = f"{pkt[IP].src}_{pkt[IP].dst}_{pkt.proto}"
-    now = time.time()
+    if not flow_sampled(flow, SAMPLE_N):
+        return
+
+    # Capture timestamp (ns), not callback wall-clock time
+    now_ns = packet_time_ns(pkt)
 
     if flow in last_seen:
-        ipd = now - last_seen[flow]
+        ipd = ns_to_s(now_ns - last_seen[flow])
         buffers[flow].append(ipd)
 
         # Log continuously
         with open(LOG_FILE, "a", newline="") as f:
             writer = csv.writer(f)
-            writer.writerow([now, flow, ipd])
+            writer.writerow([ns_to_s(now_ns), flow, ipd])
+
+    last_seen[flow] = now_ns
+
+def start_live_capture(iface=None, bpf=DEFAULT_BPF, sample_n=1):
+    global SAMPLE_N
+    SAMPLE_N = sample_n
 
-    last_seen[flow] = now
+    from scapy.sendrecv import sniff
 
-def start_live_capture():
+    bpf = resolve_bpf(bpf)
+    init_log()
     print("[+] Starting continuous packet capture...")
-    sniff(prn=handle_packet, store=False)
+    print(f"[+] BPF filter: {bpf or 'none'} | sampling 1/{sample_n} flows")
+    sniff(prn=handle_packet, store=False, iface=iface, filter=bpf)
 
 if __name__ == "__main__":
-    start_live_capture()
+    parser = argparse.ArgumentParser()
+    add_capture_args(parser)
+    args = parser.parse_args()
+    start_live_capture(args.iface, args.bpf, args.sample)
@@ -0,0 +1,100 @@
+# live/perf.py
+"""
+Lightweight per-stage latency bookkeeping for the live pipeline.
+Samples are kept in bounded ring buffers so long runs do not grow memory.
+"""
+
+import time
+from collections import defaultdict, deque
+
+import numpy as np
+
+MAX_SAMPLES = 100_000
+
+class LatencyStats:
+    """
+    Per-stage latency samples (nanoseconds) with percentile summaries.
+
+        stats = LatencyStats()
+        t0 = time.perf_counter_ns()
+        ...
+        stats.add("features", time.perf_counter_ns() - t0)
+        stats.summary()  # {"features": {"count": .., "p50_us": .., ...}}
+    """
+
+    def __init__(self, max_samples=MAX_SAMPLES):
+        self.samples = defaultdict(lambda: deque(maxlen=max_samples))
+        self.counts = defaultdict(int)
+
+    def add(self, stage, elapsed_ns):
+        self.samples[stage].append(elapsed_ns)
+        self.counts[stage] += 1
+
+    def reset(self):
+        self.samples.clear()
+        self.counts.clear()
+
+    def summary(self):
+        out = {}
+        for stage, dq in self.samples.items():
+            if not dq:
+                continue
+            arr = np.fromiter(dq, dtype=np.int64, count=len(dq)) / 1e3
+            out[stage] = {
+                "count": self.counts[stage],
+                "mean_us": float(arr.mean()),
+                "p50_us": float(np.percentile(arr, 50)),
+                "p99_us": float(np.percentile(arr, 99)),
+                "max_us": float(arr.max()),
+            }
+        return out
+
+    def format(self):
+        lines = [f"{'stage':12s} {'count':>9s} {'mean µs':>10s} {'p50 µs':>10s} {'p99 µs':>10s} {'max µs':>10s}"]
+        for stage, s in self.summary().items():
+            lines.append(
+                f"{stage:12s} {s['count']:9d} {s['mean_us']:10.1f} "
+                f"{s['p50_us']:10.1f} {s['p99_us']:10.1f} {s['max_us']:10.1f}"
+            )
+        return "\n".join(lines)
+
+def now_ns():
+    return time.perf_counter_ns()
+
+# ---------------- MEMORY ----------------
+SMAPS_FIELDS = {"Rss": "rss_kb", "Pss": "pss_kb", "Shared_Clean": "shared_clean_kb",
+                "Shared_Dirty": "shared_dirty_kb", "Private_Clean": "private_clean_kb",
+                "Private_Dirty": "private_dirty_kb"}
+
+def memory_usage(pid="self"):
+    """
+    Resident memory of a process in KB, from /proc/<pid>/smaps_rollup:
+    rss, pss (shared pages divided among the processes mapping them) and
+    shared / private pages. PSS is what one more worker really costs.
+    Falls back to VmRSS from /proc/<pid>/status; None off Linux.
+    """
+    out = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                key, _, rest = line.partition(":")
+                if key in SMAPS_FIELDS:
+                    out[SMAPS_FIELDS[key]] = int(rest.split()[0])
+        return out
+    except OSError:
+        pass
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    out["rss_kb"] = int(line.split()[1])
+        return out or None
+    except OSError:
+        return None
+
+def format_memory(mem):
+    parts = [f"RSS {mem['rss_kb'] / 1024:.1f} MB"]
+    if "pss_kb" in mem:
+        shared = mem.get("shared_clean_kb", 0) + mem.get("shared_dirty_kb", 0)
+        parts += [f"PSS {mem['pss_kb'] / 1024:.1f} MB", f"shared {shared / 1024:.1f} MB"]
+    return " | ".join(parts)
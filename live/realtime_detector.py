@@ -2,75 +2,255 @@
 """
 Real-Time Covert Channel Detector with:
 - Protocol-aware labeling (TCP, UDP, ICMP, HTTP, HTTPS, SSL)
-- Risk-based alerting
+- Detection cascade (O(1) screen → RF → stat tests + Isolation Forest)
+- Streaming risk fusion (same weights as fusion/risk_engine.py)
+- Risk-based alerting, aggregated into per-flow incidents (live/incidents.py)
+- Model / threshold hot reload (live/hot_reload.py)
+- Flow-table snapshots for warm restarts (live/snapshot.py)
+- Batched alert writes to the indexed store (storage/alert_store.py)
+- Server-sent event feed of alerts / incidents / flow risk (live/alert_feed.py)
 - Platform-safe auto-blocking (Linux real / Windows simulated)
 """
 
-import time
 import csv
 import os
+import argparse
 import platform
 import subprocess
-import joblib
+import threading
 import numpy as np
-import pandas as pd
 from collections import defaultdict
-from scapy.all import sniff, TCP, UDP, ICMP
 
-from features.feature_utils import (
-    compute_basic_features,
-    fft_features,
-    autocorr_features,
-    entropy_features
+# scapy, pandas, scipy, sklearn and the model artifacts are imported / loaded
+# on first use, so importing this module (tests, replay, --help) stays cheap
+
+from features.feature_utils import compute_features, groups_for
+from capture.capture_utils import (
+    DEFAULT_BPF,
+    resolve_bpf,
+    flow_sampled,
+    sample_rate,
+    packet_time_ns,
+    ns_to_s,
+    ipds_from_ns,
+    add_capture_args
+)
+from models.artifacts import load_model_artifact
+from models.compiled_forest import ensure_compiled, iforest_score_samples
+from models.iforest_calibration import calibrated_risk, resolve_calibration
+from live.perf import LatencyStats, now_ns, memory_usage, format_memory
+from fusion.weights import fuse_risk
+from models.backends import load_backend
+from live.flow_state import FlowState, NS_PER_S
+from live.snapshot import (
+    SNAPSHOT_PATH,
+    SNAPSHOT_INTERVAL_S,
+    IDLE_TIMEOUT_S,
+    SnapshotWriter,
+    evict_idle,
+    load_snapshot
+)
+from storage.alert_store import DB_PATH, BatchWriter
+from live.incidents import IncidentAggregator, QUIET_PERIOD_S, UPDATE_INTERVAL_S
+from live.alert_feed import AlertFeed, FEED_PORT
+from live.hot_reload import (
+    THRESHOLDS_CONFIG,
+    RELOAD_INTERVAL_S,
+    ReloadWatcher,
+    load_thresholds,
+    validate_columns
+)
+from live.cascade import (
+    CASCADE_CONFIG,
+    CascadeStats,
+    load_cascade_config,
+    tier1_clears,
+    tier2_clears
 )
 
 # ---------------- CONFIG ----------------
 MODEL_PATH = "models/rf_detector.joblib"
-ALERT_LOG = "live/alerts.csv"
+IFOREST_PATH = "models/iforest_detector.joblib"
+ALERT_STORE = DB_PATH
+ALERT_LOG = None        # optional CSV copy of the alerts (--alert-csv; replay sets its own)
 
 WINDOW_SIZE = 40
+# Defaults; live/thresholds.json overrides them at start-up and on change
 RISK_THRESHOLD = 60
 BLOCK_THRESHOLD = 70
-
-buffers = defaultdict(list)
+AUTO_BLOCK = True   # disabled in replay mode
+
+# Per-window latency budget: tier-3 components that would start after the
+# deadline are skipped and fusion renormalises over what was computed
+LATENCY_BUDGET_MS = 50.0
+
+# Capture-side options (overridable from the CLI)
+BPF_FILTER = DEFAULT_BPF
+SAMPLE_N = 1    # analyse 1/N flows (deterministic flow hash)
+
+# Per-flow ring buffer of capture timestamps + incremental IPD statistics
+buffers = defaultdict(lambda: FlowState(WINDOW_SIZE))
+# Held while a packet updates `buffers`; the snapshot thread copies under it
+FLOW_LOCK = threading.Lock()
+# Flows idle for longer than this (capture clock) are dropped by a sweep
+# every tenth of the timeout, so a long capture keeps a bounded table
+IDLE_TIMEOUT = IDLE_TIMEOUT_S
+next_sweep_ns = 0
+evicted_flows = 0
 blocked_ips = set()
 
+# Per-stage latency samples (tier1 / features / model / tier3 / alert / packet)
+STAGES = LatencyStats()
+
+# Detection cascade thresholds + tier reach counters
+CASCADE = load_cascade_config(CASCADE_CONFIG, RISK_THRESHOLD)
+CASCADE_STATS = CascadeStats()
+
 # ---------------- LOAD MODEL ----------------
-model_bundle = joblib.load(MODEL_PATH)
-rf = model_bundle["model"]
-scaler = model_bundle["scaler"]
-RF_COLS = model_bundle["columns"]
+# Loaded by run() before capture starts (or on the first scored window).
+# An up-to-date models/<name>.mmap/ export (models/artifacts.py) is preferred:
+# its compiled arrays are memory-mapped, so concurrent detector processes
+# share one copy in the page cache
+model_bundle = None
+# Tier-2 backend (models/backends.py: compiled RF, rf, hgb, logreg)
+BACKEND = None
+RF_COLS = []
+# Feature groups the model needs; groups a pruned model dropped are never computed
+RF_GROUPS = []
+
+def check_model_budget(backend, budget_ms):
+    """
+    Refuse a backend whose recorded single-row p99 (models/backends.py
+    selection) does not fit the per-window budget. Artifacts without
+    metadata are accepted.
+    """
+    declared = backend.declared_latency()
+    if declared and declared["row_p99_us"] / 1e3 > budget_ms:
+        raise RuntimeError(
+            f"{backend.name} backend p99 {declared['row_p99_us'] / 1e3:.2f} ms exceeds the "
+            f"{budget_ms:g} ms window budget; reselect with models/backends.py --budget-ms"
+        )
+
+def prepare_model(path):
+    """
+    Load + validate a tier-2 artifact without installing it. Raises if its
+    columns cannot be planned or it does not fit the latency budget.
+    """
+    bundle = load_model_artifact(path)
+    backend = load_backend(bundle)
+    validate_columns(backend.columns)
+    check_model_budget(backend, LATENCY_BUDGET_MS)
+    backend.predict_one(np.zeros(len(backend.columns)))   # warm up off the packet path
+    return bundle, backend, groups_for(backend.columns)
+
+def install_model(prepared):
+    global model_bundle, BACKEND, RF_COLS, RF_GROUPS
+    bundle, backend, groups = prepared
+    BACKEND, RF_COLS, RF_GROUPS = backend, backend.columns, groups
+    model_bundle = bundle
+
+def load_model():
+    if model_bundle is None:
+        install_model(prepare_model(MODEL_PATH))
+    return model_bundle
+
+# ---------------- HOT RELOAD ----------------
+# Started by run() for live capture; swaps are applied by process_packet
+WATCHER = None
+
+def set_thresholds(risk, block):
+    global RISK_THRESHOLD, BLOCK_THRESHOLD, CASCADE
+    RISK_THRESHOLD, BLOCK_THRESHOLD = risk, block
+    CASCADE = load_cascade_config(CASCADE_CONFIG, RISK_THRESHOLD)
+
+def load_threshold_config(path=THRESHOLDS_CONFIG):
+    if os.path.exists(path):
+        t = load_thresholds(path)
+        set_thresholds(t["risk_threshold"], t["block_threshold"])
+
+def apply_reloads():
+    """Install a staged model / thresholds; called between packets."""
+    prepared = WATCHER.take_model()
+    if prepared is not None:
+        install_model(prepared)
+        print(f"[+] Model reloaded ({prepared[1].name}, {len(RF_COLS)} columns)")
+    thresholds = WATCHER.take_thresholds()
+    if thresholds is not None:
+        set_thresholds(thresholds["risk_threshold"], thresholds["block_threshold"])
+        print(f"[+] Thresholds reloaded: risk {RISK_THRESHOLD:g}, block {BLOCK_THRESHOLD:g}")
+
+# Tier-3 assets (Isolation Forest + baseline profile) are loaded on first use
+fusion_assets = None
+budget_skips = 0
+
+def load_fusion_assets():
+    global fusion_assets
+    if fusion_assets is None:
+        from fusion.profiles import PROFILE_PATH, load_profile
+
+        fusion_assets = {"iforest": None, "calibration": None, "profile": load_profile(PROFILE_PATH)}
+        if fusion_assets["profile"] is None:
+            print(f"[WARN] {PROFILE_PATH} not found (build it with fusion/profiles.py), "
+                  "fusion runs without the statistical score")
+
+        if os.path.exists(IFOREST_PATH):
+            bundle = load_model_artifact(IFOREST_PATH)
+            calibration = resolve_calibration(bundle, fusion_assets["profile"])
+            if calibration is not None:
+                # score through the compiled trees (bit-exact with score_samples)
+                fusion_assets["iforest"] = {**bundle, "compiled": ensure_compiled(bundle)}
+                fusion_assets["calibration"] = calibration
+                fusion_assets["groups"] = groups_for(bundle["columns"])
+        if fusion_assets["iforest"] is None:
+            print("[WARN] Isolation Forest or its calibration missing, fusion runs without it")
+    return fusion_assets
 
 # ---------------- PROTOCOL DETECTION ----------------
-def detect_protocol(pkt):
+IP_PROTO_NAMES = {1: "ICMP", 6: "TCP", 17: "UDP"}
+
+def protocol_label(proto, sport=None, dport=None):
     """
-    Returns protocol label based on packet layers and ports
+    Protocol label from a transport name / IP protocol number and ports.
+    Shared by live packets and replayed capture rows.
     """
-    if pkt.haslayer(ICMP):
-        return "ICMP"
+    if isinstance(proto, (int, np.integer)) or str(proto).isdigit():
+        proto = IP_PROTO_NAMES.get(int(proto), "OTHER")
+    proto = str(proto).upper()
 
-    if pkt.haslayer(TCP):
-        sport = pkt[TCP].sport
-        dport = pkt[TCP].dport
+    if proto == "ICMP":
+        return "ICMP"
 
+    if proto == "TCP":
         if sport == 80 or dport == 80:
             return "HTTP"
         if sport == 443 or dport == 443:
             return "HTTPS"
-        if sport == 443 or dport == 443:
-            return "SSL"
         return "TCP"
 
-    if pkt.haslayer(UDP):
-        sport = pkt[UDP].sport
-        dport = pkt[UDP].dport
-
+    if proto == "UDP":
         if sport == 53 or dport == 53:
             return "DNS"
         return "UDP"
 
     return "OTHER"
 
+def detect_protocol(pkt):
+    """
+    Returns protocol label based on packet layers and ports
+    """
+    from scapy.layers.inet import TCP, UDP, ICMP
+
+    if pkt.haslayer(ICMP):
+        return "ICMP"
+
+    if pkt.haslayer(TCP):
+        return protocol_label("TCP", pkt[TCP].sport, pkt[TCP].dport)
+
+    if pkt.haslayer(UDP):
+        return protocol_label("UDP", pkt[UDP].sport, pkt[UDP].dport)
+
+    return "OTHER"
+
 # ---------------- AUTO BLOCK ----------------
 # ---------------- BLOCK IP (Windows Firewall) ----------------
 def block_ip(ip):
@@ -106,27 +286,210 @@ def block_ip(ip):
 
 
 # ---------------- LOG ALERT ----------------
+ALERT_FIELDS = [
+    "timestamp",
+    "flow",
+    "protocol",
+    "final_risk",
+    "ml_prob",
+    "stat_score",
+    "iforest_risk",
+    "sample_rate"
+]
+
+ALERT_LOG_VERSION = 2     # sample_rate column added
+
+def resolve_alert_log(path):
+    """
+    Alert CSV to append to: `path`, or a versioned sibling when `path` holds
+    an older column layout. The old log is left as it is (it may be tracked)
+    and appended rows never end up under the wrong header.
+    """
+    if not path or not os.path.exists(path):
+        return path
+    with open(path, newline="") as f:
+        header = next(csv.reader(f), [])
+    if not header or header == ALERT_FIELDS:
+        return path
+    root, ext = os.path.splitext(path)
+    current = f"{root}_v{ALERT_LOG_VERSION}{ext}"
+    print(f"[!] {path} has an older column layout, alerts go to {current}")
+    return current
+
+# Started by run() for live capture: alerts are queued and inserted in batches,
+# and pushed to dashboards subscribed to the feed
+ALERT_SINK = None
+FEED = None
+
+def emit_incident(record):
+    if record["state"] != "update":
+        print(f"[INCIDENT] #{record['incident_id']} {record['state']} {record['flow']} | "
+              f"peak={record['peak_risk']:.2f} mean={record['mean_risk']:.2f} windows={record['windows']}")
+    if ALERT_SINK is not None:
+        ALERT_SINK.put_incident(record)
+    if FEED is not None:
+        FEED.publish("incident", record)
+
+# One open incident per alerting flow; alert rows are logged on incident
+# open / update only, not for every scored packet
+INCIDENTS = IncidentAggregator(emit_incident)
+
 def log_alert(row):
+    if ALERT_SINK is not None:
+        ALERT_SINK.put(row)
+    if FEED is not None:
+        FEED.publish("alert", row)
+    if not ALERT_LOG:
+        return
     exists = os.path.exists(ALERT_LOG)
 
     with open(ALERT_LOG, "a", newline="") as f:
-        writer = csv.DictWriter(
-            f,
-            fieldnames=[
-                "timestamp",
-                "flow",
-                "protocol",
-                "final_risk",
-                "ml_prob",
-                "stat_score",
-                "iforest_risk"
-            ]
-        )
+        writer = csv.DictWriter(f, fieldnames=ALERT_FIELDS)
         if not exists:
             writer.writeheader()
         writer.writerow(row)
 
+# ---------------- FEATURES ----------------
+def window_features(ipds, groups=None, feats=None):
+    """
+    Timing features for one window of IPDs (seconds), same definitions as
+    features/feature_extractor.py. Only `groups` are computed (default all);
+    groups already in `feats` are kept.
+    """
+    return compute_features(ipds, groups, feats)
+
+# ---------------- SCORING ----------------
+def iforest_window_risk(feats, assets, ipds=None):
+    """Calibrated Isolation Forest risk (0–100) of a single window."""
+    bundle = assets["iforest"]
+    if ipds is not None:
+        # groups the RF did not need (pruned model) but the IF does
+        window_features(ipds, assets["groups"], feats)
+    x = np.array([feats.get(c, 0.0) for c in bundle["columns"]], dtype=np.float64)
+    scores = iforest_score_samples(bundle["compiled"], x)
+    return float(calibrated_risk(scores, assets["calibration"])[0])
+
+def tier3_scores(feats, ipds, deadline_ns):
+    """
+    Suspicion score and IF risk for fusion, cheapest first. Components that
+    would start after the deadline are returned as NaN (skipped).
+    """
+    global budget_skips
+    from stats.stat_tests import window_stat_scores
+
+    assets = load_fusion_assets()
+    stat_score = iforest_risk = np.nan
+
+    if assets["profile"] is not None and ipds is not None:
+        if now_ns() < deadline_ns:
+            stat_score = window_stat_scores(ipds, assets["profile"])["suspicion_score"]
+        else:
+            budget_skips += 1
+
+    if assets["iforest"] is not None:
+        if now_ns() < deadline_ns:
+            iforest_risk = iforest_window_risk(feats, assets, ipds)
+        else:
+            budget_skips += 1
+
+    return stat_score, iforest_risk
+
+def score_window(flow, proto_label, src_ip, ts_ns, feats, ipds=None, t_start=None):
+    # Tier 2: supervised model (default: compiled Random Forest)
+    t0 = now_ns()
+    deadline_ns = (t_start or t0) + int(LATENCY_BUDGET_MS * 1e6)
+    CASCADE_STATS.hit("tier2")
+    if model_bundle is None:
+        load_model()
+    x = np.array([feats.get(c, 0.0) for c in RF_COLS], dtype=np.float64)
+    ml_prob = BACKEND.predict_one(x)
+    final_risk = ml_prob * 100
+    t1 = now_ns()
+    STAGES.add("model", t1 - t0)
+
+    if tier2_clears(CASCADE, final_risk):
+        return final_risk
+
+    # Tier 3: statistical tests + Isolation Forest, fused with the RF
+    CASCADE_STATS.hit("tier3")
+    stat_score, iforest_risk = tier3_scores(feats, ipds, deadline_ns)
+    final_risk = fuse_risk(ml_prob * 100, stat_score, iforest_risk)
+    t2 = now_ns()
+    STAGES.add("tier3", t2 - t1)
+
+    if final_risk >= RISK_THRESHOLD:
+        ts = ns_to_s(ts_ns)
+        incident = INCIDENTS.observe(flow, proto_label, src_ip, ts, final_risk)
+        if incident.last_emit_ts == ts:
+            log_alert({
+                "timestamp": ts,
+                "flow": flow,
+                "protocol": proto_label,
+                "final_risk": round(final_risk, 2),
+                "ml_prob": round(ml_prob * 100, 2),
+                "stat_score": "" if np.isnan(stat_score) else round(stat_score, 2),
+                "iforest_risk": "" if np.isnan(iforest_risk) else round(iforest_risk, 2),
+                "sample_rate": sample_rate(SAMPLE_N)
+            })
+
+        if AUTO_BLOCK and final_risk >= BLOCK_THRESHOLD:
+            block_ip(src_ip)
+
+        STAGES.add("alert", now_ns() - t2)
+
+    return final_risk
+
 # ---------------- PACKET HANDLER ----------------
+def process_packet(flow, proto_label, src_ip, ts_ns):
+    """
+    Detection pipeline for one packet, keyed by its capture timestamp (ns).
+    Independent of how the packet was obtained (sniff callback, replay, ...).
+    """
+    with FLOW_LOCK:
+        return _process_packet(flow, proto_label, src_ip, ts_ns)
+
+def _process_packet(flow, proto_label, src_ip, ts_ns):
+    t0 = now_ns()
+    if WATCHER is not None:
+        apply_reloads()
+    if ts_ns >= next_sweep_ns:
+        sweep_idle_flows(ts_ns)
+    state = buffers[flow]
+    state.push(ts_ns)
+
+    if INCIDENTS.open:
+        INCIDENTS.expire(ns_to_s(ts_ns))
+
+    if not state.ready():
+        return None
+
+    # Tier 1: O(1) incremental screen, no feature computation
+    CASCADE_STATS.hit("tier1")
+    if tier1_clears(CASCADE, state.ipd_std_norm()):
+        state.last_risk = 0.0
+        STAGES.add("tier1", now_ns() - t0)
+        return 0.0
+    t1 = now_ns()
+    STAGES.add("tier1", t1 - t0)
+
+    if model_bundle is None:
+        load_model()
+    ipds = ipds_from_ns(state.times)
+    feats = window_features(ipds, RF_GROUPS)
+    STAGES.add("features", now_ns() - t1)
+
+    risk = score_window(flow, proto_label, src_ip, ts_ns, feats, ipds, t_start=t0)
+    state.last_risk = risk
+    if FEED is not None:
+        FEED.update_risk(flow, risk)
+    STAGES.add("packet", now_ns() - t0)
+    return risk
+
+def sweep_idle_flows(ts_ns):
+    global next_sweep_ns, evicted_flows
+    evicted_flows += evict_idle(buffers, ts_ns, IDLE_TIMEOUT)
+    next_sweep_ns = ts_ns + int(IDLE_TIMEOUT * NS_PER_S / 10)
+
 def handle_packet(pkt):
     if not pkt.haslayer("IP"):
         return
@@ -135,52 +498,137 @@ def handle_packet(pkt):
     proto_label = detect_protocol(pkt)
 
     flow = f"{ip.src}_{ip.dst}_{proto_label}"
-    now = time.time()
-
-    buffers[flow].append(now)
-
-    if len(buffers[flow]) < WINDOW_SIZE:
+    if not flow_sampled(flow, SAMPLE_N):
         return
 
-    times = np.array(buffers[flow][-WINDOW_SIZE:])
-    ipds = np.diff(times)
-
-    feats = {}
-    feats.update(compute_basic_features(ipds))
-    feats.update(fft_features(ipds))
-    feats.update(autocorr_features(ipds))
-    feats.update(entropy_features(ipds))
-
-    X = pd.DataFrame([feats])
-    X = X.reindex(columns=RF_COLS, fill_value=0.0)
-    Xs = scaler.transform(X)
+    # Capture time, not callback time: queueing delay must not skew IPDs
+    process_packet(flow, proto_label, ip.src, packet_time_ns(pkt))
 
-    ml_prob = rf.predict_proba(Xs)[0, 1]
-    final_risk = ml_prob * 100
-
-    stat_score = feats.get("ipd_entropy", 0) * 10
-    iforest_risk = feats.get("ipd_std_norm", 0) * 100
-
-    if final_risk >= RISK_THRESHOLD:
-        print(f"[ALERT] {flow} | risk={final_risk:.2f}")
+# ---------------- WARM RESTART ----------------
+def restore_flows(path=SNAPSHOT_PATH, idle_timeout_s=IDLE_TIMEOUT_S, now_ns=None):
+    """Refill `buffers` from a flow snapshot, so restored flows score at once."""
+    if not os.path.exists(path):
+        return None
+    try:
+        restored, stats = load_snapshot(path, WINDOW_SIZE, idle_timeout_s, now_ns)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"[WARN] Flow snapshot {path} not restored: {e}")
+        return None
+    with FLOW_LOCK:
+        buffers.update(restored)
+    print(f"[+] Restored {stats['flows']} flows from {path} in {stats['restore_ms']:.1f} ms "
+          f"({stats['expired']} idle > {idle_timeout_s:g} s dropped)")
+    return stats
 
-        log_alert({
-            "timestamp": now,
-            "flow": flow,
-            "protocol": proto_label,
-            "final_risk": round(final_risk, 2),
-            "ml_prob": round(ml_prob * 100, 2),
-            "stat_score": round(stat_score, 2),
-            "iforest_risk": round(iforest_risk, 2)
-        })
+# ---------------- MAIN ----------------
+def run(iface=None, bpf=BPF_FILTER, sample_n=SAMPLE_N, replay=None, speed=1.0, report=None,
+        thresholds=THRESHOLDS_CONFIG, reload_s=RELOAD_INTERVAL_S,
+        snapshot=SNAPSHOT_PATH, snapshot_s=SNAPSHOT_INTERVAL_S, idle_timeout_s=IDLE_TIMEOUT_S,
+        store=ALERT_STORE, alert_csv=None, retain_days=None,
+        incident_quiet_s=QUIET_PERIOD_S, incident_update_s=UPDATE_INTERVAL_S, feed_port=FEED_PORT):
+    global SAMPLE_N, WATCHER, ALERT_SINK, ALERT_LOG, INCIDENTS, FEED, IDLE_TIMEOUT
+    SAMPLE_N = sample_n
+    IDLE_TIMEOUT = idle_timeout_s
+    INCIDENTS = IncidentAggregator(emit_incident, incident_quiet_s, incident_update_s)
+    load_threshold_config(thresholds)
+
+    # Preload so the first scored window does not pay for it
+    load_model()
+    load_fusion_assets()
+
+    mem = memory_usage()
+    if mem:
+        print(f"[+] Models loaded, {format_memory(mem)}")
+
+    if replay:
+        from live.replay import replay_file
+        replay_file(replay, speed=speed, report_path=report)
+        return
 
-        if final_risk >= BLOCK_THRESHOLD:
-            block_ip(ip.src)
+    from scapy.sendrecv import sniff
+
+    bpf = resolve_bpf(bpf)
+    ALERT_LOG = resolve_alert_log(alert_csv)
+    if store:
+        max_age = retain_days * 86400 if retain_days else None
+        ALERT_SINK = BatchWriter(store, max_age_s=max_age)
+    if feed_port:
+        try:
+            FEED = AlertFeed(port=feed_port).start()
+            print(f"[+] Alert feed: {FEED.url}")
+        except OSError as e:
+            print(f"[WARN] Alert feed not started on port {feed_port}: {e}")
+
+    if reload_s > 0:
+        WATCHER = ReloadWatcher(MODEL_PATH, prepare_model, thresholds, reload_s).start()
+    writer = None
+    if snapshot and snapshot_s > 0:
+        restore_flows(snapshot, idle_timeout_s)
+        writer = SnapshotWriter(buffers, FLOW_LOCK, WINDOW_SIZE, snapshot, snapshot_s).start()
 
-# ---------------- MAIN ----------------
-def run():
     print("[+] Real-time detection started")
-    sniff(prn=handle_packet, store=False)
+    print(f"[+] BPF filter: {bpf or 'none'} | sampling 1/{sample_n} flows | "
+          f"risk ≥ {RISK_THRESHOLD:g}, block ≥ {BLOCK_THRESHOLD:g}")
+    sniff(prn=handle_packet, store=False, iface=iface, filter=bpf)
+
+    if WATCHER is not None:
+        WATCHER.stop()
+        print(f"[+] Hot reloads: {WATCHER.reloads}")
+    with FLOW_LOCK:
+        INCIDENTS.close_all()
+    print(f"[+] Incidents: {INCIDENTS.counts}")
+    if FEED is not None:
+        FEED.stop()
+    if ALERT_SINK is not None:
+        ALERT_SINK.close()
+        print(f"[+] Alert store: {ALERT_SINK.written} alerts, {ALERT_SINK.incidents} incident updates "
+              f"in {ALERT_SINK.batches} batches → {store}")
+    if writer is not None:
+        last = writer.stop()
+        if last:
+            print(f"[+] Flow snapshot: {last['flows']} flows, {last['bytes'] / 1024:.0f} KB → {snapshot} "
+                  f"(copy {last['copy_ms']:.1f} ms, write {last['write_ms']:.1f} ms; {writer.count} snapshots)")
+
+    print(f"[+] Idle flows evicted: {evicted_flows} ({len(buffers)} in the table)")
+    print("\n[+] Cascade reach: " + CASCADE_STATS.format())
+    print(f"[+] Tier-3 components skipped by the {LATENCY_BUDGET_MS:g} ms budget: {budget_skips}")
+    print("[+] Per-stage latency:\n" + STAGES.format())
+    declared = BACKEND.declared_latency() if BACKEND else None
+    if declared:
+        print(f"[+] {BACKEND.name} declared p99 {declared['row_p99_us']:.0f} µs")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Real-time covert channel detector")
+    add_capture_args(parser)
+    parser.add_argument("--replay", help="replay a pcap/pcapng or capture/*.csv instead of sniffing")
+    parser.add_argument("--speed", default="1", help="replay speed: 1 = original timing, N = N× faster, 'max' = no pacing")
+    parser.add_argument("--report", help="write the replay benchmark report (JSON) here")
+    parser.add_argument("--thresholds", default=THRESHOLDS_CONFIG, help="risk/block thresholds config (JSON)")
+    parser.add_argument("--reload-interval", type=float, default=RELOAD_INTERVAL_S,
+                        help="seconds between model/threshold change checks (0 = no hot reload)")
+    parser.add_argument("--snapshot", default=SNAPSHOT_PATH, help="flow-table snapshot file (warm restart)")
+    parser.add_argument("--snapshot-interval", type=float, default=SNAPSHOT_INTERVAL_S,
+                        help="seconds between flow snapshots (0 = no snapshot / restore)")
+    parser.add_argument("--idle-timeout", type=float, default=IDLE_TIMEOUT_S,
+                        help="drop (and do not restore) flows idle for longer than this (s)")
+    parser.add_argument("--store", default=ALERT_STORE, help="SQLite alert store ('' = none)")
+    parser.add_argument("--alert-csv", help="also append alerts to this CSV")
+    parser.add_argument("--retain-days", type=float, help="delete stored alerts older than this (hourly)")
+    parser.add_argument("--incident-quiet", type=float, default=QUIET_PERIOD_S,
+                        help="close an incident after this many seconds without alerts")
+    parser.add_argument("--incident-update", type=float, default=UPDATE_INTERVAL_S,
+                        help="emit / log at most one update per incident every N seconds")
+    parser.add_argument("--feed-port", type=int, default=FEED_PORT,
+                        help="localhost port of the server-sent alert feed (0 = off)")
+    args = parser.parse_args(argv)
+    run(args.iface, args.bpf, args.sample, args.replay, args.speed, args.report,
+        args.thresholds, args.reload_interval, args.snapshot, args.snapshot_interval, args.idle_timeout,
+        args.store, args.alert_csv, args.retain_days, args.incident_quiet, args.incident_update,
+        args.feed_port)
 
 if __name__ == "__main__":
-    run()
+    # Run through the importable module: live/replay.py (and hot reload,
+    # tests) import live.realtime_detector, and a script run as __main__
+    # would be a second copy whose settings and models they never see
+    import live.realtime_detector as detector
+    detector.main()
@@ -0,0 +1,204 @@
+# live/replay.py
+"""
+Replay a pcap/pcapng or a capture/*.csv through the real-time detection
+pipeline (live/realtime_detector.process_packet).
+
+Pacing is driven by capture timestamps:
+    --speed 1    original timing
+    --speed N    N× faster
+    --speed max  no pacing (throughput benchmark)
+
+Reports packets/s, per-stage latency, the alerts produced and their incidents.
+Auto-blocking is always disabled during replay.
+
+Run:
+    python -m live.replay capture/capture_20251209_145623.csv --speed max
+    python -m live.realtime_detector --replay traffic.pcap --speed 10
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+# -------------------------------------------------
+# Ensure project root on PYTHONPATH
+# -------------------------------------------------
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(THIS_DIR, ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from capture.capture_utils import flow_sampled, packet_time_ns, NS_PER_S
+from live.perf import now_ns, memory_usage, format_memory
+import live.realtime_detector as det
+
+REPLAY_ALERT_LOG = "live/replay_alerts.csv"
+CSV_CHUNK = 100_000
+
+# ---------------- INPUT READERS ----------------
+def iter_pcap(path):
+    """Yield (ts_ns, src, dst, proto_label) from a pcap/pcapng, streaming."""
+    from scapy.utils import PcapReader
+    from scapy.layers.inet import IP
+
+    with PcapReader(path) as reader:
+        for pkt in reader:
+            if not pkt.haslayer(IP):
+                continue
+            ip = pkt[IP]
+            yield packet_time_ns(pkt), ip.src, ip.dst, det.detect_protocol(pkt)
+
+def iter_capture_csv(path, chunksize=CSV_CHUNK):
+    """Yield (ts_ns, src, dst, proto_label) from a capture CSV, chunk by chunk."""
+    for chunk in pd.read_csv(path, chunksize=chunksize):
+        chunk = chunk.sort_values("ts", kind="stable")
+        ts_ns = np.round(chunk["ts"].to_numpy(dtype=float) * NS_PER_S).astype(np.int64)
+        sport = chunk["sport"] if "sport" in chunk.columns else pd.Series([None] * len(chunk))
+        dport = chunk["dport"] if "dport" in chunk.columns else pd.Series([None] * len(chunk))
+        for t, src, dst, proto, sp, dp in zip(
+            ts_ns, chunk["src"], chunk["dst"], chunk["proto"], sport, dport
+        ):
+            yield int(t), src, dst, det.protocol_label(proto, sp, dp)
+
+def iter_records(path):
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".pcap", ".pcapng", ".cap"):
+        return iter_pcap(path)
+    if ext == ".csv":
+        return iter_capture_csv(path)
+    raise ValueError(f"Unsupported replay input: {path} (expected .pcap/.pcapng/.csv)")
+
+# ---------------- PACING ----------------
+def parse_speed(speed):
+    """'max' / 0 / inf → None (no pacing), otherwise a positive float."""
+    if speed is None:
+        return 1.0
+    if str(speed).lower() in ("max", "0", "inf"):
+        return None
+    speed = float(speed)
+    if speed <= 0:
+        raise ValueError("--speed must be > 0 or 'max'")
+    return speed
+
+# ---------------- REPLAY ----------------
+def replay_file(path, speed=1.0, report_path=None, alert_log=REPLAY_ALERT_LOG):
+    speed = parse_speed(speed)
+
+    # Never touch the firewall or the live alert log from a replay
+    det.AUTO_BLOCK = False
+    det.ALERT_LOG = alert_log
+    if os.path.exists(alert_log):
+        os.remove(alert_log)
+    det.buffers.clear()
+    det.next_sweep_ns = 0
+    det.STAGES.reset()
+    det.CASCADE_STATS.reset()
+    det.budget_skips = 0
+    det.INCIDENTS = det.IncidentAggregator(det.emit_incident, det.INCIDENTS.quiet_s, det.INCIDENTS.update_s)
+    # load artifacts up front so they are not timed as the first window
+    det.load_model()
+    det.load_fusion_assets()
+
+    print(f"[+] Replaying {path} at {'max' if speed is None else f'{speed:g}×'} speed")
+
+    records = iter_records(path)
+    alerts = []
+    n_packets = 0
+    first_ts = last_ts = None
+    wall0 = time.perf_counter()
+
+    while True:
+        t0 = now_ns()
+        rec = next(records, None)
+        if rec is None:
+            break
+        det.STAGES.add("parse", now_ns() - t0)
+
+        ts_ns, src, dst, proto_label = rec
+        if first_ts is None:
+            first_ts = ts_ns
+        last_ts = ts_ns
+
+        # Pace on capture time
+        if speed is not None:
+            delay = wall0 + (ts_ns - first_ts) / NS_PER_S / speed - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+        flow = f"{src}_{dst}_{proto_label}"
+        n_packets += 1
+        if not flow_sampled(flow, det.SAMPLE_N):
+            continue
+
+        risk = det.process_packet(flow, proto_label, src, ts_ns)
+        if risk is not None and risk >= det.RISK_THRESHOLD:
+            alerts.append({"timestamp": ts_ns / NS_PER_S, "flow": flow, "final_risk": float(risk)})
+
+    det.INCIDENTS.close_all()
+    wall = time.perf_counter() - wall0
+    span = (last_ts - first_ts) / NS_PER_S if n_packets else 0.0
+
+    report = {
+        "input": path,
+        "speed": "max" if speed is None else speed,
+        "packets": n_packets,
+        "windows_scored": det.CASCADE_STATS.reached["tier1"],
+        "wall_s": wall,
+        "capture_span_s": span,
+        "packets_per_s": n_packets / wall if wall > 0 else 0.0,
+        "stages": det.STAGES.summary(),
+        "cascade": det.CASCADE_STATS.summary(),
+        "budget_skips": det.budget_skips,
+        "alerts": len(alerts),
+        "alerts_by_flow": dict(Counter(a["flow"] for a in alerts).most_common()),
+        "alert_log": alert_log if alerts else None,
+        "incidents": dict(det.INCIDENTS.counts),
+        "memory": memory_usage(),
+    }
+
+    print_report(report)
+    if report_path:
+        os.makedirs(os.path.dirname(report_path) or ".", exist_ok=True)
+        with open(report_path, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"[+] Replay report saved → {report_path}")
+
+    return report, alerts
+
+def print_report(report):
+    print("\nReplay summary:\n" + "-" * 40)
+    print(f"packets        {report['packets']}")
+    print(f"windows scored {report['windows_scored']}")
+    print(f"wall time      {report['wall_s']:.3f} s (capture span {report['capture_span_s']:.3f} s)")
+    print(f"throughput     {report['packets_per_s']:.0f} packets/s")
+    print(f"cascade        {det.CASCADE_STATS.format()}")
+    print(f"budget skips   {report['budget_skips']} (tier-3 components over {det.LATENCY_BUDGET_MS:g} ms)")
+    print(f"alerts         {report['alerts']}")
+    for flow, n in list(report["alerts_by_flow"].items())[:5]:
+        print(f"  {flow:40s} {n}")
+    if report.get("incidents"):
+        c = report["incidents"]
+        print(f"incidents      {c['opened']} opened, {c['updates']} updates, {c['closed']} closed "
+              f"({c['alerts']} alerts aggregated)")
+    if report.get("memory"):
+        print(f"memory         {format_memory(report['memory'])}")
+    print("\nPer-stage latency:\n" + det.STAGES.format())
+
+# ---------------- MAIN ----------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay captures through the real-time detector")
+    parser.add_argument("input", help="pcap/pcapng or capture/*.csv")
+    parser.add_argument("--speed", default="1", help="1 = original timing, N = N× faster, 'max' = no pacing")
+    parser.add_argument("--sample", type=int, default=1, help="analyse 1/N flows (deterministic flow hash)")
+    parser.add_argument("--alerts", default=REPLAY_ALERT_LOG, help="alert log for the replay")
+    parser.add_argument("--report", help="write the benchmark report (JSON) here")
+    args = parser.parse_args()
+
+    det.SAMPLE_N = args.sample
+    replay_file(args.input, args.speed, args.report, args.alerts)
@@ -0,0 +1,154 @@
+# live/snapshot.py
+"""
+Flow-table checkpoints for warm detector restarts.
+
+The per-flow ring buffers (live/flow_state.FlowState) are saved every
+SNAPSHOT_INTERVAL_S to one .npz:
+    flows         flow keys
+    times         (n_flows, window) capture timestamps, ns, left-aligned
+    counts        filled slots per row
+    last_risk     NaN when the flow was never scored
+    last_seen_ns
+The incremental IPD sums are not stored: restore replays the timestamps
+through FlowState.push, which rebuilds them exactly (integer ns).
+
+The flow table is copied under the detector's lock (cheap, tuples only);
+array building and the write happen in a background thread, to a temp file
+then os.replace, so a crash mid-write keeps the previous snapshot.
+"""
+
+import os
+import time
+import threading
+
+import numpy as np
+
+from live.flow_state import FlowState, NS_PER_S
+
+SNAPSHOT_PATH = "live/flow_snapshot.npz"
+SNAPSHOT_INTERVAL_S = 30.0
+IDLE_TIMEOUT_S = 300.0
+SNAPSHOT_VERSION = 1
+
+# ---------------- SAVE ----------------
+def copy_flows(buffers):
+    """Plain copy of the flow table (call under the lock guarding `buffers`)."""
+    return [(flow, tuple(s.times), s.last_risk, s.last_seen_ns) for flow, s in buffers.items()]
+
+def pack_flows(rows, window_size):
+    n = len(rows)
+    times = np.zeros((n, window_size), dtype=np.int64)
+    counts = np.zeros(n, dtype=np.int32)
+    for i, (_, ts, _, _) in enumerate(rows):
+        ts = ts[-window_size:]
+        times[i, :len(ts)] = ts
+        counts[i] = len(ts)
+    return {
+        "version": np.int32(SNAPSHOT_VERSION),
+        "window_size": np.int32(window_size),
+        "written_ns": np.int64(time.time_ns()),
+        "flows": np.array([r[0] for r in rows], dtype=str),
+        "times": times,
+        "counts": counts,
+        "last_risk": np.array([np.nan if r[2] is None else r[2] for r in rows], dtype=np.float64),
+        "last_seen_ns": np.array([r[3] for r in rows], dtype=np.int64),
+    }
+
+def write_snapshot(arrays, path=SNAPSHOT_PATH):
+    """Atomic write: readers see the old or the new snapshot, never half of one."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        np.savez(f, **arrays)
+    os.replace(tmp, path)
+    return os.path.getsize(path)
+
+def save_snapshot(buffers, window_size, path=SNAPSHOT_PATH, lock=None):
+    """Snapshot `buffers` now; returns timings (ms), flow count and size."""
+    t0 = time.perf_counter()
+    if lock is not None:
+        with lock:
+            rows = copy_flows(buffers)
+    else:
+        rows = copy_flows(buffers)
+    t1 = time.perf_counter()
+    size = write_snapshot(pack_flows(rows, window_size), path)
+    t2 = time.perf_counter()
+    return {"flows": len(rows), "bytes": size,
+            "copy_ms": (t1 - t0) * 1e3, "write_ms": (t2 - t1) * 1e3}
+
+# ---------------- RESTORE ----------------
+def load_snapshot(path, window_size, idle_timeout_s=IDLE_TIMEOUT_S, now_ns=None):
+    """
+    {flow: FlowState} from a snapshot, skipping flows idle for longer than
+    idle_timeout_s (capture clock vs now_ns, default wall clock). A snapshot
+    taken with another window size keeps the most recent timestamps.
+    """
+    t0 = time.perf_counter()
+    now_ns = time.time_ns() if now_ns is None else now_ns
+    with np.load(path, allow_pickle=False) as d:
+        if int(d["version"]) != SNAPSHOT_VERSION:
+            raise ValueError(f"{path}: snapshot version {int(d['version'])}, expected {SNAPSHOT_VERSION}")
+        flows, times, counts = d["flows"], d["times"], d["counts"]
+        last_risk, last_seen = d["last_risk"], d["last_seen_ns"]
+
+    fresh = now_ns - last_seen <= int(idle_timeout_s * NS_PER_S)
+    restored = {}
+    for i in np.flatnonzero(fresh):
+        state = FlowState(window_size)
+        for ts in times[i, :counts[i]].tolist():
+            state.push(ts)
+        state.last_risk = None if np.isnan(last_risk[i]) else float(last_risk[i])
+        restored[str(flows[i])] = state
+
+    stats = {"flows": len(restored), "expired": int((~fresh).sum()),
+             "restore_ms": (time.perf_counter() - t0) * 1e3}
+    return restored, stats
+
+# ---------------- EVICTION ----------------
+def evict_idle(buffers, now_ns, idle_timeout_s=IDLE_TIMEOUT_S):
+    """Drop flows idle for longer than idle_timeout_s at now_ns (call under the lock); returns the count."""
+    cutoff = now_ns - int(idle_timeout_s * NS_PER_S)
+    idle = [flow for flow, s in buffers.items() if s.last_seen_ns < cutoff]
+    for flow in idle:
+        del buffers[flow]
+    return len(idle)
+
+# ---------------- BACKGROUND WRITER ----------------
+class SnapshotWriter:
+    """Saves `buffers` every `interval` seconds from a daemon thread."""
+
+    def __init__(self, buffers, lock, window_size, path=SNAPSHOT_PATH, interval=SNAPSHOT_INTERVAL_S):
+        self.buffers = buffers
+        self.lock = lock
+        self.window_size = window_size
+        self.path = path
+        self.interval = interval
+        self.last = None
+        self.count = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def save(self):
+        try:
+            self.last = save_snapshot(self.buffers, self.window_size, self.path, self.lock)
+            self.count += 1
+        except OSError as e:
+            print(f"[WARN] Flow snapshot failed: {e}")
+        return self.last
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            self.save()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._loop, name="flow-snapshot", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, final=True):
+        """Stop the thread; final=True writes one last snapshot."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return self.save() if final else self.last
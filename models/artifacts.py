@@ -0,0 +1,244 @@
+# models/artifacts.py
+"""
+Saving / loading model artifacts.
+
+joblib artifacts ({"model", "scaler", "columns", ...}) are dumped
+uncompressed so plain NumPy arrays (scaler statistics, calibration tables)
+can be loaded with joblib mmap_mode.
+
+sklearn trees are still copied into every process when unpickled, so
+forest artifacts can also be exported to a memory-mappable directory
+(<name>.mmap/ next to the .joblib): the compiled node arrays
+(models/compiled_forest.py) as .npy files plus a manifest.json with the
+format version, columns, scalars and a sha256 per array. Workers np.load
+them with mmap_mode="r" and never unpickle sklearn, so N detector / scoring
+processes share one physical copy through the page cache.
+
+    python models/artifacts.py export models/rf_detector.joblib models/iforest_detector.joblib
+    python models/artifacts.py verify models/rf_detector.mmap
+"""
+
+import os
+import sys
+import json
+import shutil
+import hashlib
+import argparse
+from datetime import datetime
+
+import numpy as np
+
+# -------------------------------------------------
+# Ensure project root on PYTHONPATH
+# -------------------------------------------------
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(THIS_DIR, ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+MMAP_MODE = "r"
+MMAP_FORMAT = "covert-mmap"
+MMAP_VERSION = 1
+MMAP_SUFFIX = ".mmap"
+MANIFEST = "manifest.json"
+
+# -------------------------------------------------
+# joblib artifacts
+# -------------------------------------------------
+def save_artifact(obj, path):
+    import joblib
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    joblib.dump(obj, path, compress=0)
+    return path
+
+def load_artifact(path, mmap_mode=MMAP_MODE):
+    """Load an artifact, memory-mapping its arrays (read-only) by default."""
+    import joblib
+
+    return joblib.load(path, mmap_mode=mmap_mode)
+
+# -------------------------------------------------
+# Memory-mappable artifacts
+# -------------------------------------------------
+def _sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+def _json_value(v):
+    if isinstance(v, np.generic):
+        return v.item()
+    raise TypeError(f"cannot store {type(v).__name__} in an mmap artifact")
+
+def _split(obj, prefix, arrays):
+    """Move every ndarray of a nested dict into `arrays` (dotted key → array)."""
+    if isinstance(obj, np.ndarray):
+        arrays[prefix] = obj
+        return None
+    if isinstance(obj, dict):
+        out = {}
+        for k, v in obj.items():
+            if isinstance(v, np.ndarray):
+                arrays[f"{prefix}{k}"] = v
+            else:
+                out[k] = _split(v, f"{prefix}{k}.", arrays)
+        return out
+    return obj
+
+def save_mmap_artifact(artifact, out_dir, source=None):
+    """
+    Write a dict of arrays / JSON values (nested dicts allowed) as an mmap
+    directory. Written to a temp dir then renamed, so readers never see a
+    half-written artifact.
+    """
+    arrays = {}
+    meta = _split(artifact, "", arrays)
+
+    tmp = f"{out_dir}.tmp{os.getpid()}"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+
+    entries = {}
+    for key, arr in arrays.items():
+        if arr.dtype == object:
+            raise TypeError(f"{key}: object arrays cannot be memory-mapped")
+        fname = f"{key}.npy"
+        np.save(os.path.join(tmp, fname), np.ascontiguousarray(arr), allow_pickle=False)
+        entries[key] = {
+            "file": fname,
+            "dtype": arr.dtype.str,
+            "shape": list(arr.shape),
+            "sha256": _sha256(os.path.join(tmp, fname)),
+        }
+
+    manifest = {
+        "format": MMAP_FORMAT,
+        "version": MMAP_VERSION,
+        "arrays": entries,
+        "meta": meta,
+        "source": source,
+        "created": datetime.now().isoformat(timespec="seconds"),
+    }
+    with open(os.path.join(tmp, MANIFEST), "w") as f:
+        json.dump(manifest, f, indent=2, default=_json_value)
+
+    old = f"{out_dir}.old{os.getpid()}"
+    if os.path.exists(out_dir):
+        os.rename(out_dir, old)
+    os.rename(tmp, out_dir)
+    shutil.rmtree(old, ignore_errors=True)
+    return out_dir
+
+def read_manifest(path):
+    with open(os.path.join(path, MANIFEST)) as f:
+        manifest = json.load(f)
+    if manifest.get("format") != MMAP_FORMAT:
+        raise ValueError(f"{path}: not a {MMAP_FORMAT} artifact")
+    if manifest.get("version") != MMAP_VERSION:
+        raise ValueError(f"{path}: artifact version {manifest.get('version')} "
+                         f"(this code reads {MMAP_VERSION}); re-export it")
+    return manifest
+
+def load_mmap_artifact(path, verify=True):
+    """
+    Load an mmap directory: arrays are read-only np.memmap views. Raises
+    ValueError on a wrong format / version, a checksum mismatch (verify=True)
+    or an array whose dtype / shape differs from the manifest.
+    """
+    manifest = read_manifest(path)
+    artifact = manifest["meta"]
+    for key, entry in manifest["arrays"].items():
+        fname = os.path.join(path, entry["file"])
+        if verify and _sha256(fname) != entry["sha256"]:
+            raise ValueError(f"{path}: checksum mismatch for {entry['file']}")
+        arr = np.load(fname, mmap_mode=MMAP_MODE, allow_pickle=False)
+        if arr.dtype.str != entry["dtype"] or list(arr.shape) != entry["shape"]:
+            raise ValueError(f"{path}: {entry['file']} is {arr.dtype.str}{arr.shape}, "
+                             f"manifest says {entry['dtype']}{tuple(entry['shape'])}")
+        *parents, leaf = key.split(".")
+        node = artifact
+        for p in parents:
+            node = node[p]
+        node[leaf] = arr
+    return artifact
+
+def mmap_path(joblib_path):
+    return os.path.splitext(joblib_path)[0] + MMAP_SUFFIX
+
+def _source_info(path):
+    st = os.stat(path)
+    return {"file": os.path.basename(path), "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+def export_mmap(joblib_path, out_dir=None):
+    """
+    Export a Random Forest or Isolation Forest joblib artifact: compiled
+    arrays + columns, calibration and metadata, without the sklearn objects.
+    """
+    from models.compiled_forest import ensure_compiled
+
+    art = load_artifact(joblib_path, mmap_mode=None)
+    compiled = ensure_compiled(art)
+    if compiled is None:
+        raise ValueError(f"{joblib_path}: only forest artifacts can be exported "
+                         f"({type(art.get('model')).__name__})")
+
+    out = {"columns": list(art["columns"]), "compiled": compiled}
+    if compiled.get("kind") != "iforest":
+        out["backend"] = "compiled"
+    for key in ("calibration", "metadata"):
+        if art.get(key) is not None:
+            out[key] = art[key]
+
+    out_dir = out_dir or mmap_path(joblib_path)
+    save_mmap_artifact(out, out_dir, source=_source_info(joblib_path))
+    return out_dir
+
+def mmap_is_fresh(joblib_path, mmap_dir):
+    """True when the mmap export was made from the current joblib file."""
+    try:
+        source = read_manifest(mmap_dir).get("source") or {}
+    except (OSError, ValueError):
+        return False
+    if not os.path.exists(joblib_path):
+        return True
+    st = os.stat(joblib_path)
+    return source.get("size") == st.st_size and source.get("mtime_ns") == st.st_mtime_ns
+
+def load_model_artifact(path, verify=True):
+    """
+    Model artifact for `path` (a .joblib or an .mmap directory). The .mmap
+    export next to a .joblib is used when it is up to date; a stale or
+    missing export falls back to joblib.
+    """
+    if os.path.isdir(path):
+        return load_mmap_artifact(path, verify)
+    mdir = mmap_path(path)
+    if os.path.isdir(mdir):
+        if mmap_is_fresh(path, mdir):
+            return load_mmap_artifact(mdir, verify)
+        print(f"[WARN] {mdir} is older than {path}; loading joblib "
+              f"(re-export with models/artifacts.py export {path})")
+    return load_artifact(path)
+
+# -------------------------------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export / verify memory-mappable model artifacts")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_exp = sub.add_parser("export", help="joblib forest artifact(s) → <name>.mmap/")
+    p_exp.add_argument("models", nargs="+")
+    p_ver = sub.add_parser("verify", help="check format, version and checksums")
+    p_ver.add_argument("dirs", nargs="+")
+    args = parser.parse_args()
+
+    if args.cmd == "export":
+        for m in args.models:
+            out = export_mmap(m)
+            size = sum(os.path.getsize(os.path.join(out, f)) for f in os.listdir(out))
+            print(f"[+] {m} → {out} ({size / 1024:.0f} KB)")
+    else:
+        for d in args.dirs:
+            art = load_mmap_artifact(d, verify=True)
+            print(f"[+] {d}: OK ({len(art['columns'])} columns)")
@@ -0,0 +1,272 @@
+# models/backends.py
+"""
+Pluggable tier-2 model backends.
+
+Every backend wraps the usual joblib artifact ({"model", "scaler", "columns"})
+and exposes the same interface on raw (unscaled) feature rows in `columns`
+order:
+    predict_proba(X) → P(covert) per row
+    predict_one(x)   → P(covert) of one window (live path)
+    declared_latency() → latency recorded when the artifact was selected
+
+Backends: rf, hgb, logreg (scaled features), compiled (RF through
+models/compiled_forest.py; also loads sklearn-free .mmap exports).
+
+Selection on a held-out split, writing the winner + its metadata:
+    python models/backends.py features/features_<ts>.json --budget-ms 5 --out models/rf_detector.joblib
+"""
+
+import os
+import sys
+import time
+import argparse
+from datetime import datetime
+
+import numpy as np
+
+# -------------------------------------------------
+# Ensure project root on PYTHONPATH
+# -------------------------------------------------
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(THIS_DIR, ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from models.artifacts import load_model_artifact, save_artifact
+from models.compiled_forest import (
+    compile_forest,
+    ensure_compiled,
+    positive_index,
+    predict_proba as compiled_predict_proba
+)
+
+LATENCY_ROWS = 200
+TOLERANCE = 0.005
+
+# -------------------------------------------------
+# Backends
+# -------------------------------------------------
+class SklearnBackend:
+    """Any sklearn classifier with predict_proba, fed scaled features (load-only)."""
+
+    name = "sklearn"
+
+    def __init__(self, artifact):
+        self.artifact = artifact
+        self.model = artifact["model"]
+        self.scaler = artifact["scaler"]
+        self.columns = list(artifact["columns"])
+        self.pos = int(np.flatnonzero(np.asarray(self.model.classes_) == 1)[0])
+        # scalers fit on DataFrames warn on bare arrays
+        self._named = hasattr(self.scaler, "feature_names_in_")
+
+    def _scale(self, X):
+        if self._named:
+            import pandas as pd
+            X = pd.DataFrame(X, columns=self.columns)
+        return self.scaler.transform(X)
+
+    def predict_proba(self, X):
+        X = np.atleast_2d(np.asarray(X, dtype=np.float64))
+        return self.model.predict_proba(self._scale(X))[:, self.pos]
+
+    def predict_one(self, x):
+        return float(self.predict_proba(x)[0])
+
+    def declared_latency(self):
+        return (self.artifact.get("metadata") or {}).get("latency")
+
+class Fittable:
+    """Mixin for backends the selector can train: make_model() gives a fresh estimator."""
+
+    @classmethod
+    def fit(cls, X, y, columns):
+        from sklearn.preprocessing import StandardScaler
+
+        scaler = StandardScaler().fit(X)
+        model = cls.make_model().fit(scaler.transform(X), y)
+        return cls({"model": model, "scaler": scaler, "columns": list(columns), "backend": cls.name})
+
+class RFBackend(Fittable, SklearnBackend):
+    name = "rf"
+
+    @classmethod
+    def make_model(cls):
+        from sklearn.ensemble import RandomForestClassifier
+        return RandomForestClassifier(n_estimators=150, random_state=42)
+
+class HGBBackend(Fittable, SklearnBackend):
+    name = "hgb"
+
+    @classmethod
+    def make_model(cls):
+        from sklearn.ensemble import HistGradientBoostingClassifier
+        return HistGradientBoostingClassifier(random_state=42)
+
+class LogRegBackend(Fittable, SklearnBackend):
+    """Logistic regression; single rows skip sklearn with one dot product."""
+
+    name = "logreg"
+
+    def __init__(self, artifact):
+        super().__init__(artifact)
+        self.coef = np.asarray(self.model.coef_[0], dtype=np.float64)
+        self.intercept = float(self.model.intercept_[0])
+        self.mean = np.asarray(self.scaler.mean_, dtype=np.float64)
+        self.scale = np.asarray(self.scaler.scale_, dtype=np.float64)
+
+    @classmethod
+    def make_model(cls):
+        from sklearn.linear_model import LogisticRegression
+        return LogisticRegression(max_iter=1000)
+
+    def predict_one(self, x):
+        z = float(((np.asarray(x, dtype=np.float64) - self.mean) / self.scale) @ self.coef) + self.intercept
+        p = 1.0 / (1.0 + np.exp(-z))
+        return p if self.pos == 1 else 1.0 - p
+
+class CompiledBackend(SklearnBackend):
+    """Random Forest evaluated from flat node arrays (bit-exact with rf)."""
+
+    name = "compiled"
+
+    def __init__(self, artifact):
+        # sklearn objects are optional: .mmap exports only carry the arrays
+        self.artifact = artifact
+        self.model = artifact.get("model")
+        self.scaler = artifact.get("scaler")
+        self.columns = list(artifact["columns"])
+        self.compiled = ensure_compiled(artifact)
+        self.cpos = positive_index(self.compiled)
+
+    @classmethod
+    def fit(cls, X, y, columns):
+        art = RFBackend.fit(X, y, columns).artifact
+        art["compiled"] = compile_forest(art["model"], art["scaler"])
+        art["backend"] = cls.name
+        return cls(art)
+
+    def predict_proba(self, X):
+        return compiled_predict_proba(self.compiled, X)[:, self.cpos]
+
+    def predict_one(self, x):
+        return float(compiled_predict_proba(self.compiled, x)[0, self.cpos])
+
+BACKENDS = {b.name: b for b in (RFBackend, HGBBackend, LogRegBackend, CompiledBackend)}
+
+def backend_name(artifact):
+    """Recorded backend, else inferred (RF artifacts default to compiled)."""
+    if artifact.get("backend"):
+        return artifact["backend"]
+    kind = type(artifact["model"]).__name__
+    if kind in ("RandomForestClassifier", "ExtraTreesClassifier"):
+        return "compiled"
+    if kind == "HistGradientBoostingClassifier":
+        return "hgb"
+    if kind == "LogisticRegression":
+        return "logreg"
+    return "sklearn"
+
+def load_backend(artifact_or_path):
+    art = artifact_or_path
+    if isinstance(art, str):
+        art = load_model_artifact(art)
+    return BACKENDS.get(backend_name(art), SklearnBackend)(art)
+
+# -------------------------------------------------
+# Benchmark + selection
+# -------------------------------------------------
+def measure_latency(backend, X, n_rows=LATENCY_ROWS):
+    t0 = time.perf_counter_ns()
+    backend.predict_proba(X)
+    batch_ns = time.perf_counter_ns() - t0
+
+    rows = X[:n_rows]
+    for x in rows[:5]:
+        backend.predict_one(x)   # warm up
+    samples = []
+    for x in rows:
+        t0 = time.perf_counter_ns()
+        backend.predict_one(x)
+        samples.append(time.perf_counter_ns() - t0)
+    samples = np.asarray(samples) / 1e3
+    return {
+        "batch_us_per_row": batch_ns / 1e3 / max(len(X), 1),
+        "row_p50_us": float(np.percentile(samples, 50)),
+        "row_p99_us": float(np.percentile(samples, 99)),
+    }
+
+def evaluate_backends(X_train, y_train, X_test, y_test, columns, names=None):
+    from sklearn.metrics import roc_auc_score
+
+    results = []
+    for name in names or BACKENDS:
+        t0 = time.perf_counter()
+        backend = BACKENDS[name].fit(X_train, y_train, columns)
+        fit_s = time.perf_counter() - t0
+        try:
+            auc = float(roc_auc_score(y_test, backend.predict_proba(X_test)))
+        except ValueError:
+            auc = float("nan")
+        results.append({"backend": name, "auc": auc, "fit_s": fit_s,
+                        "latency": measure_latency(backend, X_test), "_obj": backend})
+    return results
+
+def choose(results, budget_ms=None, tolerance=TOLERANCE):
+    """
+    Fastest (row p99) backend within `tolerance` AUC of the best one among
+    those meeting the per-window budget.
+    """
+    ok = [r for r in results
+          if budget_ms is None or r["latency"]["row_p99_us"] <= budget_ms * 1e3]
+    if not ok:
+        raise RuntimeError(f"no backend meets the {budget_ms} ms single-row budget")
+    best_auc = np.nanmax([r["auc"] for r in ok])
+    close = [r for r in ok if r["auc"] >= best_auc - tolerance] or ok
+    return min(close, key=lambda r: r["latency"]["row_p99_us"])
+
+def select(features_json, out, budget_ms=None, tolerance=TOLERANCE, names=None):
+    from sklearn.model_selection import train_test_split
+    from models.evaluate import load_feature_matrix
+
+    X, y, columns = load_feature_matrix(features_json)
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=0.25, random_state=42, stratify=y)
+
+    results = evaluate_backends(X_train, y_train, X_test, y_test, columns, names)
+    print(f"{'backend':10s} {'auc':>7} {'fit_s':>7} {'batch_µs':>9} {'p50_µs':>8} {'p99_µs':>8}")
+    for r in results:
+        lat = r["latency"]
+        print(f"{r['backend']:10s} {r['auc']:7.4f} {r['fit_s']:7.2f} {lat['batch_us_per_row']:9.1f} "
+              f"{lat['row_p50_us']:8.1f} {lat['row_p99_us']:8.1f}")
+
+    best = choose(results, budget_ms, tolerance)
+    # the split only ranks the candidates; the shipped model sees every window
+    art = BACKENDS[best["backend"]].fit(X, y, columns).artifact
+    art["metadata"] = {
+        "backend": best["backend"],
+        "auc": best["auc"],
+        "latency": best["latency"],
+        "budget_ms": budget_ms,
+        "n_holdout": int(len(y_test)),
+        "n_train": int(len(y)),
+        "features": os.path.basename(features_json),
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "candidates": [{k: v for k, v in r.items() if k != "_obj"} for r in results],
+    }
+    save_artifact(art, out)
+    print(f"[+] Selected {best['backend']} (AUC {best['auc']:.4f}, "
+          f"p99 {best['latency']['row_p99_us']:.0f} µs), refit on {len(y)} windows → {out}")
+    return art
+
+# -------------------------------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark model backends and write the selected artifact")
+    parser.add_argument("features_json")
+    parser.add_argument("--budget-ms", type=float, help="max single-row p99 (ms)")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE, help="AUC loss allowed for a faster backend")
+    parser.add_argument("--backends", nargs="+", choices=list(BACKENDS))
+    parser.add_argument("--out", default="models/rf_detector.joblib")
+    args = parser.parse_args()
+
+    select(args.features_json, args.out, args.budget_ms, args.tolerance, args.backends)
@@ -0,0 +1,287 @@
+# models/compiled_forest.py
+"""
+Compiled tree-ensemble evaluator for low-latency scoring.
+
+compile_forest() flattens a fitted RandomForestClassifier (and its
+StandardScaler) into contiguous NumPy node arrays:
+    feature, threshold, children (left/right), missing_left, value (leaf probas)
+plus the scaler mean/scale. predict_proba() walks all trees of all rows at
+once with a handful of vectorised gathers per depth level, skipping sklearn's
+input validation and joblib dispatch that dominate single-row latency.
+
+Results match RandomForestClassifier.predict_proba (n_jobs=1) bit for bit:
+- scaling uses the same float64 ops as StandardScaler.transform
+- inputs are cast to float32 and compared to float64 thresholds, as in sklearn
+- tree probabilities are summed sequentially in estimator order, then / n_trees
+
+compile_iforest() / iforest_score_samples() do the same for an
+IsolationForest (per-leaf path length), matching score_samples.
+
+Check + benchmark:
+    python models/compiled_forest.py --features features/features_<ts>.json
+"""
+
+import os
+import sys
+import argparse
+
+import numpy as np
+
+# -------------------------------------------------
+# Ensure project root on PYTHONPATH
+# -------------------------------------------------
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(THIS_DIR, ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+COMPILED_VERSION = 1
+
+# -------------------------------------------------
+# Export
+# -------------------------------------------------
+def _sklearn_normalises():
+    # sklearn < 1.4 stored class counts in tree_.value and normalised per call
+    import sklearn
+    return tuple(int(v) for v in sklearn.__version__.split(".")[:2]) < (1, 4)
+
+def _leaf_proba(tree, n_classes):
+    value = tree.value[:, 0, :n_classes].astype(np.float64)
+    if _sklearn_normalises():
+        normalizer = value.sum(axis=1)[:, np.newaxis]
+        normalizer[normalizer == 0.0] = 1.0
+        value = value / normalizer
+    return value
+
+def _flatten(trees, leaf_values, feature_maps=None):
+    """
+    Concatenate sklearn trees into global node arrays. leaf_values(i, tree_)
+    gives the per-node output; feature_maps[i] maps tree features to columns.
+    """
+    features, thresholds, children, missing_left, values, roots = [], [], [], [], [], []
+    offset = 0
+    max_depth = 0
+
+    for i, t in enumerate(trees):
+        n = t.node_count
+        idx = np.arange(n)
+        leaf = t.children_left == -1
+
+        left = np.where(leaf, idx, t.children_left) + offset
+        right = np.where(leaf, idx, t.children_right) + offset
+        # leaves loop onto themselves: x <= +inf always goes "left" = self
+        feat = np.where(leaf, 0, t.feature).astype(np.intp)
+        if feature_maps is not None:
+            feat = np.asarray(feature_maps[i], dtype=np.intp)[feat]
+        features.append(feat)
+        thresholds.append(np.where(leaf, np.inf, t.threshold).astype(np.float64))
+        children.append(np.stack([left, right], axis=1).astype(np.intp))
+
+        if hasattr(t, "missing_go_to_left"):
+            ml = t.missing_go_to_left.astype(bool)
+        else:
+            ml = np.zeros(n, dtype=bool)
+        missing_left.append(np.where(leaf, True, ml))
+
+        values.append(leaf_values(i, t))
+        roots.append(offset)
+        offset += n
+        max_depth = max(max_depth, int(t.max_depth))
+
+    return {
+        "n_trees": len(trees),
+        "max_depth": max_depth,
+        "roots": np.asarray(roots, dtype=np.intp),
+        "feature": np.ascontiguousarray(np.concatenate(features)),
+        "threshold": np.ascontiguousarray(np.concatenate(thresholds)),
+        "children": np.ascontiguousarray(np.concatenate(children)),
+        "missing_left": np.ascontiguousarray(np.concatenate(missing_left)),
+        "value": np.ascontiguousarray(np.concatenate(values)),
+    }
+
+def compile_forest(model, scaler=None):
+    """Flatten a fitted RandomForestClassifier (+ optional StandardScaler)."""
+    n_classes = int(model.n_classes_)
+    compiled = _flatten([est.tree_ for est in model.estimators_],
+                        lambda i, t: _leaf_proba(t, n_classes))
+    compiled.update({
+        "version": COMPILED_VERSION,
+        "n_features": int(model.n_features_in_),
+        "classes": np.asarray(model.classes_),
+        "mean": None if scaler is None else np.asarray(scaler.mean_, dtype=np.float64),
+        "scale": None if scaler is None else np.asarray(scaler.scale_, dtype=np.float64),
+    })
+    return compiled
+
+def compile_iforest(model):
+    """
+    Flatten a fitted IsolationForest. Each leaf stores its path length
+    (node depth + average path length of its samples - 1), as summed by
+    IsolationForest._compute_score_samples.
+    """
+    from sklearn.ensemble._iforest import _average_path_length
+
+    trees = [est.tree_ for est in model.estimators_]
+    n_features = int(model.n_features_in_)
+    # trees only see a feature subset when max_features < n_features
+    subsample = int(model._max_features) != n_features
+    feature_maps = model.estimators_features_ if subsample else None
+
+    def leaf_depths(i, t):
+        depths = t.compute_node_depths().astype(np.float64)
+        return (depths + _average_path_length(t.n_node_samples) - 1.0)[:, np.newaxis]
+
+    compiled = _flatten(trees, leaf_depths, feature_maps)
+    max_samples = getattr(model, "_max_samples", model.max_samples_)
+    compiled.update({
+        "version": COMPILED_VERSION,
+        "kind": "iforest",
+        "n_features": n_features,
+        "denominator": float(len(trees) * _average_path_length([max_samples])[0]),
+    })
+    return compiled
+
+# -------------------------------------------------
+# Evaluation
+# -------------------------------------------------
+def apply(compiled, X):
+    """Leaf node index (n_samples, n_trees) of every row in every tree."""
+    # sklearn trees see float32 inputs, compared against float64 thresholds
+    X = X.astype(np.float32).astype(np.float64)
+
+    feature = compiled["feature"]
+    threshold = compiled["threshold"]
+    children = compiled["children"]
+
+    n = X.shape[0]
+    rows = np.arange(n)[:, np.newaxis]
+    node = np.broadcast_to(compiled["roots"], (n, compiled["n_trees"])).copy()
+
+    if np.isnan(X).any():
+        missing_left = compiled["missing_left"]
+        for _ in range(compiled["max_depth"]):
+            xv = X[rows, feature[node]]
+            go_right = np.where(np.isnan(xv), ~missing_left[node], ~(xv <= threshold[node]))
+            node = children[node, go_right.astype(np.intp)]
+    else:
+        for _ in range(compiled["max_depth"]):
+            go_right = X[rows, feature[node]] > threshold[node]
+            node = children[node, go_right.astype(np.intp)]
+    return node
+
+def predict_proba(compiled, X, scaled=False):
+    """
+    Class probabilities for raw feature rows (n_samples, n_features) or a
+    single 1-D row. Applies the compiled scaler unless scaled=True.
+    """
+    X = np.asarray(X, dtype=np.float64)
+    if X.ndim == 1:
+        X = X[np.newaxis, :]
+
+    if not scaled and compiled.get("mean") is not None:
+        X = (X - compiled["mean"]) / compiled["scale"]
+    node = apply(compiled, X)
+
+    # sequential sum over trees (estimator order), same as sklearn's accumulator
+    proba = np.cumsum(compiled["value"][node], axis=1)[:, -1, :]
+    return proba / compiled["n_trees"]
+
+def iforest_score_samples(compiled, X):
+    """IsolationForest.score_samples for raw rows (or one 1-D row)."""
+    X = np.asarray(X, dtype=np.float64)
+    if X.ndim == 1:
+        X = X[np.newaxis, :]
+
+    depths = np.cumsum(compiled["value"][apply(compiled, X), 0], axis=1)[:, -1]
+    denominator = compiled["denominator"]
+    if denominator == 0:
+        return -(2 ** -np.ones_like(depths))
+    return -(2 ** (-(depths / denominator)))
+
+def positive_index(compiled, label=1):
+    return int(np.flatnonzero(compiled["classes"] == label)[0])
+
+def ensure_compiled(artifact):
+    """
+    Compiled arrays for a model artifact: the exported ones when present,
+    otherwise compiled on the fly for RF / Isolation Forest artifacts
+    (else None, e.g. hgb/sgd).
+    """
+    compiled = artifact.get("compiled")
+    if compiled is not None and compiled.get("version") == COMPILED_VERSION:
+        return compiled
+    from sklearn.ensemble import RandomForestClassifier, ExtraTreesClassifier, IsolationForest
+
+    model = artifact.get("model")
+    if isinstance(model, (RandomForestClassifier, ExtraTreesClassifier)):
+        return compile_forest(model, artifact.get("scaler"))
+    if isinstance(model, IsolationForest):
+        return compile_iforest(model)
+    return None
+
+# -------------------------------------------------
+# Check + benchmark
+# -------------------------------------------------
+def _percentiles(samples_ns):
+    arr = np.asarray(samples_ns) / 1e3
+    return np.percentile(arr, 50), np.percentile(arr, 99)
+
+def check_and_benchmark(model_path, features_json, repeats=300):
+    import time
+    from models.artifacts import load_artifact
+    from models.train_model import load_features_json
+
+    art = load_artifact(model_path)
+    model, scaler, cols = art["model"], art["scaler"], art["columns"]
+    compiled = ensure_compiled(art)
+
+    X, _ = load_features_json(features_json)
+    X = X.reindex(columns=cols, fill_value=0.0)
+
+    ref = model.predict_proba(scaler.transform(X))
+    got = predict_proba(compiled, X.to_numpy())
+    exact = np.array_equal(ref, got)
+    print(f"[+] Bit-exact vs predict_proba on {len(X)} windows: {exact}")
+
+    rows = X.to_numpy()
+    sk, cp = [], []
+    for i in range(repeats):
+        r = i % len(rows)
+        t0 = time.perf_counter_ns()
+        model.predict_proba(scaler.transform(X.iloc[[r]]))
+        t1 = time.perf_counter_ns()
+        predict_proba(compiled, rows[r])
+        t2 = time.perf_counter_ns()
+        sk.append(t1 - t0)
+        cp.append(t2 - t1)
+
+    sk50, sk99 = _percentiles(sk)
+    cp50, cp99 = _percentiles(cp)
+    print(f"[+] single-row sklearn : p50 {sk50:9.1f} µs  p99 {sk99:9.1f} µs")
+    print(f"[+] single-row compiled: p50 {cp50:9.1f} µs  p99 {cp99:9.1f} µs")
+    print(f"[+] p99 speedup: {sk99 / cp99:.1f}×")
+    return exact
+
+def export(model_path, out=None):
+    """Add compiled arrays to an existing RandomForest artifact."""
+    from models.artifacts import load_artifact, save_artifact
+
+    # no mmap: the artifact may be rewritten in place
+    art = load_artifact(model_path, mmap_mode=None)
+    art["compiled"] = compile_forest(art["model"], art.get("scaler"))
+    out = out or model_path
+    save_artifact(art, out)
+    print(f"[+] Compiled forest ({len(art['compiled']['feature'])} nodes) saved → {out}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compile / check / benchmark the RF evaluator")
+    parser.add_argument("--model", default="models/rf_detector.joblib")
+    parser.add_argument("--features", help="features_*.json used for the bit-exact check + benchmark")
+    parser.add_argument("--export", action="store_true", help="write compiled arrays into the artifact")
+    parser.add_argument("--out", help="output artifact for --export (default: overwrite --model)")
+    args = parser.parse_args()
+
+    if args.export:
+        export(args.model, args.out)
+    if args.features:
+        check_and_benchmark(args.model, args.features)
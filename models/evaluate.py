@@ -0,0 +1,265 @@
+# models/evaluate.py
+"""
+Cross-validation + hyperparameter sweep harness.
+
+- Feature JSONs are parsed once and cached as .npz (features/.cache/),
+  keyed by absolute path + file size + mtime, so repeated runs skip JSON
+  parsing.
+- Folds (and every config × fold pair of a sweep) run in parallel with joblib.
+- Each config records fit time, batch predict time and single-row latency
+  next to its AUC, so models can be picked on accuracy and latency.
+
+Usage:
+    python models/evaluate.py features/features_<ts>.json --save-roc results
+    python models/evaluate.py features/features_<ts>.json \\
+        --grid '{"n_estimators": [50, 150], "max_depth": [null, 8]}' --out results/sweep.csv
+    python models/evaluate.py features/features_<ts>.json \\
+        --random 20 --grid '{"n_estimators": [25, 50, 100, 200], "min_samples_leaf": [1, 2, 5]}'
+"""
+
+import os
+import sys
+import csv
+import json
+import hashlib
+import time
+import argparse
+
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.model_selection import StratifiedKFold, ParameterGrid, ParameterSampler
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.preprocessing import StandardScaler
+from sklearn.metrics import roc_auc_score, classification_report, roc_curve, auc
+
+# -------------------------------------------------
+# Ensure project root on PYTHONPATH
+# -------------------------------------------------
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(THIS_DIR, ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from models.compiled_forest import compile_forest, predict_proba as compiled_predict_proba
+
+CACHE_DIR = "features/.cache"
+DEFAULT_PARAMS = {"n_estimators": 150, "random_state": 42}
+LATENCY_ROWS = 20
+
+# -------------------------------------------------
+# Cached feature matrix
+# -------------------------------------------------
+def _cache_path(json_path, cache_dir):
+    """(cache file, key): key = file stem + hash of the absolute path."""
+    st = os.stat(json_path)
+    stem = os.path.splitext(os.path.basename(json_path))[0]
+    digest = hashlib.sha1(os.path.abspath(json_path).encode()).hexdigest()[:16]
+    key = f"{stem}-{digest}"
+    return os.path.join(cache_dir, f"{key}_{st.st_size}_{st.st_mtime_ns}.npz"), key
+
+def load_feature_matrix(json_path, cache_dir=CACHE_DIR):
+    """
+    (X, y, columns) for a features JSON; parsed once, then read from the
+    binary cache until the JSON changes.
+    """
+    path, key = _cache_path(json_path, cache_dir) if cache_dir else (None, None)
+    if path and os.path.exists(path):
+        with np.load(path, allow_pickle=False) as d:
+            return d["X"], d["y"], list(d["columns"])
+
+    from models.train_model import load_features_json
+
+    X, y = load_features_json(json_path)
+    columns = list(X.columns)
+    X = X.to_numpy(dtype=np.float64)
+    y = np.asarray(y)
+
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+        # drop caches of older versions of the same file (same key, other size / mtime)
+        for f in os.listdir(cache_dir):
+            if f.endswith(".npz") and f[:-4].rsplit("_", 2)[0] == key:
+                os.remove(os.path.join(cache_dir, f))
+        np.savez(path, X=X, y=y, columns=np.array(columns))
+    return X, y, columns
+
+# -------------------------------------------------
+# One fold
+# -------------------------------------------------
+def _row_latency_us(clf, scaler, X_test):
+    """Median single-row latency as served live (compiled forest)."""
+    compiled = compile_forest(clf, scaler)
+    samples = []
+    for row in X_test[:LATENCY_ROWS]:
+        t0 = time.perf_counter_ns()
+        compiled_predict_proba(compiled, row)
+        samples.append(time.perf_counter_ns() - t0)
+    return float(np.median(samples)) / 1e3
+
+def fit_fold(X, y, train_idx, test_idx, params):
+    scaler = StandardScaler().fit(X[train_idx])
+    Xtr = scaler.transform(X[train_idx])
+    Xte = scaler.transform(X[test_idx])
+    y_test = y[test_idx]
+
+    # one core per fold: parallelism comes from running folds side by side
+    clf = RandomForestClassifier(**{**params, "n_jobs": 1})
+    t0 = time.perf_counter()
+    clf.fit(Xtr, y[train_idx])
+    t1 = time.perf_counter()
+    proba = clf.predict_proba(Xte)
+    t2 = time.perf_counter()
+    probs = proba[:, 1]
+
+    try:
+        a = roc_auc_score(y_test, probs)
+    except Exception:
+        a = float("nan")
+
+    return {
+        "auc": a,
+        "fit_s": t1 - t0,
+        "predict_s": t2 - t1,
+        "predict_us_per_row": (t2 - t1) / max(len(test_idx), 1) * 1e6,
+        "row_latency_us": _row_latency_us(clf, scaler, X[test_idx]),
+        "y_test": y_test,
+        "probs": probs,
+        "report": classification_report(y_test, clf.classes_[np.argmax(proba, axis=1)], zero_division=0),
+    }
+
+def make_folds(y, n_splits=5, random_state=42):
+    skf = StratifiedKFold(n_splits=min(n_splits, max(2, int(np.sum(y)))), shuffle=True,
+                          random_state=random_state)
+    return list(skf.split(np.zeros(len(y)), y))
+
+# -------------------------------------------------
+# Cross-validation
+# -------------------------------------------------
+def cross_validate(X, y, params=None, n_splits=5, n_jobs=-1):
+    params = {**DEFAULT_PARAMS, **(params or {})}
+    folds = make_folds(y, n_splits)
+    return Parallel(n_jobs=n_jobs)(
+        delayed(fit_fold)(X, y, tr, te, params) for tr, te in folds
+    )
+
+def summarize(results):
+    aucs = np.array([r["auc"] for r in results])
+    return {
+        "mean_auc": float(np.nanmean(aucs)),
+        "std_auc": float(np.nanstd(aucs)),
+        "fit_s": float(np.mean([r["fit_s"] for r in results])),
+        "predict_s": float(np.mean([r["predict_s"] for r in results])),
+        "predict_us_per_row": float(np.mean([r["predict_us_per_row"] for r in results])),
+        "row_latency_us": float(np.mean([r["row_latency_us"] for r in results])),
+    }
+
+def save_roc(y_test, probs, out_path=None):
+    """ROC of one fold: saved to out_path, or shown when out_path is None."""
+    import matplotlib
+    if out_path:
+        matplotlib.use("Agg")   # use non-interactive backend
+    import matplotlib.pyplot as plt
+
+    fpr, tpr, _ = roc_curve(y_test, probs)
+    roc_auc = auc(fpr, tpr)
+    plt.figure(figsize=(6, 6))
+    plt.plot(fpr, tpr, label=f"ROC (AUC={roc_auc:.3f})")
+    plt.plot([0, 1], [0, 1], "--", alpha=0.5)
+    plt.xlabel("FPR"); plt.ylabel("TPR"); plt.title("ROC Curve (last CV fold)")
+    plt.legend()
+    if out_path:
+        plt.savefig(out_path, dpi=150, bbox_inches="tight")
+        print(f"[+] Saved ROC plot → {out_path}")
+    else:
+        plt.show()
+
+def run_cv(json_path, n_splits=5, params=None, n_jobs=-1, roc_dir=None, show_roc=False):
+    X, y, _ = load_feature_matrix(json_path)
+    if len(np.unique(y)) < 2:
+        print("Only one class present; cannot run CV.")
+        return None
+
+    results = cross_validate(X, y, params, n_splits, n_jobs)
+    for i, r in enumerate(results, 1):
+        print(f"Fold {i}: AUC={r['auc']:.4f}  fit={r['fit_s']:.2f}s  row={r['row_latency_us']:.0f}µs")
+        print(r["report"])
+
+    s = summarize(results)
+    print(f"Mean AUC: {s['mean_auc']:.4f} (+/- {s['std_auc']:.4f})")
+    print(f"Mean fit: {s['fit_s']:.3f}s | predict: {s['predict_us_per_row']:.1f}µs/row (batch), "
+          f"{s['row_latency_us']:.0f}µs single row")
+
+    last = results[-1]
+    if roc_dir:
+        os.makedirs(roc_dir, exist_ok=True)
+        out = os.path.join(roc_dir, f"roc_{os.path.basename(json_path).replace('.json', '')}.png")
+        try:
+            save_roc(last["y_test"], last["probs"], out)
+        except Exception as e:
+            print("Could not save ROC plot:", e)
+    elif show_roc:
+        save_roc(last["y_test"], last["probs"])
+    return s
+
+# -------------------------------------------------
+# Hyperparameter sweeps
+# -------------------------------------------------
+def sweep(X, y, grid, n_iter=None, n_splits=5, n_jobs=-1, random_state=42):
+    """
+    Grid (n_iter=None) or random (n_iter configs) sweep. Every config × fold
+    pair is an independent job, so all cores stay busy.
+    """
+    if n_iter:
+        configs = list(ParameterSampler(grid, n_iter=n_iter, random_state=random_state))
+    else:
+        configs = list(ParameterGrid(grid))
+    configs = [{**DEFAULT_PARAMS, **c} for c in configs]
+    folds = make_folds(y, n_splits)
+
+    flat = Parallel(n_jobs=n_jobs)(
+        delayed(fit_fold)(X, y, tr, te, params) for params in configs for tr, te in folds
+    )
+
+    rows = []
+    for i, params in enumerate(configs):
+        s = summarize(flat[i * len(folds):(i + 1) * len(folds)])
+        rows.append({"params": json.dumps(params, sort_keys=True), **s})
+    rows.sort(key=lambda r: (-r["mean_auc"], r["row_latency_us"]))
+    return rows
+
+def save_sweep(rows, out_path):
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    with open(out_path, "w", newline="") as f:
+        w = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+        w.writeheader()
+        w.writerows(rows)
+    print(f"[+] Sweep results saved → {out_path}")
+
+def print_sweep(rows):
+    print(f"{'mean_auc':>8} {'std':>6} {'fit_s':>7} {'µs/row':>8} {'row_µs':>8}  params")
+    for r in rows:
+        print(f"{r['mean_auc']:8.4f} {r['std_auc']:6.4f} {r['fit_s']:7.3f} "
+              f"{r['predict_us_per_row']:8.1f} {r['row_latency_us']:8.0f}  {r['params']}")
+
+# -------------------------------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parallel cross-validation / hyperparameter sweeps")
+    parser.add_argument("features_json")
+    parser.add_argument("--splits", type=int, default=5)
+    parser.add_argument("--jobs", type=int, default=-1, help="parallel workers (-1 = all cores)")
+    parser.add_argument("--params", help="JSON RandomForest params for a single CV run")
+    parser.add_argument("--grid", help="JSON dict of param → list of values to sweep")
+    parser.add_argument("--random", type=int, help="sample N configs from --grid instead of all")
+    parser.add_argument("--out", default="results/sweep.csv", help="sweep results CSV")
+    parser.add_argument("--save-roc", metavar="DIR", help="save the last-fold ROC plot to DIR")
+    parser.add_argument("--show-roc", action="store_true")
+    args = parser.parse_args()
+
+    if args.grid:
+        X, y, _ = load_feature_matrix(args.features_json)
+        rows = sweep(X, y, json.loads(args.grid), args.random, args.splits, args.jobs)
+        print_sweep(rows)
+        save_sweep(rows, args.out)
+    else:
+        run_cv(args.features_json, args.splits, json.loads(args.params) if args.params else None,
+               args.jobs, args.save_roc, args.show_roc)
@@ -0,0 +1,147 @@
+# models/feature_select.py
+"""
+Latency-aware feature subset selection + pruned model export.
+
+1. Measures the per-window compute cost of each feature group
+   (features/feature_utils.FEATURE_GROUPS) on real IPD windows.
+2. Cross-validates every subset of groups (models/evaluate.py, parallel)
+   and keeps those whose mean AUC is within --tolerance of the full set.
+3. Picks the cheapest one (feature cost + single-row model latency) and,
+   with --export, trains a model on it. The artifact's `columns` only
+   contain the kept groups, so the detectors never compute the others.
+
+Usage:
+    python models/feature_select.py features/features_<ts>.json \\
+        --flows preprocessed/flows/*.csv --tolerance 0.005 --export models/rf_pruned.joblib
+"""
+
+import os
+import sys
+import glob
+import json
+import time
+import argparse
+from itertools import combinations
+
+import pandas as pd
+
+# -------------------------------------------------
+# Ensure project root on PYTHONPATH
+# -------------------------------------------------
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(THIS_DIR, ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from features.feature_utils import FEATURE_GROUPS, group_columns
+from models.evaluate import load_feature_matrix, cross_validate, summarize
+
+WINDOW = 50
+MAX_WINDOWS = 200
+TOLERANCE = 0.005
+
+# -------------------------------------------------
+# Group costs
+# -------------------------------------------------
+def sample_windows(flow_files, window=WINDOW, max_windows=MAX_WINDOWS):
+    windows = []
+    for f in flow_files:
+        ipd = pd.read_csv(f)["ipd"].to_numpy(dtype=float)
+        for start in range(0, len(ipd) - window + 1, window):
+            windows.append(ipd[start:start + window])
+    if not windows:
+        raise ValueError("no IPD windows in the given flow files")
+    step = max(1, len(windows) // max_windows)
+    return windows[::step][:max_windows]
+
+def measure_group_costs(windows, repeats=3):
+    """Mean compute time (µs per window) of each feature group."""
+    costs = {}
+    for g, (fn, _) in FEATURE_GROUPS.items():
+        fn(windows[0])  # warm up (lazy scipy imports)
+        best = float("inf")
+        for _ in range(repeats):
+            t0 = time.perf_counter_ns()
+            for w in windows:
+                fn(w)
+            best = min(best, (time.perf_counter_ns() - t0) / len(windows))
+        costs[g] = best / 1e3
+    return costs
+
+# -------------------------------------------------
+# Subset search
+# -------------------------------------------------
+def search_subsets(X, y, columns, costs, tolerance=TOLERANCE, n_splits=5, n_jobs=-1):
+    """
+    Exhaustive over non-empty group subsets (2^groups - 1; 15 for the
+    current four groups). Returns rows sorted by total cost per window.
+    """
+    groups = [g for g in FEATURE_GROUPS if set(FEATURE_GROUPS[g][1]) & set(columns)]
+    rows = []
+    for k in range(1, len(groups) + 1):
+        for subset in combinations(groups, k):
+            cols = [c for c in group_columns(subset) if c in columns]
+            idx = [columns.index(c) for c in cols]
+            s = summarize(cross_validate(X[:, idx], y, n_splits=n_splits, n_jobs=n_jobs))
+            feature_us = sum(costs[g] for g in subset)
+            rows.append({
+                "groups": list(subset),
+                "columns": cols,
+                "mean_auc": s["mean_auc"],
+                "std_auc": s["std_auc"],
+                "feature_us": feature_us,
+                "model_us": s["row_latency_us"],
+                "total_us": feature_us + s["row_latency_us"],
+            })
+
+    full = max(rows, key=lambda r: len(r["groups"]))["mean_auc"]
+    for r in rows:
+        r["within_tolerance"] = r["mean_auc"] >= full - tolerance
+    rows.sort(key=lambda r: r["total_us"])
+    return rows
+
+def pick(rows):
+    return next(r for r in rows if r["within_tolerance"])
+
+def print_rows(rows):
+    print(f"{'mean_auc':>8} {'feat_µs':>8} {'model_µs':>8} {'total_µs':>8} ok  groups")
+    for r in rows:
+        print(f"{r['mean_auc']:8.4f} {r['feature_us']:8.1f} {r['model_us']:8.1f} "
+              f"{r['total_us']:8.1f} {'✓' if r['within_tolerance'] else ' '}   {'+'.join(r['groups'])}")
+
+# -------------------------------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Latency-aware feature group selection")
+    parser.add_argument("features_json")
+    parser.add_argument("--flows", nargs="+", help="flow CSVs with an 'ipd' column (for timing)")
+    parser.add_argument("--window", type=int, default=WINDOW)
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE, help="max AUC loss vs all groups")
+    parser.add_argument("--splits", type=int, default=5)
+    parser.add_argument("--jobs", type=int, default=-1)
+    parser.add_argument("--export", metavar="MODEL_OUT", help="train + save the pruned model here")
+    parser.add_argument("--out", default="results/feature_subsets.json")
+    args = parser.parse_args()
+
+    flows = args.flows or sorted(glob.glob("preprocessed/flows/*.csv"))
+    costs = measure_group_costs(sample_windows(flows, args.window))
+    print("Feature group cost (µs / window):")
+    for g, c in sorted(costs.items(), key=lambda kv: -kv[1]):
+        print(f"  {g:10s} {c:8.1f}")
+
+    X, y, columns = load_feature_matrix(args.features_json)
+    rows = search_subsets(X, y, columns, costs, args.tolerance, args.splits, args.jobs)
+    print()
+    print_rows(rows)
+
+    best = pick(rows)
+    print(f"\n[+] Cheapest subset within {args.tolerance} AUC: {'+'.join(best['groups'])} "
+          f"({best['total_us']:.0f} µs/window, AUC {best['mean_auc']:.4f})")
+
+    os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+    with open(args.out, "w") as f:
+        json.dump({"costs_us": costs, "tolerance": args.tolerance, "subsets": rows, "selected": best}, f, indent=2)
+    print(f"[+] Subset table saved → {args.out}")
+
+    if args.export:
+        from models.train_model import train
+        train(args.features_json, args.export, columns=best["columns"])
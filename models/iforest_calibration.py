@@ -0,0 +1,42 @@
+# models/iforest_calibration.py
+"""
+Isolation Forest score calibration that works on single windows.
+
+score_samples → higher = more normal. Instead of min/max-scaling a batch
+(which makes a score depend on the rest of the batch), scores are mapped
+through the empirical CDF of a fixed reference set (quantiles):
+
+    risk = (1 - CDF_ref(score)) * 100
+
+so a window as normal as the median reference window gets ~50 and one
+less normal than every reference window gets ~100.
+"""
+
+import numpy as np
+
+N_QUANTILES = 101
+
+def fit_calibration(scores, n_quantiles=N_QUANTILES):
+    scores = np.asarray(scores, dtype=float)
+    probs = np.linspace(0.0, 1.0, n_quantiles)
+    return {
+        "probs": probs,
+        "quantiles": np.quantile(scores, probs),
+        "n_reference": int(len(scores)),
+    }
+
+def calibrated_risk(scores, calibration):
+    """score_samples output (any shape) → 0–100 risk, batch independent."""
+    cdf = np.interp(np.asarray(scores, dtype=float), calibration["quantiles"], calibration["probs"])
+    return (1.0 - cdf) * 100.0
+
+def resolve_calibration(artifact, profile=None):
+    """
+    Calibration stored with the model (iforest_train.py), falling back to the
+    fusion baseline profile for artifacts trained before it was persisted.
+    """
+    if artifact.get("calibration") is not None:
+        return artifact["calibration"]
+    if profile and profile.get("iforest_calibration") is not None:
+        return profile["iforest_calibration"]
+    return None
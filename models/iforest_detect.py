@@ -1,46 +1,76 @@
 # models/iforest_detect.py
 """
 Phase 4: Use Isolation Forest to score anomaly risk
+
+Risk comes from the calibration persisted by iforest_train.py (training
+score quantiles), so a window's risk does not depend on the rest of the
+file. Feature files are scored in fixed-size chunks with bounded memory.
 """
 
-import json
-import joblib
+import os
+import sys
 import argparse
 import pandas as pd
 import numpy as np
 
-def main(features_json, model_path):
-    artifact = joblib.load(model_path)
-    model = artifact["model"]
-    columns = artifact["columns"]
+# -------------------------------------------------
+# Ensure project root on PYTHONPATH
+# -------------------------------------------------
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(THIS_DIR, ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from features.feature_io import iter_feature_chunks, CHUNK_SIZE
+from models.artifacts import load_artifact
+from models.iforest_calibration import calibrated_risk, resolve_calibration
+from fusion.profiles import PROFILE_PATH, load_profile
 
-    with open(features_json, "r") as f:
-        feats = json.load(f)
+KEY_COLS = ["flow", "window_start", "window_end"]
 
-    df = pd.DataFrame(feats)
-    X = df[columns]
+def load_iforest(model_path, profile_path=PROFILE_PATH):
+    artifact = load_artifact(model_path)
+    calibration = resolve_calibration(artifact, load_profile(profile_path))
+    if calibration is None:
+        raise RuntimeError(
+            f"{model_path} has no score calibration; retrain with models/iforest_train.py "
+            "or build fusion/profiles.py with --features"
+        )
+    return artifact["model"], artifact["columns"], calibration
 
-    # Isolation Forest:
+def score_windows(df, model, columns, calibration):
+    """Calibrated 0–100 anomaly risk for any number of windows (even one)."""
+    X = df.reindex(columns=columns, fill_value=0.0)
     # score_samples → higher = more normal
-    scores = model.score_samples(X)
+    return calibrated_risk(model.score_samples(X), calibration)
+
+def main(features_json, model_path, out="models/iforest_scores.csv", chunk_size=CHUNK_SIZE):
+    model, columns, calibration = load_iforest(model_path)
 
-    # Convert to anomaly risk (0–100)
-    risk = (1 - (scores - scores.min()) / (scores.max() - scores.min() + 1e-9)) * 100
+    if os.path.exists(out):
+        os.remove(out)
 
-    df["iforest_risk"] = risk
+    n = 0
+    top = pd.DataFrame()
+    for chunk in iter_feature_chunks(features_json, chunk_size):
+        chunk = chunk.copy()
+        chunk["iforest_risk"] = score_windows(chunk, model, columns, calibration)
 
-    out = "models/iforest_scores.csv"
-    df[
-        ["flow", "window_start", "window_end", "iforest_risk"]
-    ].to_csv(out, index=False)
+        chunk[KEY_COLS + ["iforest_risk"]].to_csv(
+            out, mode="a", header=(n == 0), index=False
+        )
+        n += len(chunk)
+        top = pd.concat([top, chunk.nlargest(5, "iforest_risk")]).nlargest(5, "iforest_risk")
 
-    print(f"[+] Isolation Forest risk scores saved → {out}")
-    print(df.sort_values("iforest_risk", ascending=False).head(5))
+    print(f"[+] Isolation Forest risk scores ({n} windows) saved → {out}")
+    print(top)
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
-    parser.add_argument("features", help="features_*.json")
+    parser.add_argument("features", help="features_*.json / .jsonl / .csv")
     parser.add_argument("--model", default="models/iforest_detector.joblib")
+    parser.add_argument("--out", default="models/iforest_scores.csv")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="windows scored per chunk")
     args = parser.parse_args()
 
-    main(args.features, args.model)
+    main(args.features, args.model, args.out, args.chunk_size)
@@ -3,12 +3,21 @@
 Phase 4: Train Isolation Forest on NORMAL traffic only
 """
 
+import os
+import sys
 import json
-import joblib
 import argparse
 import pandas as pd
 from sklearn.ensemble import IsolationForest
-import os
+
+# Ensure project root on PYTHONPATH
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(THIS_DIR, ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from models.iforest_calibration import fit_calibration
+from models.artifacts import save_artifact
 
 def main(features_json, out_model="models/iforest_detector.joblib"):
     with open(features_json, "r") as f:
@@ -30,11 +39,15 @@ def main(features_json, out_model="models/iforest_detector.joblib"):
 
     model.fit(X)
 
-    os.makedirs("models", exist_ok=True)
-    joblib.dump(
+    # Score quantiles of the training windows: lets detection turn any
+    # score_samples value into a stable 0–100 risk, one window at a time
+    calibration = fit_calibration(model.score_samples(X))
+
+    save_artifact(
         {
             "model": model,
-            "columns": X.columns.tolist()
+            "columns": X.columns.tolist(),
+            "calibration": calibration
         },
         out_model
     )
@@ -2,12 +2,14 @@
 """
 Helpers to load saved model and score new feature JSON.
 """
-import joblib
 import pandas as pd
 import numpy as np
 
+from models.artifacts import load_artifact
+from models.backends import load_backend
+
 def load_model(path="models/rf_detector.joblib"):
-    d = joblib.load(path)
+    d = load_artifact(path)
     return d["model"], d["scaler"], d["columns"]
 
 def score_features_json(features_json, model_path="models/rf_detector.joblib"):
@@ -15,9 +17,7 @@ def score_features_json(features_json, model_path="models/rf_detector.joblib"):
     with open(features_json) as f:
         feats = json.load(f)
     df = pd.DataFrame(feats)
-    model, scaler, cols = load_model(model_path)
-    X = df[cols].fillna(0)
-    Xs = scaler.transform(X)
-    probs = model.predict_proba(Xs)[:,1]
-    df["prob_covert"] = probs
+    backend = load_backend(model_path)
+    X = df[backend.columns].fillna(0)
+    df["prob_covert"] = backend.predict_proba(X.to_numpy(dtype=float))
     return df
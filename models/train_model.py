@@ -2,33 +2,65 @@
 """
 Train & evaluate models. Uses a simple labeling heuristic for simulated data:
  - flow filename containing '10.0.0.3' -> covert (1), else normal (0)
-Saves model + scaler + columns as joblib.
+Saves model + scaler + columns (+ compiled forest arrays) as joblib.
+
+--stream trains out of core on feature files larger than RAM: chunks are
+streamed twice at most, the scaler is fit with partial_fit and the model is
+either trained on a stratified reservoir sample (rf / hgb) or incrementally
+with partial_fit (sgd). The artifact format is unchanged.
 """
 import os
+import sys
 import json
-import joblib
 import argparse
+import numpy as np
 import pandas as pd
-from sklearn.ensemble import RandomForestClassifier
+from sklearn.ensemble import RandomForestClassifier, HistGradientBoostingClassifier
+from sklearn.linear_model import SGDClassifier
 from sklearn.preprocessing import StandardScaler
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import classification_report, roc_auc_score
 
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(THIS_DIR, ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from models.compiled_forest import compile_forest
+from models.artifacts import save_artifact
+from features.feature_io import iter_feature_chunks, CHUNK_SIZE
+
 MODEL_DIR = "models"
 os.makedirs(MODEL_DIR, exist_ok=True)
 
+META_COLS = ["flow", "window_start", "window_end", "label"]
+
+def label_of(flow):
+    return 1 if "10.0.0.3" in flow or "10.0.0.4" in flow else 0
+
 def load_features_json(json_path):
     with open(json_path) as f:
         feats = json.load(f)
     df = pd.DataFrame(feats)
-    df["label"] = df["flow"].apply(lambda x: 1 if "10.0.0.3" in x or "10.0.0.4" in x else 0)
-    X = df.drop(columns=["flow", "window_start", "window_end", "label"], errors="ignore")
+    df["label"] = df["flow"].apply(label_of)
+    X = df.drop(columns=META_COLS, errors="ignore")
     X = X.fillna(0)
     y = df["label"].values
     return X, y
 
-def train(json_path, out_model=None):
+def report(y_test, probs):
+    print(classification_report(y_test, (probs >= 0.5).astype(int)))
+    try:
+        auc = roc_auc_score(y_test, probs)
+        print(f"AUC: {auc:.4f}")
+    except Exception:
+        pass
+
+def train(json_path, out_model=None, columns=None):
     X, y = load_features_json(json_path)
+    if columns is not None:
+        # pruned feature set (models/feature_select.py)
+        X = X[list(columns)]
     scaler = StandardScaler()
     Xs = scaler.fit_transform(X)
     X_train, X_test, y_train, y_test = train_test_split(Xs, y, test_size=0.25, random_state=42, stratify=y)
@@ -45,17 +77,156 @@ def train(json_path, out_model=None):
     model_art = {
         "model": clf,
         "scaler": scaler,
-        "columns": list(X.columns)
+        "columns": list(X.columns),
+        # flattened forest + scaler for the low-latency evaluator
+        "compiled": compile_forest(clf, scaler)
     }
     if out_model is None:
         out_model = os.path.join(MODEL_DIR, "rf_detector.joblib")
-    joblib.dump(model_art, out_model)
+    save_artifact(model_art, out_model)
     print(f"[+] Saved model → {out_model}")
     return out_model
 
+# -------------------------------------------------
+# Out-of-core training
+# -------------------------------------------------
+STREAM_MODELS = ("rf", "hgb", "sgd")
+RESERVOIR_SIZE = 200_000    # windows kept for rf / hgb (split evenly per class)
+HOLDOUT = 0.1               # fraction of windows held out for evaluation
+HOLDOUT_SIZE = 20_000       # max held-out windows kept (per class)
+
+def split_chunk(df, columns=None):
+    y = df["flow"].apply(label_of).to_numpy()
+    X = df.drop(columns=META_COLS, errors="ignore")
+    if columns is not None:
+        X = X.reindex(columns=columns, fill_value=0.0)
+    return X.fillna(0), y
+
+class StratifiedReservoir:
+    """
+    Fixed-size uniform sample of a stream, one reservoir per class
+    (Algorithm R, applied a chunk at a time).
+    """
+
+    def __init__(self, capacity, n_features, classes=(0, 1), seed=42):
+        self.capacity = capacity
+        self.rng = np.random.default_rng(seed)
+        self.rows = {c: np.empty((capacity, n_features)) for c in classes}
+        self.seen = {c: 0 for c in classes}
+
+    def add(self, X, y):
+        for c, buf in self.rows.items():
+            rows = X[y == c]
+            n = self.seen[c]
+
+            # free slots first
+            k = min(max(self.capacity - n, 0), len(rows))
+            buf[n:n + k] = rows[:k]
+
+            # then replace slot r ~ U[0, i] when r < capacity (i = stream index);
+            # later rows win on collisions, as in the sequential algorithm
+            rest = rows[k:]
+            if len(rest):
+                r = self.rng.integers(0, n + k + np.arange(len(rest)) + 1)
+                keep = r < self.capacity
+                buf[r[keep]] = rest[keep]
+            self.seen[c] = n + len(rows)
+
+    def sample(self):
+        X, y = [], []
+        for c, buf in self.rows.items():
+            m = min(self.seen[c], self.capacity)
+            X.append(buf[:m])
+            y.append(np.full(m, c))
+        return np.concatenate(X), np.concatenate(y)
+
+def _scaled(scaler, X, columns):
+    return scaler.transform(pd.DataFrame(X, columns=columns))
+
+def train_streaming(path, out_model=None, model="rf", chunk_size=CHUNK_SIZE,
+                    reservoir=RESERVOIR_SIZE, epochs=1, seed=42):
+    if model not in STREAM_MODELS:
+        raise ValueError(f"model must be one of {STREAM_MODELS}")
+
+    scaler = StandardScaler()
+    columns = None
+    train_res = holdout_res = None
+    n_windows = 0
+
+    # Pass 1: scaler statistics, holdout + (rf / hgb) training reservoir
+    rng = np.random.default_rng(seed)
+    for df in iter_feature_chunks(path, chunk_size):
+        X, y = split_chunk(df, columns)
+        if columns is None:
+            columns = list(X.columns)
+            train_res = StratifiedReservoir(max(reservoir // 2, 1), len(columns), seed=seed)
+            holdout_res = StratifiedReservoir(HOLDOUT_SIZE, len(columns), seed=seed + 1)
+
+        scaler.partial_fit(X)
+        held = rng.random(len(y)) < HOLDOUT
+        Xa = X.to_numpy(dtype=np.float64)
+        holdout_res.add(Xa[held], y[held])
+        if model != "sgd":
+            train_res.add(Xa[~held], y[~held])
+        n_windows += len(y)
+        print(f"[+] {n_windows} windows read")
+
+    if columns is None:
+        raise ValueError(f"{path}: no windows")
+
+    if model == "sgd":
+        # Pass 2+: incremental fit, same holdout split as pass 1
+        clf = SGDClassifier(loss="log_loss", random_state=seed)
+        for epoch in range(epochs):
+            rng = np.random.default_rng(seed)
+            for df in iter_feature_chunks(path, chunk_size):
+                X, y = split_chunk(df, columns)
+                held = rng.random(len(y)) < HOLDOUT
+                if (~held).any():
+                    clf.partial_fit(scaler.transform(X[~held]), y[~held], classes=[0, 1])
+            print(f"[+] epoch {epoch + 1}/{epochs} done")
+    else:
+        Xr, yr = train_res.sample()
+        print(f"[+] Training {model} on a {len(yr)}-window stratified reservoir "
+              f"({int(yr.sum())} covert)")
+        if model == "rf":
+            clf = RandomForestClassifier(n_estimators=150, random_state=42, n_jobs=-1)
+        else:
+            clf = HistGradientBoostingClassifier(random_state=42)
+        clf.fit(_scaled(scaler, Xr, columns), yr)
+        if model == "rf":
+            clf.set_params(n_jobs=None)
+
+    Xh, yh = holdout_res.sample()
+    if len(yh):
+        report(yh, clf.predict_proba(_scaled(scaler, Xh, columns))[:, 1])
+
+    model_art = {
+        "model": clf,
+        "scaler": scaler,
+        "columns": columns
+    }
+    if model == "rf":
+        model_art["compiled"] = compile_forest(clf, scaler)
+    if out_model is None:
+        out_model = os.path.join(MODEL_DIR, "rf_detector.joblib")
+    save_artifact(model_art, out_model)
+    print(f"[+] Saved model → {out_model} ({n_windows} windows streamed)")
+    return out_model
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("features_json")
     parser.add_argument("--out", help="model output path", default=None)
+    parser.add_argument("--stream", action="store_true", help="out-of-core training on streamed chunks")
+    parser.add_argument("--model", choices=STREAM_MODELS, default="rf", help="--stream model")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--reservoir", type=int, default=RESERVOIR_SIZE,
+                        help="windows kept for rf / hgb (stratified by class)")
+    parser.add_argument("--epochs", type=int, default=1, help="sgd passes over the data")
     args = parser.parse_args()
-    train(args.features_json, args.out)
+    if args.stream:
+        train_streaming(args.features_json, args.out, args.model, args.chunk_size,
+                        args.reservoir, args.epochs)
+    else:
+        train(args.features_json, args.out)
@@ -1,90 +1,344 @@
 # sender/sender_simulator.py
 """
 Synthetic packet generator for testing covert timing channel detection.
-Creates:
- - A normal flow (random inter-arrival times)
- - A covert flow (timing-based bit encoding)
+Creates any mix of concurrent flows:
+ - normal flows: exponential (Poisson), Pareto (heavy-tailed) or bursty
+   on/off inter-arrival times
+ - covert flows: a bitstring encoded in the inter-packet delays, as
+   binary short/long delays, 4-level delays (2 bits per packet),
+   low-amplitude jitter around a base delay or on/off time slots
+Each flow draws from its own RNG stream, spawned from --seed, so a flow's
+packets do not depend on which other flows are generated. IPDs are drawn in
+NumPy blocks per flow; packets are merged in time order one chunk
+(--chunk-s simulated seconds) at a time and appended to the output, so
+memory stays bounded however long the run is.
 Outputs CSV: sender_output/<timestamp>_packets.csv
 NO ADMIN RIGHTS NEEDED.
+
+Usage:
+    python sender/sender_simulator.py                                   # 1 normal + 1 covert flow
+    python sender/sender_simulator.py --mix exp=500,pareto=300,onoff=200,binary=5,multilevel=5 --duration 60
+    python sender/sender_simulator.py --mix exp=2000 --rate 1000 --duration 10 --format none    # generator speed only
 """
 import os
-import csv
 import time
 import argparse
-import random
 from datetime import datetime
 
+import numpy as np
+
 OUT_DIR = "sender_output"
+COLUMNS = ["ts", "src", "dst", "sport", "dport", "proto", "length"]
+CHUNK_S = 1.0
+MIN_BLOCK = 256
+
+# Covert delays (same as sender_icmp.py / sender_tcp.py)
+SHORT = 0.02
+LONG = 0.12
+SEND_S = 0.001                          # time to emit the packet itself
+SEQ_GAP = (0.2, 0.4)                    # pause between repeats of the bitstring
+LEVELS = np.array([0.02, 0.05, 0.08, 0.11])
+JITTER_BASE = 0.05
+JITTER_DELTA = 0.004
+SLOT = 0.03
+
+# Normal traffic shape
+PARETO_SHAPE = 1.5
+BURST_PKTS = 20                         # mean packets per on-period
+BURST_SPEEDUP = 10                      # rate inside a burst vs the mean rate
 
 def ensure_dir():
     os.makedirs(OUT_DIR, exist_ok=True)
 
-def generate_normal_flow(start_ts, n_pkts=500, rate=50, src="10.0.0.1", dst="10.0.0.2"):
+# -------------------------------------------------
+# Normal IPD models: (flow, n) → n IPDs with mean 1 / flow.rate
+# -------------------------------------------------
+def exp_ipds(flow, n):
+    return flow.rng.exponential(1.0 / flow.rate, n)
+
+def pareto_ipds(flow, n):
+    xm = (PARETO_SHAPE - 1) / (PARETO_SHAPE * flow.rate)
+    return xm * (1.0 + flow.rng.pareto(PARETO_SHAPE, n))
+
+def onoff_ipds(flow, n):
+    """Bursts of ~BURST_PKTS fast packets separated by exponential off-periods."""
+    burst_rate = flow.rate * BURST_SPEEDUP
+    off_mean = BURST_PKTS / flow.rate - (BURST_PKTS - 1) / burst_rate
+    starts = flow.rng.random(n) < 1.0 / BURST_PKTS      # geometric burst lengths
+    on = flow.rng.exponential(1.0 / burst_rate, n)
+    off = flow.rng.exponential(off_mean, n)
+    return np.where(starts, off, on)
+
+# -------------------------------------------------
+# Covert encodings: (flow, n) → n IPDs carrying flow.bits from flow.pos on
+# -------------------------------------------------
+def _message_index(flow, n, length):
+    idx = (flow.pos + np.arange(n)) % length
+    flow.pos = (flow.pos + n) % length
+    return idx
+
+def _sequence_gaps(flow, idx, length):
+    """SEQ_GAP pause after the last symbol of every repeat."""
+    return np.where(idx == length - 1, flow.rng.uniform(*SEQ_GAP, len(idx)), 0.0)
+
+def binary_ipds(flow, n):
+    """short delay = '0', long delay = '1' (±10%)"""
+    idx = _message_index(flow, n, len(flow.bits))
+    delay = np.where(flow.bits[idx] == 1, LONG, SHORT) * flow.rng.uniform(0.9, 1.1, n)
+    return SEND_S + delay + _sequence_gaps(flow, idx, len(flow.bits))
+
+def multilevel_ipds(flow, n):
+    """2 bits per packet, one of 4 delay levels (±5%)"""
+    bits = flow.bits if len(flow.bits) % 2 == 0 else np.append(flow.bits, 0)
+    symbols = bits[0::2] * 2 + bits[1::2]
+    idx = _message_index(flow, n, len(symbols))
+    delay = LEVELS[symbols[idx]] * flow.rng.uniform(0.95, 1.05, n)
+    return SEND_S + delay + _sequence_gaps(flow, idx, len(symbols))
+
+def lowjitter_ipds(flow, n):
+    """JITTER_BASE ± JITTER_DELTA per bit, hidden in Gaussian noise"""
+    idx = _message_index(flow, n, len(flow.bits))
+    delay = JITTER_BASE + np.where(flow.bits[idx] == 1, JITTER_DELTA, -JITTER_DELTA)
+    return np.maximum(delay + flow.rng.normal(0.0, JITTER_DELTA / 2, n), SEND_S)
+
+def slots_ipds(flow, n):
+    """one SLOT per bit, a packet only in the '1' slots"""
+    ones = np.flatnonzero(flow.bits)
+    gaps = np.diff(np.append(ones, ones[0] + len(flow.bits)))
+    idx = _message_index(flow, n, len(gaps))
+    return np.maximum(SLOT * gaps[idx] + flow.rng.normal(0.0, SLOT * 0.05, n), SEND_S)
+
+NORMAL_MODELS = {"exp": exp_ipds, "pareto": pareto_ipds, "onoff": onoff_ipds}
+COVERT_ENCODINGS = {
+    "binary": binary_ipds,
+    "multilevel": multilevel_ipds,
+    "lowjitter": lowjitter_ipds,
+    "slots": slots_ipds,
+}
+
+def covert_rate(kind, bits):
+    """Mean packets/s of a covert flow (sizes its IPD blocks)."""
+    mean = {
+        "binary": SEND_S + SHORT + (LONG - SHORT) * bits.mean() + sum(SEQ_GAP) / 2 / len(bits),
+        "multilevel": SEND_S + LEVELS.mean(),
+        "lowjitter": JITTER_BASE,
+        "slots": SLOT * len(bits) / max(1, bits.sum()),
+    }[kind]
+    return 1.0 / mean
+
+# -------------------------------------------------
+# Flows
+# -------------------------------------------------
+class Flow:
+    """One flow's addressing, RNG stream and not-yet-emitted packets."""
+
+    __slots__ = ("index", "kind", "src", "dst", "sport", "dport", "proto", "rate",
+                 "rng", "bits", "pos", "remaining", "last_ts", "ts", "length")
+
+    def __init__(self, index, kind, src, dst, sport, dport, proto, rate, rng,
+                 start_ts, bits=None, n_pkts=None):
+        self.index = index
+        self.kind = kind
+        self.src, self.dst = src, dst
+        self.sport, self.dport, self.proto = sport, dport, proto
+        self.rate = rate
+        self.rng = rng
+        self.bits = bits
+        self.pos = 0
+        self.remaining = n_pkts             # None = unlimited
+        self.last_ts = start_ts
+        self.ts = np.empty(0)
+        self.length = np.empty(0, dtype=np.int32)
+
+    @property
+    def covert(self):
+        return self.kind in COVERT_ENCODINGS
+
+    @property
+    def done(self):
+        return self.remaining == 0 and not len(self.ts)
+
+    def refill(self, n):
+        if self.remaining is not None:
+            n = min(n, self.remaining)
+            self.remaining -= n
+        if n <= 0:
+            return
+        gen = COVERT_ENCODINGS.get(self.kind) or NORMAL_MODELS[self.kind]
+        ts = self.last_ts + np.cumsum(gen(self, n))
+        self.last_ts = ts[-1]
+        if self.covert:
+            length = np.full(n, 64, dtype=np.int32)
+        else:
+            length = self.rng.integers(60, 1501, n, dtype=np.int32)
+        self.ts = np.concatenate([self.ts, ts])
+        self.length = np.concatenate([self.length, length])
+
+    def take(self, end_ts):
+        """(ts, length) of this flow's packets before end_ts."""
+        while self.remaining != 0 and (not len(self.ts) or self.ts[-1] < end_ts):
+            self.refill(max(MIN_BLOCK, int((end_ts - self.last_ts) * self.rate * 1.2)))
+        k = int(np.searchsorted(self.ts, end_ts))
+        ts, length = self.ts[:k], self.length[:k]
+        self.ts, self.length = self.ts[k:], self.length[k:]
+        return ts, length
+
+def parse_mix(text):
+    """'exp=100,binary=5' → [("exp", 100), ("binary", 5)]"""
+    mix = []
+    for part in text.split(","):
+        kind, _, count = part.strip().partition("=")
+        if kind not in NORMAL_MODELS and kind not in COVERT_ENCODINGS:
+            raise ValueError(f"unknown flow kind {kind!r}; choose from "
+                             f"{sorted(NORMAL_MODELS) + sorted(COVERT_ENCODINGS)}")
+        mix.append((kind, int(count or 1)))
+    return mix
+
+def flow_addresses(i, covert):
     """
-    Normal traffic using exponential inter-arrival times.
+    (src, dst) of the i-th normal / covert flow. The first of each keeps the
+    original pair (10.0.0.1 → 10.0.0.2, 10.0.0.3 → 10.0.0.4); the others come
+    from 10.1.x.y (normal) and 10.2.x.y (covert), towards the same dst.
     """
-    ts = start_ts
-    rows = []
-    for _ in range(n_pkts):
-        ipd = random.expovariate(rate)       # exponential IPD
-        ts += ipd
-        rows.append((ts, src, dst, 40000, 80, "TCP", random.randint(60, 1500)))
-    return rows
-
-def generate_covert_flow(start_ts, bits="1011001", repeat=40, src="10.0.0.3", dst="10.0.0.4"):
+    dst = "10.0.0.4" if covert else "10.0.0.2"
+    if i == 0:
+        return ("10.0.0.3" if covert else "10.0.0.1"), dst
+    net = 2 if covert else 1
+    return f"10.{net}.{i // 250}.{i % 250 + 1}", dst
+
+def build_flows(mix, start_ts, seed=0, rate=30.0, rate_spread=0.0, bits="1011001",
+                normal_pkts=None, covert_pkts=None):
     """
-    Covert timing channel: short delay = '0', long delay = '1'
+    Flows of a mix: normal flows TCP, covert flows ICMP (see flow_addresses).
+    Flow k gets the k-th stream spawned from seed.
+    rate_spread > 0 draws each normal flow's rate log-normally around rate.
     """
-    SHORT = 0.02
-    LONG  = 0.12
+    bits = np.frombuffer(bits.encode(), dtype=np.uint8) - ord("0")
+    if not len(bits) or ((bits != 0) & (bits != 1)).any():
+        raise ValueError("bits must be a non-empty string of 0/1")
+    kinds = [kind for kind, count in mix for _ in range(count)]
+    streams = np.random.SeedSequence(seed).spawn(len(kinds))
+    flows, n_normal, n_covert = [], 0, 0
+    for index, (kind, ss) in enumerate(zip(kinds, streams)):
+        rng = np.random.default_rng(ss)
+        if kind in COVERT_ENCODINGS:
+            if kind == "slots" and not bits.any():
+                raise ValueError("slots encoding needs at least one '1' bit")
+            src, dst = flow_addresses(n_covert, covert=True)
+            n_covert += 1
+            flows.append(Flow(index, kind, src, dst, 0, 0, "ICMP",
+                              covert_rate(kind, bits), rng, start_ts, bits=bits, n_pkts=covert_pkts))
+        else:
+            src, dst = flow_addresses(n_normal, covert=False)
+            r = rate * rng.lognormal(0.0, rate_spread) if rate_spread > 0 else rate
+            flows.append(Flow(index, kind, src, dst, 40000 + n_normal % 20000, 80, "TCP",
+                              r, rng, start_ts, n_pkts=normal_pkts))
+            n_normal += 1
+    return flows
 
-    ts = start_ts
-    rows = []
-    for _ in range(repeat):
-        for b in bits:
-            ts += 0.001                      # packet timestamp
-            rows.append((ts, src, dst, 0, 0, "ICMP", 64))
+# -------------------------------------------------
+# Time-ordered chunks
+# -------------------------------------------------
+def generate_chunks(flows, start_ts, chunk_s=CHUNK_S, duration=None):
+    """
+    Yields (ts, flow_index, length) arrays, time-ordered, one per chunk_s of
+    simulated time, until duration or until every flow ran out of packets.
+    """
+    if duration is None and any(f.remaining is None for f in flows):
+        raise ValueError("unlimited flows need a duration")
+    stop = start_ts + duration if duration is not None else np.inf
+    t = start_ts
+    while t < stop and not all(f.done for f in flows):
+        end = min(t + chunk_s, stop)
+        parts = [f.take(end) for f in flows]
+        counts = [len(ts) for ts, _ in parts]
+        ts = np.concatenate([p[0] for p in parts])
+        # per-flow runs are already sorted, so the stable sort is a merge
+        order = np.argsort(ts, kind="stable")
+        flow = np.repeat(np.arange(len(flows), dtype=np.int32), counts)
+        yield ts[order], flow[order], np.concatenate([p[1] for p in parts])[order]
+        t = end
 
-            # Encode bit using timing
-            ts += random.uniform(SHORT*0.9, SHORT*1.1) if b == "0" else \
-                  random.uniform(LONG*0.9, LONG*1.1)
+def row_suffixes(flows):
+    """",src,dst,sport,dport,proto," of every flow, indexed by flow index."""
+    return [f",{f.src},{f.dst},{f.sport},{f.dport},{f.proto}," for f in flows]
 
-        ts += random.uniform(0.2, 0.4)       # gap between sequences
-    return rows
+def format_rows(chunk, suffixes):
+    """CSV text of one chunk (COLUMNS order, timestamps to the microsecond)."""
+    ts, flow, length = chunk
+    sec, usec = np.divmod(np.round(ts * 1e6).astype(np.int64), 1_000_000)
+    return "".join([f"{s}.{u:06d}{suffixes[f]}{n}\n" for s, u, f, n in
+                    zip(sec.tolist(), usec.tolist(), flow.tolist(), length.tolist())])
 
-def write_csv(rows, out_path):
-    """
-    Write packet rows to CSV.
-    """
-    with open(out_path, "w", newline="") as f:
-        w = csv.writer(f)
-        w.writerow(["ts","src","dst","sport","dport","proto","length"])
-        w.writerows(rows)
+def write_chunks(chunks, flows, out_path, fmt="csv"):
+    """Append chunks to out_path as they are generated. Returns the packet count."""
+    total = 0
+    if fmt == "csv":
+        suffixes = row_suffixes(flows)
+        with open(out_path, "w", newline="") as f:
+            f.write(",".join(COLUMNS) + "\n")
+            for chunk in chunks:
+                f.write(format_rows(chunk, suffixes))
+                total += len(chunk[0])
+    else:                               # "none": generation only (benchmark)
+        for chunk in chunks:
+            total += len(chunk[0])
+    return total
 
+# -------------------------------------------------
 def main(args):
-    ensure_dir()
-    t0 = time.time()
+    if args.mix:
+        mix = parse_mix(args.mix)
+        normal_pkts = args.packets_per_flow
+        covert_pkts = args.packets_per_flow
+        if args.duration is None and normal_pkts is None:
+            raise SystemExit("--mix needs --duration or --packets-per-flow")
+    else:
+        # the original pair: one exponential flow and one binary covert flow
+        mix = [("exp", 1), ("binary", 1)]
+        normal_pkts = args.normal_pkts
+        covert_pkts = len(args.bits) * args.repeat
 
-    # Generate normal + covert traffic
-    normal = generate_normal_flow(t0, n_pkts=args.normal_pkts, rate=args.rate)
-    covert = generate_covert_flow(t0, bits=args.bits, repeat=args.repeat)
+    t0 = time.time() if args.start is None else args.start
+    flows = build_flows(mix, t0, seed=args.seed, rate=args.rate, rate_spread=args.rate_spread,
+                        bits=args.bits, normal_pkts=normal_pkts, covert_pkts=covert_pkts)
 
-    # Combine & sort
-    all_rows = sorted(normal + covert, key=lambda x: x[0])
+    if args.out:
+        out_path = args.out
+    else:
+        ensure_dir()
+        ts_str = datetime.now().strftime("%Y%m%d_%H%M%S")
+        out_path = os.path.join(OUT_DIR, f"{ts_str}_packets.csv")
 
-    # Save output
-    ts_str = datetime.now().strftime("%Y%m%d_%H%M%S")
-    out_path = os.path.join(OUT_DIR, f"{ts_str}_packets.csv")
-    write_csv(all_rows, out_path)
+    started = time.perf_counter()
+    chunks = generate_chunks(flows, t0, chunk_s=args.chunk_s, duration=args.duration)
+    total = write_chunks(chunks, flows, out_path, fmt=args.format)
+    elapsed = time.perf_counter() - started
 
-    print(f"[+] Generated {len(all_rows)} packets → {out_path}")
-    print("[!] Use this file with capture_from_csv.py")
+    n_covert = sum(f.covert for f in flows)
+    print(f"[+] Generated {total} packets from {len(flows) - n_covert} normal + {n_covert} covert flows "
+          f"in {elapsed:.2f}s ({total / max(elapsed, 1e-9):,.0f} packets/s)")
+    if args.format == "csv":
+        print(f"[+] Written → {out_path}")
+        print("[!] Use this file with capture_from_csv.py")
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--bits", default="1011001", help="Covert bitstring")
-    parser.add_argument("--repeat", type=int, default=40, help="Repeat bitstring")
-    parser.add_argument("--normal_pkts", type=int, default=1000, help="Normal traffic packets")
-    parser.add_argument("--rate", type=float, default=30, help="Normal traffic avg packet/s")
+    parser.add_argument("--repeat", type=int, default=40, help="Repeat bitstring (default mix)")
+    parser.add_argument("--normal_pkts", type=int, default=1000, help="Normal traffic packets (default mix)")
+    parser.add_argument("--rate", type=float, default=30, help="Normal traffic avg packet/s per flow")
+    parser.add_argument("--mix", help="Flows per kind, e.g. exp=100,pareto=50,onoff=50,binary=5,"
+                                      "multilevel=2,lowjitter=2,slots=2")
+    parser.add_argument("--duration", type=float, help="Simulated seconds (with --mix)")
+    parser.add_argument("--packets-per-flow", type=int, help="Stop each flow after N packets (with --mix)")
+    parser.add_argument("--rate-spread", type=float, default=0.0,
+                        help="Log-normal sigma of per-flow normal rates (0 = all at --rate)")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for the per-flow RNG streams")
+    parser.add_argument("--start", type=float, help="First timestamp (default: now)")
+    parser.add_argument("--chunk-s", type=float, default=CHUNK_S, help="Simulated seconds per output chunk")
+    parser.add_argument("--format", choices=["csv", "none"], default="csv",
+                        help="none = generate and count only (benchmark)")
+    parser.add_argument("--out", help="Output CSV (default sender_output/<timestamp>_packets.csv)")
     args = parser.parse_args()
     main(args)
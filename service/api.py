@@ -0,0 +1,155 @@
+# service/api.py
+"""
+Local HTTP scoring service: loads the models once and scores batches.
+
+    python -m service.api --port 8000
+    uvicorn service.api:app --port 8000
+
+Endpoints
+    POST /score        JSON  {"ipds": [[ipd, ...], ...]}          one window per sequence
+                             {"features": [{column: value}, ...]}  precomputed feature rows
+                       → {"results": [{ml_prob, suspicion_score, iforest_risk, final_risk, decision}]}
+    POST /score/npy?kind=ipds|features
+                       body: application/x-npy float array, (n, window) IPDs or
+                       (n, len(GET /columns)) feature rows
+                       → application/x-npy (n, 4) float64, columns as OUTPUTS
+                         (JSON instead unless Accept: application/x-npy)
+    GET  /columns      feature column order for binary feature rows
+    GET  /metrics      request/item counts, batch sizes, throughput, latency percentiles
+    GET  /health
+
+Requests from concurrent clients are merged by service.scoring.MicroBatcher,
+so the models run once per micro-batch on a thread pool and the event loop
+only parses and serialises.
+"""
+
+import io
+import os
+import sys
+import asyncio
+import argparse
+from contextlib import asynccontextmanager
+
+import numpy as np
+from fastapi import FastAPI, HTTPException, Request, Response
+
+# -------------------------------------------------
+# Ensure project root on PYTHONPATH
+# -------------------------------------------------
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(THIS_DIR, ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from service.scoring import (
+    Scorer, MicroBatcher, result_rows, OUTPUTS,
+    MODEL_PATH, IFOREST_PATH, MAX_BATCH, MAX_WAIT_MS, WORKERS,
+)
+from fusion.profiles import PROFILE_PATH
+
+SERVICE_HOST = "127.0.0.1"
+SERVICE_PORT = 8000
+MAX_ITEMS = 10_000      # per request
+NPY_TYPE = "application/x-npy"
+
+CONFIG = {
+    "model_path": MODEL_PATH,
+    "iforest_path": IFOREST_PATH,
+    "profile_path": PROFILE_PATH,
+    "max_batch": MAX_BATCH,
+    "max_wait_ms": MAX_WAIT_MS,
+    "workers": WORKERS,
+}
+
+@asynccontextmanager
+async def lifespan(app):
+    scorer = Scorer(CONFIG["model_path"], CONFIG["iforest_path"], CONFIG["profile_path"])
+    app.state.scorer = scorer
+    app.state.batcher = MicroBatcher(scorer.score, CONFIG["max_batch"],
+                                     CONFIG["max_wait_ms"], CONFIG["workers"])
+    print(f"[+] Models loaded: RF {len(scorer.columns)} cols, IF {len(scorer.if_columns)} cols")
+    yield
+    app.state.batcher.close()
+
+app = FastAPI(title="Covert Timing Channel IDS scoring", lifespan=lifespan)
+
+async def score_items(items):
+    if not items:
+        raise HTTPException(400, "empty batch")
+    if len(items) > MAX_ITEMS:
+        raise HTTPException(413, f"at most {MAX_ITEMS} items per request")
+    try:
+        return await asyncio.wrap_future(app.state.batcher.submit(items))
+    except ValueError as e:
+        raise HTTPException(422, str(e))
+
+# -------------------------------------------------
+# Endpoints
+# -------------------------------------------------
+@app.post("/score")
+async def score(payload: dict):
+    items = ([("ipds", w) for w in payload.get("ipds") or []]
+             + [("features", row) for row in payload.get("features") or []])
+    return {"results": result_rows(await score_items(items))}
+
+@app.post("/score/npy")
+async def score_npy(request: Request, kind: str = "ipds"):
+    if kind not in ("ipds", "features"):
+        raise HTTPException(400, "kind must be ipds or features")
+    try:
+        arr = np.load(io.BytesIO(await request.body()), allow_pickle=False)
+    except ValueError as e:
+        raise HTTPException(400, f"not an .npy array: {e}")
+    if arr.ndim != 2:
+        raise HTTPException(400, "expected a 2-D array")
+    arr = arr.astype(np.float64, copy=False)
+    if kind == "features":
+        cols = app.state.scorer.feature_columns
+        if arr.shape[1] != len(cols):
+            raise HTTPException(400, f"expected {len(cols)} feature columns (GET /columns)")
+        items = [("features", dict(zip(cols, row))) for row in arr.tolist()]
+    else:
+        items = [("ipds", row) for row in arr]
+    scores = await score_items(items)
+
+    if NPY_TYPE in request.headers.get("accept", ""):
+        buf = io.BytesIO()
+        np.save(buf, scores)
+        return Response(buf.getvalue(), media_type=NPY_TYPE,
+                        headers={"X-Columns": ",".join(OUTPUTS)})
+    return {"results": result_rows(scores)}
+
+@app.get("/columns")
+def columns():
+    return {"features": app.state.scorer.feature_columns, "outputs": OUTPUTS}
+
+@app.get("/metrics")
+def metrics():
+    return app.state.batcher.metrics()
+
+@app.get("/health")
+def health():
+    return {"status": "ok"}
+
+# -------------------------------------------------
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Batch scoring HTTP service")
+    parser.add_argument("--host", default=SERVICE_HOST)
+    parser.add_argument("--port", type=int, default=SERVICE_PORT)
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--iforest", default=IFOREST_PATH)
+    parser.add_argument("--profile", default=PROFILE_PATH)
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH, help="items per micro-batch")
+    parser.add_argument("--max-wait-ms", type=float, default=MAX_WAIT_MS,
+                        help="how long the first request of a batch waits for others")
+    parser.add_argument("--workers", type=int, default=WORKERS, help="scoring threads")
+    args = parser.parse_args()
+
+    CONFIG.update(model_path=args.model, iforest_path=args.iforest, profile_path=args.profile,
+                  max_batch=args.max_batch, max_wait_ms=args.max_wait_ms, workers=args.workers)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+# service/scoring.py
+"""
+Batch scoring core of the HTTP service (service/api.py), framework-free.
+
+Scorer loads the RF backend, the compiled Isolation Forest, its calibration
+and the baseline profile once (fusion/pipeline.load_assets) and scores
+batches of
+- IPD sequences: one window each → timing features, stat tests, RF, IF and
+  the fused risk (same functions as fusion/pipeline.py)
+- feature rows: RF and IF only; fusion renormalises over the two
+MicroBatcher merges concurrent requests: items wait at most max_wait_ms
+(or until max_batch items are queued) and are scored as one batch on a
+thread pool, so each model runs once per batch instead of once per request.
+"""
+
+import time
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import numpy as np
+
+from features.feature_utils import compute_features
+from fusion.pipeline import load_assets
+from fusion.profiles import PROFILE_PATH
+from fusion.risk_engine import fuse_risk, decision_labels
+from models.compiled_forest import iforest_score_samples
+from models.iforest_calibration import calibrated_risk
+from live.perf import LatencyStats
+
+MODEL_PATH = "models/rf_detector.joblib"
+IFOREST_PATH = "models/iforest_detector.joblib"
+MAX_BATCH = 256
+MAX_WAIT_MS = 5.0
+WORKERS = 4
+MIN_IPDS = 10
+OUTPUTS = ["ml_prob", "suspicion_score", "iforest_risk", "final_risk"]
+
+# -------------------------------------------------
+# Scoring
+# -------------------------------------------------
+class Scorer:
+    def __init__(self, model_path=MODEL_PATH, iforest_path=IFOREST_PATH, profile_path=PROFILE_PATH):
+        self.assets = load_assets(model_path, iforest_path, profile_path=profile_path)
+        self.columns = list(self.assets["backend"].columns)
+        self.if_columns = list(self.assets["if_columns"])
+        self.feature_columns = sorted(set(self.columns) | set(self.if_columns))
+
+    def features_of(self, ipds):
+        """Feature dicts + suspicion scores of IPD sequences (one window each)."""
+        from stats.stat_tests import window_stat_scores
+
+        feats, susp = [], np.empty(len(ipds))
+        for i, w in enumerate(ipds):
+            w = np.asarray(w, dtype=np.float64)
+            if len(w) < MIN_IPDS:
+                raise ValueError(f"IPD sequence {i} has {len(w)} values, need at least {MIN_IPDS}")
+            feats.append(compute_features(w, self.assets["groups"]))
+            susp[i] = window_stat_scores(w, self.assets["stat_profile"])["suspicion_score"]
+        return feats, susp
+
+    def matrix(self, feats, columns):
+        return np.array([[f.get(c, 0.0) for c in columns] for f in feats], dtype=np.float64)
+
+    def score_matrices(self, X_ml, X_if, suspicion):
+        """(n, 4) array of OUTPUTS from model-ordered feature matrices."""
+        # NaN handling as in fusion/pipeline.process_flow: RF input filled with 0, IF as is
+        ml = self.assets["backend"].predict_proba(np.where(np.isnan(X_ml), 0.0, X_ml)) * 100
+        iforest = calibrated_risk(iforest_score_samples(self.assets["iforest"], X_if),
+                                  self.assets["calibration"])
+        return np.column_stack([ml, suspicion, iforest, fuse_risk(ml, suspicion, iforest)])
+
+    def score(self, items):
+        """
+        items: [("ipds", sequence) | ("features", {column: value})]
+        → (n, 4) array of OUTPUTS (suspicion_score NaN for feature rows).
+        """
+        ipd_pos = [i for i, (kind, _) in enumerate(items) if kind == "ipds"]
+        feats = [None] * len(items)
+        suspicion = np.full(len(items), np.nan)
+        if ipd_pos:
+            computed, susp = self.features_of([items[i][1] for i in ipd_pos])
+            for i, f, s in zip(ipd_pos, computed, susp):
+                feats[i], suspicion[i] = f, s
+        for i, (kind, row) in enumerate(items):
+            if kind == "features":
+                feats[i] = row
+        return self.score_matrices(self.matrix(feats, self.columns),
+                                   self.matrix(feats, self.if_columns), suspicion)
+
+def result_rows(scores):
+    """JSON-ready rows (NaN → None) with the decision label."""
+    labels = decision_labels(scores[:, 3])
+    rows = []
+    for s, label in zip(scores.tolist(), labels):
+        row = {k: (None if v != v else round(v, 4)) for k, v in zip(OUTPUTS, s)}
+        row["decision"] = label
+        rows.append(row)
+    return rows
+
+# -------------------------------------------------
+# Micro-batching
+# -------------------------------------------------
+class MicroBatcher:
+    """
+    submit(items) → Future of an (len(items), 4) array. A collector thread
+    groups queued requests into batches of up to max_batch items, waiting at
+    most max_wait_ms after the first one; batches run on `workers` threads.
+    """
+
+    def __init__(self, score_fn, max_batch=MAX_BATCH, max_wait_ms=MAX_WAIT_MS, workers=WORKERS):
+        self.score_fn = score_fn
+        self.max_batch = max_batch
+        self.max_wait_s = max_wait_ms / 1e3
+        self.pool = ThreadPoolExecutor(workers, thread_name_prefix="score")
+        self.latency = LatencyStats()
+        self.counts = {"requests": 0, "items": 0, "batches": 0, "errors": 0}
+        self._count_lock = threading.Lock()
+        self.started = time.time()
+        self._queue = queue.Queue()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._collect, name="micro-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, items):
+        fut = Future()
+        if not items:
+            fut.set_result(np.empty((0, len(OUTPUTS))))
+            return fut
+        self._queue.put((items, fut, time.perf_counter_ns()))
+        return fut
+
+    def _collect(self):
+        while not self._stop.is_set():
+            try:
+                first = self._queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            batch, n = [first], len(first[0])
+            deadline = time.perf_counter() + self.max_wait_s
+            while n < self.max_batch:
+                timeout = deadline - time.perf_counter()
+                if timeout <= 0:
+                    break
+                try:
+                    req = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                batch.append(req)
+                n += len(req[0])
+            self.pool.submit(self._run, batch)
+
+    def _run(self, batch):
+        items = [it for req, _, _ in batch for it in req]
+        t0 = time.perf_counter_ns()
+        try:
+            scores = self.score_fn(items)
+        except Exception as e:
+            # score requests one by one so a bad item only fails its own request
+            if len(batch) > 1:
+                for req in batch:
+                    self._run([req])
+                return
+            with self._count_lock:
+                self.counts["errors"] += 1
+            batch[0][1].set_exception(e)
+            return
+        done = time.perf_counter_ns()
+        self.latency.add("batch", done - t0)
+        with self._count_lock:
+            self.counts["batches"] += 1
+            self.counts["requests"] += len(batch)
+            self.counts["items"] += len(items)
+        pos = 0
+        for req, fut, t_in in batch:
+            self.latency.add("request", done - t_in)
+            fut.set_result(scores[pos:pos + len(req)])
+            pos += len(req)
+
+    def metrics(self):
+        elapsed = time.time() - self.started
+        with self._count_lock:
+            c = dict(self.counts)
+        return {
+            **c,
+            "queued": self._queue.qsize(),
+            "mean_batch_items": c["items"] / c["batches"] if c["batches"] else 0.0,
+            "items_per_s": c["items"] / elapsed if elapsed > 0 else 0.0,
+            "requests_per_s": c["requests"] / elapsed if elapsed > 0 else 0.0,
+            "uptime_s": elapsed,
+            "latency": self.latency.summary(),
+        }
+
+    def close(self):
+        self._stop.set()
+        self._thread.join()
+        self.pool.shutdown(wait=True)
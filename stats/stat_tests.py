@@ -82,3 +82,34 @@ def suspicion_score(ks_stat, ks_p, ad_stat, jsd):
     score += min(jsd * 100, 35)
 
     return min(100.0, score)
+
+# -------------------------------------------------
+# Per-window scoring against a precomputed baseline
+# (shared by offline extraction and the live detector)
+# -------------------------------------------------
+def baseline_profile(baseline_ipd):
+    """
+    Precompute everything about the baseline that does not depend on the
+    window, so scoring one window does not redo it.
+    """
+    baseline_ipd = np.asarray(baseline_ipd, dtype=float)
+    return {
+        "baseline_ipd": baseline_ipd,
+        "baseline_hist": normalize_hist(baseline_ipd),
+    }
+
+def window_stat_scores(ipd_window, profile):
+    """
+    KS / AD / JSD evidence and combined suspicion score for one window.
+    Identical to calling ks_test, ad_test, js_divergence and suspicion_score.
+    """
+    ks_stat, ks_p = ks_test(ipd_window, profile["baseline_ipd"])
+    ad_stat = ad_test(ipd_window)
+    jsd = float(jensenshannon(normalize_hist(ipd_window), profile["baseline_hist"]))
+    return {
+        "ks_stat": ks_stat,
+        "ks_pvalue": ks_p,
+        "ad_stat": ad_stat,
+        "js_divergence": jsd,
+        "suspicion_score": suspicion_score(ks_stat, ks_p, ad_stat, jsd),
+    }
@@ -0,0 +1,469 @@
+# storage/alert_store.py
+"""
+Indexed alert / risk store (SQLite, WAL mode).
+
+Replaces the append-only live/alerts.csv and fusion_output/final_risk_report.csv
+as the source the dashboards read:
+- alerts        one row per live alert (live/realtime_detector.py)
+- risk_windows  fused windows of a risk-engine run (fusion/risk_engine.py)
+- runs          one row per risk-engine run
+- incidents     one row per live incident (live/incidents.py), upserted
+
+WAL lets the detector write while dashboards read. Writes are batched:
+BatchWriter queues rows and inserts them in one transaction every
+`batch_size` rows or `flush_s` seconds from its own thread. Indexes on
+timestamp, flow, protocol and risk serve the filtered, paginated queries of
+the dashboards. Retention drops alerts older than N days / beyond N rows and
+risk-engine runs beyond the last N; compact() checkpoints the WAL and
+returns freed pages to the OS.
+
+Maintenance / migration:
+    python storage/alert_store.py --import-alerts live/alerts.csv --import-report fusion_output/final_risk_report.csv
+    python storage/alert_store.py --retain-days 30 --max-alerts 5000000 --keep-runs 10 --compact
+"""
+
+import os
+import time
+import queue
+import sqlite3
+import argparse
+import threading
+
+import numpy as np
+
+# pandas is imported by the query / import functions only, so the live
+# detector (writer side) does not load it at start-up
+
+DB_PATH = "storage/ids.db"
+SCHEMA_VERSION = 2
+
+ALERT_COLUMNS = ["timestamp", "flow", "protocol", "final_risk", "ml_prob",
+                 "stat_score", "iforest_risk", "sample_rate"]
+INCIDENT_COLUMNS = ["flow", "protocol", "src_ip", "first_ts", "last_ts", "peak_risk",
+                    "mean_risk", "windows", "state"]
+WINDOW_COLUMNS = ["flow", "window_start", "window_end", "ml_prob", "suspicion_score",
+                  "ks_pvalue", "ad_stat", "js_divergence", "iforest_risk",
+                  "final_risk", "decision", "explanation"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS alerts (
+    id           INTEGER PRIMARY KEY,
+    timestamp    REAL NOT NULL,
+    flow         TEXT NOT NULL,
+    protocol     TEXT,
+    final_risk   REAL NOT NULL,
+    ml_prob      REAL,
+    stat_score   REAL,
+    iforest_risk REAL,
+    sample_rate  REAL
+);
+CREATE INDEX IF NOT EXISTS alerts_ts ON alerts (timestamp);
+CREATE INDEX IF NOT EXISTS alerts_flow_ts ON alerts (flow, timestamp);
+CREATE INDEX IF NOT EXISTS alerts_proto_ts ON alerts (protocol, timestamp);
+CREATE INDEX IF NOT EXISTS alerts_risk ON alerts (final_risk);
+
+CREATE TABLE IF NOT EXISTS runs (
+    id       INTEGER PRIMARY KEY,
+    created  REAL NOT NULL,
+    source   TEXT
+);
+
+CREATE TABLE IF NOT EXISTS risk_windows (
+    id              INTEGER PRIMARY KEY,
+    run_id          INTEGER NOT NULL REFERENCES runs (id),
+    flow            TEXT NOT NULL,
+    window_start    INTEGER,
+    window_end      INTEGER,
+    ml_prob         REAL,
+    suspicion_score REAL,
+    ks_pvalue       REAL,
+    ad_stat         REAL,
+    js_divergence   REAL,
+    iforest_risk    REAL,
+    final_risk      REAL,
+    decision        TEXT,
+    explanation     TEXT
+);
+CREATE INDEX IF NOT EXISTS windows_run_risk ON risk_windows (run_id, final_risk);
+CREATE INDEX IF NOT EXISTS windows_run_flow ON risk_windows (run_id, flow, window_start);
+CREATE INDEX IF NOT EXISTS windows_run_decision ON risk_windows (run_id, decision);
+
+CREATE TABLE IF NOT EXISTS incidents (
+    id         INTEGER PRIMARY KEY,
+    flow       TEXT NOT NULL,
+    protocol   TEXT,
+    src_ip     TEXT,
+    first_ts   REAL NOT NULL,
+    last_ts    REAL NOT NULL,
+    peak_risk  REAL,
+    mean_risk  REAL,
+    windows    INTEGER,
+    state      TEXT,
+    UNIQUE (flow, first_ts)
+);
+CREATE INDEX IF NOT EXISTS incidents_last_ts ON incidents (last_ts);
+CREATE INDEX IF NOT EXISTS incidents_peak ON incidents (peak_risk);
+"""
+
+# -------------------------------------------------
+# Connection
+# -------------------------------------------------
+def connect(path=DB_PATH, readonly=False):
+    if readonly:
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, timeout=10)
+    else:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        conn = sqlite3.connect(path, timeout=10)
+        # auto_vacuum only takes effect on a new, empty database
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        # older versions only miss tables, which SCHEMA adds
+        if version > SCHEMA_VERSION:
+            conn.close()
+            raise RuntimeError(f"{path}: schema version {version}, expected {SCHEMA_VERSION}")
+        conn.executescript(SCHEMA)
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    return conn
+
+def _none_if_blank(v):
+    if v is None or v == "" or (isinstance(v, float) and np.isnan(v)):
+        return None
+    return v
+
+def _where(clauses):
+    return (" WHERE " + " AND ".join(clauses)) if clauses else ""
+
+def _in(column, values, clauses, params):
+    values = list(values)
+    clauses.append(f"{column} IN ({','.join('?' * len(values))})" if values else "0")
+    params.extend(values)
+
+# -------------------------------------------------
+# Store
+# -------------------------------------------------
+class AlertStore:
+    """Reads and (unbatched) writes; one instance per thread."""
+
+    def __init__(self, path=DB_PATH, readonly=False):
+        self.path = path
+        self.conn = connect(path, readonly)
+
+    def close(self):
+        self.conn.close()
+
+    # ---------------- writes ----------------
+    def insert_alerts(self, rows):
+        """rows: dicts with ALERT_COLUMNS keys (missing / '' → NULL)."""
+        values = [tuple(_none_if_blank(r.get(c)) for c in ALERT_COLUMNS) for r in rows]
+        with self.conn:
+            self.conn.executemany(
+                f"INSERT INTO alerts ({','.join(ALERT_COLUMNS)}) "
+                f"VALUES ({','.join('?' * len(ALERT_COLUMNS))})", values)
+        return len(values)
+
+    def upsert_incidents(self, records):
+        """Incident records (live/incidents.Incident.record); keyed by (flow, first_ts)."""
+        values = [tuple(r[c] for c in INCIDENT_COLUMNS) for r in records]
+        updates = ",".join(f"{c}=excluded.{c}" for c in INCIDENT_COLUMNS[4:])
+        with self.conn:
+            self.conn.executemany(
+                f"INSERT INTO incidents ({','.join(INCIDENT_COLUMNS)}) "
+                f"VALUES ({','.join('?' * len(INCIDENT_COLUMNS))}) "
+                f"ON CONFLICT (flow, first_ts) DO UPDATE SET {updates}", values)
+        return len(values)
+
+    def begin_run(self, source=None):
+        with self.conn:
+            cur = self.conn.execute("INSERT INTO runs (created, source) VALUES (?, ?)", (time.time(), source))
+        return cur.lastrowid
+
+    def insert_windows(self, run_id, df):
+        df = df.reindex(columns=WINDOW_COLUMNS)
+        df = df.astype(object).where(df.notna(), None)
+        values = [(run_id,) + tuple(r) for r in df.itertuples(index=False, name=None)]
+        with self.conn:
+            self.conn.executemany(
+                f"INSERT INTO risk_windows (run_id,{','.join(WINDOW_COLUMNS)}) "
+                f"VALUES (?,{','.join('?' * len(WINDOW_COLUMNS))})", values)
+        return len(values)
+
+    # ---------------- alert queries ----------------
+    def _alert_filter(self, start=None, end=None, flows=None, protocols=None,
+                      min_risk=None, max_risk=None):
+        clauses, params = [], []
+        if start is not None:
+            clauses.append("timestamp >= ?")
+            params.append(float(start))
+        if end is not None:
+            clauses.append("timestamp <= ?")
+            params.append(float(end))
+        if flows is not None:
+            _in("flow", flows, clauses, params)
+        if protocols is not None:
+            _in("protocol", protocols, clauses, params)
+        if min_risk is not None:
+            clauses.append("final_risk >= ?")
+            params.append(float(min_risk))
+        if max_risk is not None:
+            clauses.append("final_risk <= ?")
+            params.append(float(max_risk))
+        return _where(clauses), params
+
+    def query_alerts(self, limit=100, offset=0, newest_first=True, **filters):
+        """Filtered page of alerts as a DataFrame (ALERT_COLUMNS)."""
+        import pandas as pd
+        where, params = self._alert_filter(**filters)
+        order = "DESC" if newest_first else "ASC"
+        sql = (f"SELECT {','.join(ALERT_COLUMNS)} FROM alerts{where} "
+               f"ORDER BY timestamp {order} LIMIT ? OFFSET ?")
+        return pd.read_sql_query(sql, self.conn, params=params + [int(limit), int(offset)])
+
+    def alert_series(self, limit=500_000, **filters):
+        """(timestamp, final_risk) of the latest `limit` matching alerts, oldest first (charts)."""
+        import pandas as pd
+        where, params = self._alert_filter(**filters)
+        sql = (f"SELECT timestamp, final_risk FROM (SELECT timestamp, final_risk FROM alerts{where} "
+               "ORDER BY timestamp DESC LIMIT ?) ORDER BY timestamp")
+        return pd.read_sql_query(sql, self.conn, params=params + [int(limit)])
+
+    def alert_summary(self, **filters):
+        """count, severity counts (High ≥ 70, Medium ≥ 50) and time range."""
+        where, params = self._alert_filter(**filters)
+        row = self.conn.execute(
+            "SELECT COUNT(*), SUM(final_risk >= 70), SUM(final_risk >= 50 AND final_risk < 70), "
+            f"SUM(final_risk < 50), MIN(timestamp), MAX(timestamp) FROM alerts{where}", params).fetchone()
+        return {"count": row[0], "high": row[1] or 0, "medium": row[2] or 0, "low": row[3] or 0,
+                "first_ts": row[4], "last_ts": row[5]}
+
+    def alert_protocols(self):
+        return [r[0] for r in self.conn.execute(
+            "SELECT DISTINCT protocol FROM alerts WHERE protocol IS NOT NULL ORDER BY protocol")]
+
+    def top_flows(self, n=5, **filters):
+        import pandas as pd
+        where, params = self._alert_filter(**filters)
+        return pd.read_sql_query(
+            f"SELECT flow, AVG(final_risk) AS final_risk, COUNT(*) AS alerts FROM alerts{where} "
+            "GROUP BY flow ORDER BY final_risk DESC LIMIT ?", self.conn, params=params + [int(n)])
+
+    def query_incidents(self, limit=100, offset=0, open_only=False, min_risk=None, start=None):
+        """Page of incidents, most recently active first."""
+        import pandas as pd
+        clauses, params = [], []
+        if open_only:
+            clauses.append("state IN ('open', 'update')")
+        if min_risk is not None:
+            clauses.append("peak_risk >= ?")
+            params.append(float(min_risk))
+        if start is not None:
+            clauses.append("last_ts >= ?")
+            params.append(float(start))
+        sql = (f"SELECT id AS incident_id,{','.join(INCIDENT_COLUMNS)} FROM incidents{_where(clauses)} "
+               "ORDER BY last_ts DESC LIMIT ? OFFSET ?")
+        return pd.read_sql_query(sql, self.conn, params=params + [int(limit), int(offset)])
+
+    # ---------------- risk-window queries ----------------
+    def latest_run(self):
+        row = self.conn.execute("SELECT id FROM runs ORDER BY id DESC LIMIT 1").fetchone()
+        return row[0] if row else None
+
+    def _window_filter(self, run_id=None, min_risk=None, max_risk=None, decisions=None):
+        run_id = self.latest_run() if run_id is None else run_id
+        clauses, params = ["run_id = ?"], [run_id]
+        if min_risk is not None:
+            clauses.append("final_risk >= ?")
+            params.append(float(min_risk))
+        if max_risk is not None:
+            clauses.append("final_risk <= ?")
+            params.append(float(max_risk))
+        if decisions is not None:
+            _in("decision", decisions, clauses, params)
+        return _where(clauses), params
+
+    def query_windows(self, limit=100, offset=0, **filters):
+        """Page of the latest (or given) run's windows, highest risk first."""
+        import pandas as pd
+        where, params = self._window_filter(**filters)
+        sql = (f"SELECT {','.join(WINDOW_COLUMNS)} FROM risk_windows{where} "
+               "ORDER BY final_risk DESC LIMIT ? OFFSET ?")
+        return pd.read_sql_query(sql, self.conn, params=params + [int(limit), int(offset)])
+
+    def window_series(self, limit=500_000, **filters):
+        """
+        (flow, window_start, final_risk) by flow and window (charts).
+        Every flow gets an equal share of `limit` (at least 2 rows); a longer
+        flow is min/max-downsampled over equal runs of windows, so its peaks survive.
+        """
+        import pandas as pd
+        where, params = self._window_filter(**filters)
+        n_flows = self.conn.execute(
+            f"SELECT COUNT(DISTINCT flow) FROM risk_windows{where}", params).fetchone()[0]
+        per_flow = max(2, int(limit) // max(n_flows, 1))
+        sql = (
+            "WITH w AS (SELECT flow, window_start, final_risk, "
+            "ROW_NUMBER() OVER (PARTITION BY flow ORDER BY window_start) - 1 AS rn, "
+            f"COUNT(*) OVER (PARTITION BY flow) AS n FROM risk_windows{where}), "
+            "b AS (SELECT *, CASE WHEN n <= ? THEN rn ELSE rn * ? / n END AS bucket FROM w), "
+            "r AS (SELECT *, "
+            "ROW_NUMBER() OVER (PARTITION BY flow, bucket ORDER BY final_risk DESC, window_start) AS hi, "
+            "ROW_NUMBER() OVER (PARTITION BY flow, bucket ORDER BY final_risk, window_start) AS lo FROM b) "
+            "SELECT flow, window_start, final_risk FROM r WHERE hi = 1 OR lo = 1 "
+            "ORDER BY flow, window_start")
+        return pd.read_sql_query(sql, self.conn, params=params + [per_flow, per_flow // 2])
+
+    def count_windows(self, **filters):
+        where, params = self._window_filter(**filters)
+        return self.conn.execute(f"SELECT COUNT(*) FROM risk_windows{where}", params).fetchone()[0]
+
+    def decision_counts(self, run_id=None):
+        where, params = self._window_filter(run_id)
+        return dict(self.conn.execute(
+            f"SELECT decision, COUNT(*) FROM risk_windows{where} GROUP BY decision", params).fetchall())
+
+    # ---------------- retention / compaction ----------------
+    def apply_retention(self, max_age_s=None, max_alerts=None, keep_runs=None, now=None):
+        """Delete old alerts / incidents / runs; returns the number of rows deleted per table."""
+        deleted = {"alerts": 0, "risk_windows": 0, "incidents": 0}
+        now = time.time() if now is None else now
+        with self.conn:
+            if max_age_s is not None:
+                deleted["alerts"] += self.conn.execute(
+                    "DELETE FROM alerts WHERE timestamp < ?", (now - max_age_s,)).rowcount
+                deleted["incidents"] += self.conn.execute(
+                    "DELETE FROM incidents WHERE last_ts < ?", (now - max_age_s,)).rowcount
+            if max_alerts is not None:
+                deleted["alerts"] += self.conn.execute(
+                    "DELETE FROM alerts WHERE id <= (SELECT id FROM alerts ORDER BY id DESC "
+                    "LIMIT 1 OFFSET ?)", (int(max_alerts),)).rowcount
+            if keep_runs is not None:
+                old = "SELECT id FROM runs ORDER BY id DESC LIMIT -1 OFFSET ?"
+                deleted["risk_windows"] += self.conn.execute(
+                    f"DELETE FROM risk_windows WHERE run_id IN ({old})", (int(keep_runs),)).rowcount
+                self.conn.execute(f"DELETE FROM runs WHERE id IN ({old})", (int(keep_runs),))
+        return deleted
+
+    def compact(self):
+        """Checkpoint the WAL and release free pages; returns the file size."""
+        self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        self.conn.execute("PRAGMA incremental_vacuum")
+        return os.path.getsize(self.path)
+
+# -------------------------------------------------
+# Batched writer (detector)
+# -------------------------------------------------
+class BatchWriter:
+    """
+    Queues alert rows / incident records and writes them from a background
+    thread, one transaction per `batch_size` items or `flush_s` seconds. Retention is
+    applied every `retention_s` seconds when max_age_s / max_alerts are set.
+    """
+
+    def __init__(self, path=DB_PATH, batch_size=500, flush_s=1.0,
+                 max_age_s=None, max_alerts=None, retention_s=3600.0):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_s = flush_s
+        self.retention = {"max_age_s": max_age_s, "max_alerts": max_alerts}
+        self.retention_s = retention_s
+        self.written = 0
+        self.incidents = 0
+        self.batches = 0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._loop, name="alert-writer", daemon=True)
+        connect(path).close()   # fail early (path, schema version)
+        self._thread.start()
+
+    def put(self, row):
+        self._queue.put(("alert", row))
+
+    def put_incident(self, record):
+        self._queue.put(("incident", record))
+
+    def _flush(self, store, pending):
+        alerts = [row for kind, row in pending if kind == "alert"]
+        incidents = {}
+        for kind, rec in pending:
+            if kind == "incident":   # last state of each incident wins
+                incidents[(rec["flow"], rec["first_ts"])] = rec
+        try:
+            self.written += store.insert_alerts(alerts) if alerts else 0
+            self.incidents += store.upsert_incidents(list(incidents.values())) if incidents else 0
+            self.batches += 1
+        except sqlite3.Error as e:
+            print(f"[WARN] Alert store write failed ({len(pending)} rows dropped): {e}")
+
+    def _loop(self):
+        store = AlertStore(self.path)
+        next_retention = time.monotonic() + self.retention_s
+        pending, stop = [], False
+        deadline = time.monotonic() + self.flush_s
+        while not stop:
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                if item is None:
+                    stop = True
+                else:
+                    pending.append(item)
+            except queue.Empty:
+                pass
+            if pending and (stop or len(pending) >= self.batch_size or time.monotonic() >= deadline):
+                self._flush(store, pending)
+                pending = []
+            if time.monotonic() >= deadline:
+                deadline = time.monotonic() + self.flush_s
+            if any(v is not None for v in self.retention.values()) and time.monotonic() >= next_retention:
+                store.apply_retention(**self.retention)
+                next_retention = time.monotonic() + self.retention_s
+        store.close()
+
+    def close(self):
+        """Flush what is queued and stop the thread."""
+        self._queue.put(None)
+        self._thread.join()
+
+# -------------------------------------------------
+# Migration from the CSV files
+# -------------------------------------------------
+def import_alerts_csv(store, path, chunk_size=50_000):
+    import pandas as pd
+    n = 0
+    for chunk in pd.read_csv(path, chunksize=chunk_size, on_bad_lines="skip"):
+        if "protocol" not in chunk.columns:
+            chunk["protocol"] = chunk["flow"].str.split("_").str[-1]
+        n += store.insert_alerts(chunk.to_dict("records"))
+    return n
+
+def import_report_csv(store, path, chunk_size=50_000):
+    import pandas as pd
+    run_id = store.begin_run(os.path.basename(path))
+    n = 0
+    for chunk in pd.read_csv(path, chunksize=chunk_size):
+        n += store.insert_windows(run_id, chunk)
+    return run_id, n
+
+# -------------------------------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Alert store maintenance")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--import-alerts", metavar="CSV", help="append live/alerts.csv rows")
+    parser.add_argument("--import-report", metavar="CSV", help="add a final_risk_report.csv as a run")
+    parser.add_argument("--retain-days", type=float, help="delete alerts older than this")
+    parser.add_argument("--max-alerts", type=int, help="keep only the newest N alerts")
+    parser.add_argument("--keep-runs", type=int, help="keep only the last N risk-engine runs")
+    parser.add_argument("--compact", action="store_true", help="checkpoint WAL + release free pages")
+    args = parser.parse_args()
+
+    store = AlertStore(args.db)
+    if args.import_alerts:
+        print(f"[+] Imported {import_alerts_csv(store, args.import_alerts)} alerts")
+    if args.import_report:
+        run_id, n = import_report_csv(store, args.import_report)
+        print(f"[+] Imported {n} windows as run {run_id}")
+    if args.retain_days is not None or args.max_alerts is not None or args.keep_runs is not None:
+        max_age = args.retain_days * 86400 if args.retain_days is not None else None
+        print(f"[+] Retention deleted {store.apply_retention(max_age, args.max_alerts, args.keep_runs)}")
+    if args.compact:
+        print(f"[+] Compacted → {store.compact() / 1e6:.1f} MB")
+    store.close()
@@ -0,0 +1,107 @@
+# tests/test_alert_feed.py
+"""
+Alert feed: server-sent events from the detector reach a subscriber within
+a second; a reconnect with Last-Event-ID replays what was missed.
+Run: pytest -q
+"""
+import time
+
+from live.alert_feed import AlertFeed
+from dashboard.live_feed import FeedSubscriber, parse_events
+
+
+def _wait(cond, timeout=2.0):
+    end = time.monotonic() + timeout
+    while time.monotonic() < end:
+        if cond():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_parse_events():
+    lines = [": connected", "", "id: 3", "event: alert", 'data: {"a": 1}', "",
+             "data: x", "data: y", ""]
+    assert list(parse_events(lines)) == [("3", "alert", '{"a": 1}'), (None, "message", "x\ny")]
+
+
+def test_events_are_pushed_and_replayed_after_reconnect():
+    feed = AlertFeed(port=0, risk_s=0.05).start()
+    sub = FeedSubscriber(feed.url, window=5).start()
+    try:
+        assert _wait(lambda: sub.connected and feed.clients == 1)
+        t0 = time.monotonic()
+        feed.publish("alert", {"flow": "a_b_TCP", "final_risk": 80.0, "timestamp": 1.0})
+        assert _wait(lambda: len(sub.alerts) == 1)
+        assert time.monotonic() - t0 < 1.0
+
+        for risk in (10.0, 20.0, 30.0):            # coalesced: only the latest is sent
+            feed.update_risk("a_b_TCP", risk)
+        assert _wait(lambda: "a_b_TCP" in sub.risk)
+        assert sub.risk["a_b_TCP"][0] == 30.0
+
+        feed.publish("incident", {"incident_id": 1, "state": "open", "flow": "a_b_TCP"})
+        feed.publish("incident", {"incident_id": 1, "state": "update", "flow": "a_b_TCP"})
+        assert _wait(lambda: sub.incidents.get(1, {}).get("state") == "update")
+
+        for i in range(10):                        # bounded window
+            feed.publish("alert", {"flow": f"f{i}", "final_risk": 90.0, "timestamp": 2.0 + i})
+        assert _wait(lambda: sub.alerts[-1]["flow"] == "f9")
+        assert len(sub.alerts) == 5
+    finally:
+        sub.stop()
+        feed.stop()
+
+
+def test_reconnect_resumes_from_last_event_id():
+    feed = AlertFeed(port=0).start()
+    try:
+        first = FeedSubscriber(feed.url).start()
+        assert _wait(lambda: first.connected)
+        feed.publish("alert", {"flow": "x", "final_risk": 70.0, "timestamp": 1.0})
+        assert _wait(lambda: len(first.alerts) == 1)
+        first.stop()
+
+        feed.publish("alert", {"flow": "missed", "final_risk": 75.0, "timestamp": 2.0})
+        again = FeedSubscriber(feed.url)
+        again.last_id = first.last_id
+        again.start()
+        assert _wait(lambda: len(again.alerts) == 1)
+        assert again.alerts[0]["flow"] == "missed"
+        again.stop()
+    finally:
+        feed.stop()
+
+
+def test_subscriber_follows_a_restarted_feed(monkeypatch):
+    import dashboard.live_feed as live_feed
+
+    monkeypatch.setattr(live_feed, "RECONNECT_S", 0.05)
+    feed = AlertFeed(port=0).start()
+    port = feed.port
+    sub = FeedSubscriber(feed.url).start()
+    try:
+        assert _wait(lambda: sub.connected)
+        for i in range(50):
+            feed.publish("alert", {"flow": f"old{i}", "final_risk": 70.0, "timestamp": float(i)})
+        assert _wait(lambda: len(sub.alerts) == 50)
+
+        # detector restart on the same port: its sequence starts again at 1
+        feed.stop()
+        feed = AlertFeed(port=port).start()
+        for i in range(10):
+            feed.publish("alert", {"flow": f"new{i}", "final_risk": 70.0, "timestamp": 100.0 + i})
+        assert _wait(lambda: len(sub.alerts) == 60, timeout=5.0)
+        assert [a["flow"] for a in sub.alerts][-10:] == [f"new{i}" for i in range(10)]
+    finally:
+        sub.stop()
+        feed.stop()
+
+
+def test_subscriber_risk_is_bounded():
+    sub = FeedSubscriber("http://127.0.0.1:1/events", window=3)
+    for i in range(10):
+        sub._apply("risk", {"ts": float(i), "flows": {f"f{i}": 50.0}})
+    sub._apply("risk", {"ts": 10.0, "flows": {"f7": 60.0}})
+    assert list(sub.risk) == ["f8", "f9", "f7"]
+    assert sub.risk["f7"] == (60.0, 10.0)
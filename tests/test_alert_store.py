@@ -0,0 +1,110 @@
+# tests/test_alert_store.py
+"""
+Alert store: batched writes, filtered / paginated queries, retention.
+Run: pytest -q
+"""
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from storage.alert_store import AlertStore, BatchWriter, WINDOW_COLUMNS
+
+
+def _alert(i):
+    proto = ["TCP", "UDP", "HTTP"][i % 3]
+    return {"timestamp": 1_700_000_000.0 + i, "flow": f"10.0.0.{i % 7}_10.0.0.9_{proto}",
+            "protocol": proto, "final_risk": float(i % 100), "ml_prob": 50.0,
+            "stat_score": "", "iforest_risk": 10.0, "sample_rate": 1.0}
+
+
+def test_batched_writes_and_queries(tmp_path):
+    path = str(tmp_path / "ids.db")
+    writer = BatchWriter(path, batch_size=64, flush_s=0.05)
+    for i in range(1000):
+        writer.put(_alert(i))
+    writer.close()
+    assert writer.written == 1000
+    assert writer.batches <= 1000 // 64 + 2
+
+    store = AlertStore(path, readonly=True)
+    assert store.conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert store.alert_protocols() == ["HTTP", "TCP", "UDP"]
+
+    ref = pd.DataFrame([_alert(i) for i in range(1000)])
+    ref = ref[ref["protocol"].isin(["TCP", "UDP"]) & ref["final_risk"].between(60, 90)]
+    s = store.alert_summary(protocols=["TCP", "UDP"], min_risk=60, max_risk=90)
+    assert s["count"] == len(ref)
+    assert s["high"] == (ref["final_risk"] >= 70).sum()
+    assert s["last_ts"] == ref["timestamp"].max()
+
+    pages = [store.query_alerts(limit=25, offset=o, protocols=["TCP", "UDP"], min_risk=60, max_risk=90)
+             for o in range(0, len(ref) + 25, 25)]
+    got = pd.concat(pages, ignore_index=True)
+    assert got["timestamp"].tolist() == sorted(ref["timestamp"], reverse=True)
+    assert got["stat_score"].isna().all()
+
+    series = store.alert_series(limit=50, protocols=["TCP", "UDP"], min_risk=60, max_risk=90)
+    assert series["timestamp"].tolist() == sorted(ref["timestamp"])[-50:]
+
+    top = store.top_flows(3, protocols=["UDP"])
+    assert len(top) == 3 and top["final_risk"].is_monotonic_decreasing
+    store.close()
+
+
+def test_runs_and_retention(tmp_path):
+    store = AlertStore(str(tmp_path / "ids.db"))
+    rng = np.random.default_rng(0)
+    for _ in range(3):
+        df = pd.DataFrame({"flow": "f", "window_start": np.arange(100), "window_end": np.arange(100) + 50,
+                           "final_risk": rng.uniform(0, 100, 100),
+                           "decision": rng.choice(["Normal", "Suspicious"], 100)})
+        run_id = store.begin_run("report.csv")
+        store.insert_windows(run_id, df)
+    assert store.latest_run() == run_id
+    assert store.decision_counts() == df["decision"].value_counts().to_dict()
+    page = store.query_windows(limit=10, min_risk=50, decisions=["Normal"])
+    assert list(page.columns) == WINDOW_COLUMNS
+    assert page["final_risk"].tolist() == sorted(
+        df.loc[(df["final_risk"] >= 50) & (df["decision"] == "Normal"), "final_risk"], reverse=True)[:10]
+
+    store.insert_alerts([_alert(i) for i in range(100)])
+    deleted = store.apply_retention(max_age_s=10, max_alerts=5, keep_runs=1, now=1_700_000_100.0)
+    assert deleted == {"alerts": 95, "risk_windows": 200, "incidents": 0}
+    assert store.alert_summary()["count"] == 5
+    assert store.conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0] == 1
+    assert store.compact() > 0
+    store.close()
+
+
+def test_window_series_keeps_every_flow(tmp_path):
+    store = AlertStore(str(tmp_path / "ids.db"))
+    risk = np.full(1000, 20.0)
+    risk[[137, 811]] = [95.0, 1.0]
+    long = pd.DataFrame({"flow": "a", "window_start": np.arange(1000), "window_end": np.arange(1000) + 50,
+                         "final_risk": risk, "decision": "Normal"})
+    short = pd.DataFrame({"flow": "b", "window_start": np.arange(10), "window_end": np.arange(10) + 50,
+                          "final_risk": 40.0, "decision": "Normal"})
+    run_id = store.begin_run("report.csv")
+    store.insert_windows(run_id, pd.concat([long, short], ignore_index=True))
+
+    series = store.window_series(limit=100)
+    a, b = series[series["flow"] == "a"], series[series["flow"] == "b"]
+    assert b["window_start"].tolist() == list(range(10))
+    assert len(a) <= 50 and a["window_start"].is_monotonic_increasing
+    assert {95.0, 1.0} <= set(a["final_risk"])
+    assert len(store.window_series()) == 1010
+    store.close()
+
+
+def test_schema_version_mismatch_is_refused(tmp_path):
+    path = str(tmp_path / "ids.db")
+    AlertStore(path).close()
+    with sqlite3.connect(path) as conn:
+        conn.execute("PRAGMA user_version = 99")
+    try:
+        AlertStore(path)
+    except RuntimeError as e:
+        assert "schema version 99" in str(e)
+    else:
+        raise AssertionError("expected RuntimeError")
@@ -0,0 +1,73 @@
+# tests/test_artifacts.py
+"""
+Memory-mapped model artifacts: round trip, integrity and staleness checks.
+Run: pytest -q
+"""
+import os
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.preprocessing import StandardScaler
+
+from models.artifacts import (
+    MANIFEST,
+    export_mmap,
+    load_mmap_artifact,
+    load_model_artifact,
+    mmap_path,
+    save_artifact
+)
+from models.backends import load_backend
+
+
+@pytest.fixture
+def rf_joblib(tmp_path):
+    rng = np.random.default_rng(0)
+    X = rng.lognormal(size=(200, 4))
+    y = (X[:, 0] > 1.0).astype(int)
+    scaler = StandardScaler().fit(X)
+    model = RandomForestClassifier(n_estimators=10, random_state=0).fit(scaler.transform(X), y)
+    path = str(tmp_path / "rf.joblib")
+    save_artifact({"model": model, "scaler": scaler, "columns": ["a", "b", "c", "d"]}, path)
+    return path, X, model.predict_proba(scaler.transform(X))[:, 1]
+
+
+def test_mmap_roundtrip_is_shared_and_exact(rf_joblib):
+    path, X, ref = rf_joblib
+    out = export_mmap(path)
+    assert out == mmap_path(path)
+
+    art = load_model_artifact(path)
+    assert "model" not in art
+    assert isinstance(art["compiled"]["value"], np.memmap)
+    backend = load_backend(path)
+    assert backend.name == "compiled"
+    assert np.array_equal(backend.predict_proba(X), ref)
+
+
+def test_corrupted_array_is_rejected(rf_joblib):
+    path, _, _ = rf_joblib
+    out = export_mmap(path)
+    with open(os.path.join(out, "compiled.threshold.npy"), "r+b") as f:
+        f.seek(-8, os.SEEK_END)
+        f.write(b"\x00" * 8)
+    with pytest.raises(ValueError, match="checksum"):
+        load_mmap_artifact(out)
+
+
+def test_version_and_staleness(rf_joblib):
+    path, _, _ = rf_joblib
+    out = export_mmap(path)
+    manifest = os.path.join(out, MANIFEST)
+    with open(manifest) as f:
+        text = f.read()
+    with open(manifest, "w") as f:
+        f.write(text.replace('"version": 1,', '"version": 99,', 1))
+    with pytest.raises(ValueError, match="version"):
+        load_mmap_artifact(out)
+
+    # a newer joblib than its export → joblib is loaded instead
+    export_mmap(path)
+    os.utime(path, ns=(0, 0))
+    assert "model" in load_model_artifact(path)
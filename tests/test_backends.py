@@ -0,0 +1,75 @@
+# tests/test_backends.py
+"""
+Model backends: common interface, selection metadata, detector budget check.
+Run: pytest -q
+"""
+import numpy as np
+import pytest
+
+from models.backends import BACKENDS, choose, evaluate_backends, load_backend, select
+from live.realtime_detector import check_model_budget
+
+
+def make_data(seed=0, n=200):
+    rng = np.random.default_rng(seed)
+    y = np.arange(n) % 2
+    X = np.column_stack([y + rng.normal(0, 0.5, n), rng.normal(0, 1, n), rng.exponential(1, n)])
+    return X, y
+
+
+def test_backends_share_interface():
+    X, y = make_data()
+    cols = ["a", "b", "c"]
+    for name, cls in BACKENDS.items():
+        backend = load_backend(cls.fit(X, y, cols).artifact)
+        assert backend.name == name
+        probs = backend.predict_proba(X[:10])
+        assert probs.shape == (10,)
+        assert np.allclose([backend.predict_one(x) for x in X[:10]], probs)
+
+    rf = BACKENDS["rf"].fit(X, y, cols)
+    compiled = BACKENDS["compiled"](dict(rf.artifact, backend="compiled"))
+    assert np.array_equal(compiled.predict_proba(X), rf.predict_proba(X))
+
+
+def test_unknown_artifacts_load_but_are_not_fittable():
+    from sklearn.preprocessing import StandardScaler
+    from sklearn.tree import DecisionTreeClassifier
+
+    X, y = make_data()
+    scaler = StandardScaler().fit(X)
+    tree = DecisionTreeClassifier(max_depth=3, random_state=0).fit(scaler.transform(X), y)
+    backend = load_backend({"model": tree, "scaler": scaler, "columns": ["a", "b", "c"]})
+    assert backend.name == "sklearn" and not hasattr(backend, "fit")
+    assert np.allclose(backend.predict_proba(X), tree.predict_proba(scaler.transform(X))[:, 1])
+    assert all(hasattr(cls, "fit") for cls in BACKENDS.values())
+
+
+def test_selection_respects_budget():
+    X, y = make_data(1)
+    results = evaluate_backends(X[:150], y[:150], X[150:], y[150:], ["a", "b", "c"], ["rf", "logreg"])
+    slow = max(results, key=lambda r: r["latency"]["row_p99_us"])
+    budget_ms = slow["latency"]["row_p99_us"] / 1e3 * 0.99
+    assert choose(results, budget_ms, tolerance=1.0)["backend"] != slow["backend"]
+
+
+def test_selected_backend_is_refit_on_all_windows(tmp_path, monkeypatch):
+    import models.evaluate
+
+    X, y = make_data(3)
+    monkeypatch.setattr(models.evaluate, "load_feature_matrix", lambda path: (X, y, ["a", "b", "c"]))
+    out = tmp_path / "model.joblib"
+    select("features.json", str(out), names=["logreg"])
+    saved = load_backend(str(out))
+    full = BACKENDS["logreg"].fit(X, y, ["a", "b", "c"])
+    assert np.allclose(saved.predict_proba(X), full.predict_proba(X))
+    assert saved.artifact["metadata"]["n_train"] == len(y)
+
+
+def test_detector_refuses_backend_over_budget():
+    X, y = make_data(2)
+    backend = BACKENDS["logreg"].fit(X, y, ["a", "b", "c"])
+    backend.artifact["metadata"] = {"latency": {"row_p99_us": 80_000.0}}
+    with pytest.raises(RuntimeError):
+        check_model_budget(backend, 50.0)
+    check_model_budget(backend, 100.0)
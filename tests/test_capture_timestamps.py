@@ -0,0 +1,72 @@
+# tests/test_capture_timestamps.py
+"""
+Replay test: live IPD features come from capture timestamps,
+so they do not change with detector load (callback queueing delay).
+Run: pytest -q
+"""
+import random
+import time
+from decimal import Decimal
+
+import numpy as np
+from scapy.layers.inet import IP, ICMP
+
+from capture.capture_utils import packet_time_ns, ipds_from_ns
+import live.realtime_detector as det
+
+
+def make_packets(n=120, t0=1765271845.0):
+    pkts = []
+    ts = Decimal(str(t0))
+    rnd = random.Random(7)
+    for _ in range(n):
+        ts += Decimal(rnd.choice(["0.020000001", "0.120000003"]))
+        p = IP(src="10.0.0.3", dst="10.0.0.4") / ICMP()
+        p.time = ts
+        pkts.append(p)
+    return pkts
+
+
+def replay(pkts, monkeypatch, callback_delay=None):
+    det.buffers.clear()
+    seen = []
+    # every window must reach feature extraction
+    monkeypatch.setattr(det, "tier1_clears", lambda cfg, cv: False)
+    monkeypatch.setattr(
+        det, "score_window",
+        lambda flow, proto, src, ts_ns, feats, *args, **kwargs: seen.append(feats)
+    )
+    for p in pkts:
+        if callback_delay:
+            callback_delay()
+        det.handle_packet(p)
+    return seen
+
+
+def test_features_independent_of_load(monkeypatch):
+    pkts = make_packets()
+    idle = replay(pkts, monkeypatch)
+
+    # Simulate a loaded detector: wall clock jumps by random queueing delays
+    rnd = random.Random(1)
+    fake_now = [time.time()]
+
+    def loaded():
+        fake_now[0] += rnd.uniform(0.0, 0.5)
+        time.sleep(0.0001)
+
+    monkeypatch.setattr(time, "time", lambda: fake_now[0])
+    busy = replay(pkts, monkeypatch, callback_delay=loaded)
+
+    assert len(idle) == len(busy) == len(pkts) - det.WINDOW_SIZE + 1
+    for a, b in zip(idle, busy):
+        assert a == b
+
+
+def test_nanosecond_timestamps_exact():
+    p = IP() / ICMP()
+    p.time = Decimal("1765271845.123456789")
+    assert packet_time_ns(p) == 1765271845123456789
+
+    times = [1765271845000000000, 1765271845000000150, 1765271845000000400]
+    assert np.allclose(ipds_from_ns(times), [150e-9, 250e-9], rtol=0, atol=1e-15)
@@ -0,0 +1,56 @@
+# tests/test_cascade.py
+"""
+Detection cascade: O(1) flow statistics and offline threshold tuning.
+Run: pytest -q
+"""
+import numpy as np
+import pytest
+
+from capture.capture_utils import ipds_from_ns
+from features.feature_utils import entropy_features
+from live.flow_state import FlowState
+from live.cascade import tune_tier1, tune_tier2, tier1_clears, tier2_clears, load_cascade_config
+from fusion.weights import ml_clear_bound, max_fused_risk
+
+
+def test_flow_state_matches_batch_features():
+    rng = np.random.default_rng(0)
+    times = np.cumsum(rng.integers(1_000_000, 200_000_000, size=500)) + 1_765_271_845_000_000_000
+    state = FlowState(40)
+    for t in times:
+        state.push(int(t))
+    assert state.ready()
+
+    ipds = ipds_from_ns(state.times)
+    assert state.ipd_mean() == pytest.approx(np.mean(ipds), rel=1e-12)
+    assert state.ipd_std() == pytest.approx(np.std(ipds), rel=1e-9)
+    assert state.ipd_std_norm() == pytest.approx(entropy_features(ipds)["ipd_std_norm"], rel=1e-9)
+
+
+def test_tuning_respects_miss_budget():
+    rng = np.random.default_rng(1)
+    cv = np.concatenate([rng.normal(1.0, 0.1, 500), rng.normal(0.4, 0.1, 100)])
+    y = np.array([0] * 500 + [1] * 100)
+
+    lo, hi, cleared, miss = tune_tier1(cv, y, max_miss=0.01)
+    assert miss <= 0.01
+    assert cleared > 0.5
+    cfg = load_cascade_config(None)
+    cfg["tier1"].update({"ipd_std_norm_low": lo, "ipd_std_norm_high": hi})
+    assert tier1_clears(cfg, 1.0) and not tier1_clears(cfg, 0.4)
+
+    risk = np.concatenate([np.full(50, 10.0), np.linspace(70, 100, 50)])
+    # capped where fusion could still lift the RF risk to the threshold
+    assert tune_tier2(risk, np.array([0] * 50 + [1] * 50), risk_threshold=60) == ml_clear_bound(60) == 20
+
+
+@pytest.mark.parametrize("threshold", [40.0, 60.0, 75.0, 90.0])
+def test_tier2_never_clears_a_window_fusion_could_alert(threshold, tmp_path):
+    # even a loosely tuned config is capped
+    path = tmp_path / "cascade.json"
+    path.write_text('{"tier2": {"clear_below": 99.0}}')
+    cfg = load_cascade_config(str(path), threshold)
+    assert cfg["tier2"]["clear_below"] == ml_clear_bound(threshold)
+    for ml in np.linspace(0, 100, 1001):
+        if tier2_clears(cfg, ml):
+            assert max_fused_risk(ml) < threshold
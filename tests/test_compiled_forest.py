@@ -0,0 +1,41 @@
+# tests/test_compiled_forest.py
+"""
+Compiled forest evaluator: bit-exact with RandomForestClassifier.predict_proba.
+Run: pytest -q
+"""
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.preprocessing import StandardScaler
+
+from models.compiled_forest import compile_forest, predict_proba
+
+
+def test_matches_sklearn_bit_for_bit():
+    rng = np.random.default_rng(0)
+    X = rng.lognormal(size=(400, 12))
+    y = (X[:, 0] * X[:, 3] + rng.normal(scale=0.5, size=400) > 1.2).astype(int)
+    scaler = StandardScaler().fit(X)
+    clf = RandomForestClassifier(n_estimators=40, random_state=0).fit(scaler.transform(X), y)
+
+    compiled = compile_forest(clf, scaler)
+    X_new = rng.lognormal(size=(97, 12))
+
+    ref = clf.predict_proba(scaler.transform(X_new))
+    assert np.array_equal(predict_proba(compiled, X_new), ref)
+    # single 1-D row (live detector path)
+    assert np.array_equal(predict_proba(compiled, X_new[5]), ref[5:6])
+
+
+def test_iforest_matches_score_samples():
+    from sklearn.ensemble import IsolationForest
+    from models.compiled_forest import compile_iforest, iforest_score_samples
+
+    rng = np.random.default_rng(1)
+    X = rng.lognormal(size=(300, 10))
+    X_new = rng.lognormal(size=(61, 10))
+    for max_features in (1.0, 0.6):
+        model = IsolationForest(n_estimators=60, max_features=max_features, random_state=0).fit(X)
+        compiled = compile_iforest(model)
+        ref = model.score_samples(X_new)
+        assert np.array_equal(iforest_score_samples(compiled, X_new), ref)
+        assert np.array_equal(iforest_score_samples(compiled, X_new[3]), ref[3:4])
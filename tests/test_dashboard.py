@@ -0,0 +1,19 @@
+# tests/test_dashboard.py
+"""
+SOC dashboard smoke test: dashboard/app.py runs to completion with the
+pinned Streamlit (live feed fragment included), detector down or not.
+Run: pytest -q
+"""
+import pytest
+
+pytest.importorskip("streamlit")
+pytest.importorskip("plotly")
+
+
+def test_soc_dashboard_renders():
+    from streamlit.testing.v1 import AppTest
+
+    # the path is relative to this test file
+    at = AppTest.from_file("../dashboard/app.py", default_timeout=30).run()
+    assert not at.exception
+    assert any("Live Feed" in m.value for m in at.markdown)
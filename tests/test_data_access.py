@@ -0,0 +1,68 @@
+# tests/test_data_access.py
+"""
+Dashboard data access: mtime cache, incremental tail reads, categoricals.
+Run: pytest -q
+"""
+import os
+
+import pandas as pd
+
+from dashboard.data_access import TailReader, clear_cache, load_captures
+
+HEADER = "ts,src,dst,sport,dport,proto,length\n"
+
+
+def _rows(start, n, src="10.0.0.1"):
+    return "".join(f"{start + i * 0.01},{src},10.0.0.2,40000,80,TCP,{100 + i}\n" for i in range(n))
+
+
+def test_tail_reader_parses_only_appended_lines(tmp_path):
+    path = tmp_path / "cap.csv"
+    path.write_text(HEADER + _rows(0, 10))
+    reader = TailReader(str(path))
+    df, s = reader.read()
+    assert s["mode"] == "full" and len(df) == 10
+    assert isinstance(df["src"].dtype, pd.CategoricalDtype)
+
+    _, s = reader.read()
+    assert s["mode"] == "cached" and s["bytes"] == 0
+
+    with open(path, "a") as f:                        # 5 full lines + a partial one
+        f.write(_rows(1, 5, src="10.0.0.9") + "2.0,10.0.0.9,10.0")
+    df, s = reader.read()
+    assert s["mode"] == "tail" and s["rows"] == 5 and len(df) == 15
+    assert set(df["src"].cat.categories) == {"10.0.0.1", "10.0.0.9"}
+
+    with open(path, "a") as f:                        # the partial line completes
+        f.write(".0.2,40000,80,TCP,7\n")
+    df, s = reader.read()
+    assert s["rows"] == 1 and df["length"].iloc[-1] == 7
+
+    ref = pd.read_csv(path)
+    assert df["ts"].tolist() == ref["ts"].tolist()
+    assert df["src"].astype(str).tolist() == ref["src"].tolist()
+
+    path.write_text(HEADER + _rows(5, 3))             # truncated / rewritten
+    df, s = reader.read()
+    assert s["mode"] == "full" and len(df) == 3
+
+
+def test_load_captures_reuses_the_combined_frame(tmp_path):
+    clear_cache()
+    for i in range(3):
+        (tmp_path / f"capture_{i}.csv").write_text(HEADER + _rows(i, 20, src=f"10.0.0.{i}"))
+    pattern = str(tmp_path / "capture_*.csv")
+    df, files, s = load_captures(pattern)
+    assert len(files) == 3 and len(df) == 60 and s["full"] == 3
+    assert df["source_file"].cat.categories.tolist() == [f"capture_{i}.csv" for i in range(3)]
+
+    again, _, s = load_captures(pattern)
+    assert again is df and s["cached"] == 3
+
+    with open(tmp_path / "capture_1.csv", "a") as f:
+        f.write(_rows(9, 4, src="10.0.0.1"))
+    os.utime(tmp_path / "capture_1.csv", ns=(1, 1))   # size changed anyway
+    df, _, s = load_captures(pattern)
+    assert len(df) == 64 and s["tail"] == 1 and s["rows_added"] == 4
+    assert isinstance(df["src"].dtype, pd.CategoricalDtype)
+    clear_cache()
@@ -0,0 +1,62 @@
+# tests/test_downsample.py
+"""
+Downsampling for the dashboard charts: LTTB matches the reference algorithm,
+min/max keeps every bucket's extremes.
+Run: pytest -q
+"""
+import numpy as np
+import pandas as pd
+
+from dashboard.downsample import downsample_frame, lttb, minmax_indices, point_budget
+
+
+def _lttb_reference(x, y, n_out):
+    n = len(y)
+    every = (n - 2) / (n_out - 2)
+    out, a = [0], 0
+    for i in range(n_out - 2):
+        s, e = int(np.floor(i * every)) + 1, int(np.floor((i + 1) * every)) + 1
+        if i == n_out - 3:
+            cx, cy = x[-1], y[-1]
+        else:
+            ne = min(int(np.floor((i + 2) * every)) + 1, n)
+            cx, cy = x[e:ne].mean(), y[e:ne].mean()
+        area = [abs((x[a] - cx) * (y[j] - y[a]) - (x[a] - x[j]) * (cy - y[a])) for j in range(s, e)]
+        a = s + int(np.argmax(area))
+        out.append(a)
+    return np.array(out + [n - 1])
+
+
+def test_lttb_matches_reference():
+    rng = np.random.default_rng(0)
+    x = np.cumsum(rng.uniform(0.1, 1.0, 3001))
+    y = np.cumsum(rng.normal(size=3001))
+    for n_out in (10, 257, 1000):
+        got = lttb(x, y, n_out)
+        assert len(got) == n_out
+        np.testing.assert_array_equal(got, _lttb_reference(x, y, n_out))
+    np.testing.assert_array_equal(lttb(x[:50], y[:50], 100), np.arange(50))
+
+
+def test_minmax_keeps_bucket_extremes():
+    rng = np.random.default_rng(1)
+    y = rng.uniform(0, 60, 100_000)
+    spikes = rng.choice(100_000, 20, replace=False)
+    y[spikes] = 99.0
+    y[500] = np.nan
+    idx = minmax_indices(y, 1000)
+    assert len(idx) <= 1000 and np.all(np.diff(idx) > 0)
+    assert idx[0] == 0 and idx[-1] == len(y) - 1
+    assert np.nanmax(y[idx]) == 99.0 and np.nanmin(y[idx]) == np.nanmin(y)
+    # every bucket's max is kept: the spikes survive unless two share a bucket
+    assert len(np.intersect1d(idx, spikes)) >= 18
+
+
+def test_downsample_frame_with_datetime_axis():
+    n = 50_000
+    df = pd.DataFrame({"time": pd.date_range("2025-01-01", periods=n, freq="10ms"),
+                       "risk": np.sin(np.arange(n) / 300.0)})
+    out = downsample_frame(df, "time", "risk", point_budget(800))
+    assert len(out) == 800
+    assert out["time"].is_monotonic_increasing
+    assert downsample_frame(df.head(10), "time", "risk", 800) is not None
@@ -0,0 +1,66 @@
+# tests/test_evaluate.py
+"""
+Evaluation harness: binary feature cache + parallel sweep with timings.
+Run: pytest -q
+"""
+import json
+import os
+
+import numpy as np
+
+from models import evaluate
+
+
+def write_features(path, n=60, seed=0):
+    rng = np.random.default_rng(seed)
+    rows = []
+    for i in range(n):
+        covert = i % 2
+        rows.append({
+            "flow": "10.0.0.3_10.0.0.4_ICMP" if covert else "10.0.0.1_10.0.0.2_TCP",
+            "window_start": i, "window_end": i + 50,
+            "ipd_mean": float(rng.normal(0.1 if covert else 0.05, 0.01)),
+            "ipd_std": float(rng.normal(0.02, 0.005)),
+        })
+    with open(path, "w") as f:
+        json.dump(rows, f)
+
+
+def test_cache_roundtrip_and_invalidation(tmp_path):
+    path, cache = tmp_path / "features.json", str(tmp_path / "cache")
+    write_features(path)
+    X, y, cols = evaluate.load_feature_matrix(str(path), cache)
+    X2, y2, cols2 = evaluate.load_feature_matrix(str(path), cache)
+    assert np.array_equal(X, X2) and np.array_equal(y, y2) and cols == cols2 == ["ipd_mean", "ipd_std"]
+
+    write_features(path, n=80, seed=1)
+    X3, _, _ = evaluate.load_feature_matrix(str(path), cache)
+    assert len(X3) == 80 and len(os.listdir(cache)) == 1
+
+
+def test_cache_keys_do_not_collide(tmp_path):
+    cache = str(tmp_path / "cache")
+    a, b = tmp_path / "a" / "features.json", tmp_path / "b" / "features.json"
+    other = tmp_path / "a" / "features_20260118_222133.json"
+    for p, n in ((a, 60), (b, 70), (other, 50)):
+        p.parent.mkdir(exist_ok=True)
+        write_features(p, n=n)
+    for p in (a, b, other):
+        evaluate.load_feature_matrix(str(p), cache)
+    # same basename in two directories and a prefix-sharing stem: all kept
+    assert len(os.listdir(cache)) == 3
+    mtimes = {f: os.stat(os.path.join(cache, f)).st_mtime_ns for f in os.listdir(cache)}
+    assert len(evaluate.load_feature_matrix(str(a), cache)[0]) == 60
+    assert len(evaluate.load_feature_matrix(str(b), cache)[0]) == 70
+    assert {f: os.stat(os.path.join(cache, f)).st_mtime_ns for f in os.listdir(cache)} == mtimes
+
+
+def test_sweep_records_auc_and_timings(tmp_path):
+    path = tmp_path / "features.json"
+    write_features(path)
+    X, y, _ = evaluate.load_feature_matrix(str(path), None)
+    rows = evaluate.sweep(X, y, {"n_estimators": [5, 10]}, n_splits=3, n_jobs=2)
+    assert len(rows) == 2
+    for r in rows:
+        assert 0.5 <= r["mean_auc"] <= 1.0
+        assert r["fit_s"] > 0 and r["row_latency_us"] > 0
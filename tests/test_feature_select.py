@@ -0,0 +1,41 @@
+# tests/test_feature_select.py
+"""
+Feature groups: pruned models only compute the groups they need.
+Run: pytest -q
+"""
+import numpy as np
+
+from features.feature_utils import FEATURE_GROUPS, compute_features, groups_for
+from models.feature_select import measure_group_costs, search_subsets, pick
+
+
+def test_pruned_columns_skip_groups():
+    ipd = np.random.default_rng(0).exponential(0.05, 49)
+    assert groups_for(["ac_max", "ipd_iqr"]) == ["basic", "autocorr"]
+
+    feats = compute_features(ipd, groups_for(["ac_max"]))
+    assert set(feats) == set(FEATURE_GROUPS["autocorr"][1])
+
+    # adding groups later does not recompute the ones already present
+    feats["ac_max"] = -1.0
+    compute_features(ipd, ["autocorr", "fft"], feats)
+    assert feats["ac_max"] == -1.0 and "fft_dom_freq" in feats
+
+
+def test_search_picks_cheapest_within_tolerance():
+    rng = np.random.default_rng(1)
+    y = np.arange(120) % 2
+    columns = ["ipd_mean", "ac_max"]
+    # only ipd_mean (basic) separates the classes
+    X = np.column_stack([y + rng.normal(0, 0.1, 120), rng.normal(0, 1, 120)])
+    costs = {"basic": 10.0, "fft": 1.0, "autocorr": 1.0, "entropy": 1.0}
+
+    rows = search_subsets(X, y, columns, costs, tolerance=0.01, n_splits=3, n_jobs=1)
+    assert {tuple(r["groups"]) for r in rows} == {("basic",), ("autocorr",), ("basic", "autocorr")}
+    assert pick(rows)["groups"] == ["basic"]
+
+
+def test_group_costs_positive():
+    windows = [np.random.default_rng(i).exponential(0.05, 49) for i in range(5)]
+    costs = measure_group_costs(windows, repeats=1)
+    assert set(costs) == set(FEATURE_GROUPS) and all(c > 0 for c in costs.values())
@@ -0,0 +1,78 @@
+# tests/test_fusion.py
+"""
+Fusion: live (per-window) and offline (DataFrame) paths share one implementation.
+Run: pytest -q
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from fusion.risk_engine import fuse_risk, fuse_scores
+from models.iforest_calibration import fit_calibration, calibrated_risk
+
+
+def test_offline_and_live_fusion_agree():
+    keys = {"flow": ["f"] * 3, "window_start": [0, 25, 50], "window_end": [50, 75, 100]}
+    ml = pd.DataFrame({**keys, "ml_prob": [10.0, 55.0, 95.0]})
+    st = pd.DataFrame({**keys, "suspicion_score": [5.0, 40.0, 80.0],
+                       "ks_pvalue": 0.5, "ad_stat": 1.0, "js_divergence": 0.1})
+    ifr = pd.DataFrame({**keys, "iforest_risk": [20.0, 50.0, 90.0]})
+
+    fused = fuse_scores(ml, st, ifr)
+    for _, row in fused.iterrows():
+        assert fuse_risk(row.ml_prob, row.suspicion_score, row.iforest_risk) == row.final_risk
+    assert list(fused["decision"]) == ["Normal", "Suspicious", "Likely Covert"]
+
+
+def test_missing_component_is_renormalised():
+    assert fuse_risk(80.0, np.nan, 50.0) == pytest.approx((0.5 * 80 + 0.2 * 50) / 0.7)
+
+
+def test_iforest_calibration_is_batch_independent():
+    rng = np.random.default_rng(0)
+    calib = fit_calibration(rng.normal(-0.45, 0.05, 1000))
+    batch = rng.normal(-0.5, 0.1, 64)
+    one_by_one = np.array([calibrated_risk([s], calib)[0] for s in batch])
+    assert np.array_equal(calibrated_risk(batch, calib), one_by_one)
+    assert calibrated_risk([-2.0], calib)[0] == 100.0
+
+
+def _sorted_keys(rng, n):
+    ws = rng.integers(0, 20, n) * 25
+    df = pd.DataFrame({"flow": rng.choice(["a", "b", "c", "d"], n), "window_start": ws, "window_end": ws + 50})
+    return df.drop_duplicates().sort_values(["flow", "window_start"], ignore_index=True)
+
+
+def test_streaming_join_matches_hash_join():
+    from fusion.risk_engine import KEY_COLS, merge_join
+
+    rng = np.random.default_rng(0)
+    for _ in range(50):
+        a, b = _sorted_keys(rng, 60), _sorted_keys(rng, 60)
+        a["x"], b["y"] = np.arange(len(a)), np.arange(len(b))
+        ca, cb = rng.integers(1, 10, 2)
+        parts = list(merge_join([a[i:i + ca] for i in range(0, len(a), ca)],
+                                [b[i:i + cb] for i in range(0, len(b), cb)]))
+        got = pd.concat(parts, ignore_index=True)
+        assert got.equals(a.merge(b, on=KEY_COLS))
+
+
+def test_unsorted_stream_is_rejected():
+    from fusion.risk_engine import sorted_chunks
+
+    df = pd.DataFrame({"flow": ["b", "a"], "window_start": [0, 0], "window_end": [50, 50]})
+    with pytest.raises(ValueError, match="not sorted"):
+        list(sorted_chunks([df]))
+
+
+def test_vectorised_decisions_and_explanations():
+    from fusion.risk_engine import add_decisions, decision_label, explain
+
+    rng = np.random.default_rng(1)
+    df = pd.DataFrame(rng.uniform(0, 100, (500, 4)),
+                      columns=["ml_prob", "suspicion_score", "iforest_risk", "final_risk"])
+    df.iloc[::5, 1] = np.nan
+    df.iloc[::9, 3] = np.nan
+    out = add_decisions(df.copy())
+    assert list(out["decision"]) == [decision_label(s) for s in df["final_risk"]]
+    assert list(out["explanation"]) == [explain(r) for _, r in df.iterrows()]
@@ -0,0 +1,65 @@
+# tests/test_hot_reload.py
+"""
+Hot reload: staged models / thresholds are validated and swapped between packets.
+Run: pytest -q
+"""
+import json
+import os
+
+import pytest
+
+import live.realtime_detector as det
+from live.hot_reload import ReloadWatcher, load_thresholds, validate_columns
+from models.artifacts import load_artifact, save_artifact
+
+
+def test_validate_columns_rejects_unknown_features():
+    validate_columns(["ipd_mean", "fft_dom_freq"])
+    with pytest.raises(ValueError, match="not produced"):
+        validate_columns(["ipd_mean", "packet_size_mean"])
+
+
+def test_thresholds_config_is_validated(tmp_path):
+    path = tmp_path / "thr.json"
+    path.write_text(json.dumps({"risk_threshold": 55, "block_threshold": 80}))
+    assert load_thresholds(str(path)) == {"risk_threshold": 55.0, "block_threshold": 80.0}
+    path.write_text(json.dumps({"risk_threshold": 90, "block_threshold": 80}))
+    with pytest.raises(ValueError):
+        load_thresholds(str(path))
+
+
+def test_watcher_swaps_model_and_thresholds_between_packets(tmp_path, monkeypatch):
+    art = load_artifact("models/rf_detector.joblib", mmap_mode=None)
+    model_path = str(tmp_path / "rf.joblib")
+    thr_path = tmp_path / "thr.json"
+    save_artifact(art, model_path)
+    thr_path.write_text(json.dumps({"risk_threshold": 60, "block_threshold": 70}))
+
+    # the watcher swaps these module globals; restore them for later tests
+    for name in ("BACKEND", "RF_COLS", "RF_GROUPS", "RISK_THRESHOLD", "BLOCK_THRESHOLD", "CASCADE"):
+        monkeypatch.setattr(det, name, getattr(det, name))
+    monkeypatch.setattr(det, "MODEL_PATH", model_path)
+    monkeypatch.setattr(det, "model_bundle", None)
+    det.load_threshold_config(str(thr_path))
+    det.load_model()
+    old_backend = det.BACKEND
+    watcher = ReloadWatcher(model_path, det.prepare_model, str(thr_path))
+    monkeypatch.setattr(det, "WATCHER", watcher)
+
+    # a broken artifact is rejected, the running model stays
+    save_artifact({**art, "columns": ["bogus"]}, model_path)
+    watcher.check_once()
+    det.apply_reloads()
+    assert det.BACKEND is old_backend and watcher.reloads["rejected"] == 1
+
+    save_artifact(art, model_path)
+    thr_path.write_text(json.dumps({"risk_threshold": 75, "block_threshold": 90}))
+    os.utime(thr_path, ns=(1, 1))
+    watcher.check_once()
+    assert det.BACKEND is old_backend   # nothing swapped until the next packet
+    det.process_packet("a_b_UDP", "UDP", "a", 0)
+    assert det.BACKEND is not old_backend
+    assert (det.RISK_THRESHOLD, det.BLOCK_THRESHOLD) == (75.0, 90.0)
+    assert det.CASCADE["tier2"]["clear_below"] <= 75.0
+
+    det.buffers.clear()
@@ -0,0 +1,59 @@
+# tests/test_incidents.py
+"""
+Incident aggregation: one incident per flow, quiet-period close, rate-limited
+updates, bounded open set.
+Run: pytest -q
+"""
+from live.incidents import IncidentAggregator
+from storage.alert_store import AlertStore, BatchWriter
+
+
+def test_alerts_collapse_into_one_incident_per_flow():
+    events = []
+    agg = IncidentAggregator(events.append, quiet_s=5, update_s=2)
+    for i in range(100):          # one alert every 0.1 s for 10 s
+        agg.observe("a_b_TCP", "TCP", "a", 100.0 + i * 0.1, 60.0 + i % 10)
+    assert agg.counts["opened"] == 1
+    assert [e["state"] for e in events] == ["open"] + ["update"] * 4
+    assert events[-1]["windows"] == 81
+
+    agg.observe("c_d_UDP", "UDP", "c", 120.0, 90.0)   # 10 s after the last alert of a_b
+    closed = [e for e in events if e["state"] == "close"]
+    assert len(closed) == 1
+    assert closed[0]["windows"] == 100
+    assert closed[0]["peak_risk"] == 69.0
+    assert closed[0]["mean_risk"] == 64.5
+    assert closed[0]["first_ts"] == 100.0
+    assert list(agg.open) == ["c_d_UDP"]
+
+    agg.observe("a_b_TCP", "TCP", "a", 121.0, 70.0)   # back after the quiet period → new incident
+    assert agg.open["a_b_TCP"].id == 3
+
+
+def test_open_incidents_are_bounded():
+    events = []
+    agg = IncidentAggregator(events.append, quiet_s=1e9, max_open=10)
+    for i in range(50):
+        agg.observe(f"f{i}", "TCP", "x", float(i), 80.0)
+    assert len(agg.open) == 10
+    assert agg.counts["evicted"] == 40
+    assert list(agg.open) == [f"f{i}" for i in range(40, 50)]
+    agg.close_all()
+    assert not agg.open and agg.counts["closed"] == 50
+
+
+def test_incidents_are_upserted_in_the_store(tmp_path):
+    path = str(tmp_path / "ids.db")
+    writer = BatchWriter(path, flush_s=0.05)
+    agg = IncidentAggregator(writer.put_incident, quiet_s=5, update_s=1)
+    for i in range(30):
+        agg.observe("a_b_TCP", "TCP", "a", 100.0 + i, 75.0)
+    agg.close_all()
+    writer.close()
+
+    store = AlertStore(path, readonly=True)
+    df = store.query_incidents()
+    assert len(df) == 1
+    assert df.loc[0, "state"] == "close" and df.loc[0, "windows"] == 30
+    assert store.query_incidents(open_only=True).empty
+    store.close()
@@ -0,0 +1,56 @@
+# tests/test_pipeline.py
+"""
+Single-pass pipeline: same report as extractor → stat extractor → IF → risk engine.
+Run: pytest -q
+"""
+import glob
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from fusion.pipeline import KEY_COLS, run, window_views
+from fusion.risk_engine import fuse_scores, explain
+from features.stat_feature_extractor import extract_stat_features
+from models.backends import load_backend
+from models.iforest_detect import load_iforest, score_windows
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "features"))
+from feature_extractor import extract_window_features  # noqa: E402
+
+
+def test_window_views_match_slices():
+    ipd = np.arange(130, dtype=float)
+    starts, views = window_views(ipd, 50, 25)
+    assert list(starts) == [0, 25, 50, 75]
+    for s, w in zip(starts, views):
+        assert np.array_equal(w, ipd[s:s + 50])
+    assert len(window_views(ipd[:10], 50, 25)[0]) == 0
+
+
+def test_single_pass_matches_multi_step(tmp_path):
+    flows = sorted(glob.glob("preprocessed/flows/*.csv"))[:3]
+    baseline = pd.read_csv(flows[0])["ipd"].values
+    feats, stats = [], []
+    for f in flows:
+        df = pd.read_csv(f)
+        name = os.path.basename(f).replace(".csv", "")
+        feats += extract_window_features(df, 50, 25, name)
+        stats += extract_stat_features(df, 50, 25, name, baseline)
+    feats, stats = pd.DataFrame(feats), pd.DataFrame(stats)
+
+    backend = load_backend("models/rf_detector.joblib")
+    ml = feats[KEY_COLS].copy()
+    ml["ml_prob"] = backend.predict_proba(
+        feats.reindex(columns=backend.columns, fill_value=0.0).to_numpy(dtype=float)) * 100
+    model, columns, calibration = load_iforest("models/iforest_detector.joblib")
+    ifr = feats[KEY_COLS].copy()
+    ifr["iforest_risk"] = score_windows(feats, model, columns, calibration)
+    ref = fuse_scores(ml, stats[KEY_COLS + ["suspicion_score", "ks_pvalue", "ad_stat", "js_divergence"]], ifr)
+    ref["explanation"] = ref.apply(explain, axis=1)
+
+    got = run(flows, baseline_flows=[flows[0]], out=str(tmp_path / "report.csv"),
+              store_path=str(tmp_path / "ids.db"))
+    assert list(got.columns) == list(ref.columns)
+    pd.testing.assert_frame_equal(got, ref, check_exact=True, check_dtype=False)
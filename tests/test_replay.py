@@ -0,0 +1,77 @@
+# tests/test_replay.py
+"""
+Replay mode: a capture CSV drives the same pipeline as live sniffing.
+Run: pytest -q
+"""
+import pandas as pd
+import pytest
+
+import live.realtime_detector as det
+from live.replay import replay_file, parse_speed
+
+
+def write_capture(path, n=60):
+    rows = [(1765271845.0 + i * 0.05, "10.0.0.1", "10.0.0.2", 40000, 80, "TCP", 100) for i in range(n)]
+    pd.DataFrame(rows, columns=["ts", "src", "dst", "sport", "dport", "proto", "length"]).to_csv(path, index=False)
+
+
+def test_replay_csv_max_speed(tmp_path, monkeypatch):
+    cap = tmp_path / "capture.csv"
+    write_capture(cap)
+    monkeypatch.setattr(det, "block_ip", lambda ip: pytest.fail("replay must not block"))
+    # replay_file rewires these module globals; restore them afterwards
+    monkeypatch.setattr(det, "ALERT_LOG", det.ALERT_LOG)
+    monkeypatch.setattr(det, "AUTO_BLOCK", det.AUTO_BLOCK)
+
+    report, alerts = replay_file(str(cap), speed="max", alert_log=str(tmp_path / "alerts.csv"),
+                                 report_path=str(tmp_path / "report.json"))
+
+    assert report["packets"] == 60
+    assert report["windows_scored"] == 60 - det.WINDOW_SIZE + 1
+    assert report["capture_span_s"] == pytest.approx(59 * 0.05)
+    assert {"parse", "features", "model", "packet"} <= set(report["stages"])
+    assert (tmp_path / "report.json").exists()
+
+
+def test_parse_speed():
+    assert parse_speed("max") is None
+    assert parse_speed("10") == 10.0
+    with pytest.raises(ValueError):
+        parse_speed("-1")
+
+
+def run_detector_cli(tmp_path, *args):
+    import json
+    import subprocess
+    import sys
+
+    report = tmp_path / "report.json"
+    subprocess.run([sys.executable, "-m", "live.realtime_detector", "--replay",
+                    "capture/capture_20251209_145623.csv", "--speed", "max",
+                    "--report", str(report), *args], check=True, capture_output=True)
+    return json.loads(report.read_text())
+
+
+def test_detector_cli_replay_applies_settings(tmp_path):
+    # run as __main__, the detector must configure the module the replay uses
+    assert run_detector_cli(tmp_path, "--sample", "1000")["windows_scored"] == 0
+
+    strict = tmp_path / "thresholds.json"
+    strict.write_text('{"risk_threshold": 99.9, "block_threshold": 99.9}')
+    report = run_detector_cli(tmp_path, "--thresholds", str(strict))
+    assert report["windows_scored"] > 0
+    assert report["alerts"] == 0
+
+
+def test_old_alert_log_is_left_untouched(tmp_path):
+    old = tmp_path / "alerts.csv"
+    old.write_text("timestamp,flow,protocol,final_risk,ml_prob,stat_score,iforest_risk\n1.0,f,TCP,70,70,1,2\n")
+    before = old.read_text()
+    assert det.resolve_alert_log(str(old)) == str(tmp_path / "alerts_v2.csv")
+    assert old.read_text() == before
+
+    current = tmp_path / "current.csv"
+    current.write_text(",".join(det.ALERT_FIELDS) + "\n")
+    assert det.resolve_alert_log(str(current)) == str(current)
+    assert det.resolve_alert_log(str(tmp_path / "new.csv")) == str(tmp_path / "new.csv")
+    assert det.resolve_alert_log(None) is None
@@ -0,0 +1,75 @@
+# tests/test_rollups.py
+"""
+Traffic rollups: bincount bins match a pandas groupby, incremental feeding
+matches a single build, too-fine resolutions are dropped.
+Run: pytest -q
+"""
+import numpy as np
+import pandas as pd
+
+from dashboard.rollups import Rollups, flow_column, window_rollup
+
+
+def _packets(n, rng, t0=1_765_000_000.0, span=600.0):
+    return pd.DataFrame({
+        "ts": t0 + np.sort(rng.uniform(0, span, n)),
+        "src": pd.Categorical(rng.choice(["10.0.0.1", "10.0.0.3", "10.0.0.5"], n)),
+        "dst": pd.Categorical(rng.choice(["10.0.0.2", "10.0.0.4"], n)),
+        "proto": pd.Categorical(rng.choice(["TCP", "UDP", "ICMP"], n)),
+        "length": rng.integers(60, 1500, n),
+    })
+
+
+def _reference(df, res, start, end):
+    ref = df.assign(bin=np.floor(df["ts"] / res).astype(np.int64),
+                    flow=df["src"].astype(str) + "_" + df["dst"].astype(str) + "_" + df["proto"].astype(str))
+    lo, hi = int(np.floor(start / res)), int(np.floor(end / res)) + 1
+    ref = ref[(ref["bin"] >= lo) & (ref["bin"] < hi)]
+    return lo, ref.groupby(["bin", "flow"])["length"].agg(["sum", "size"])
+
+
+def _as_dict(lo, b, p, labels):
+    return {(lo + i, labels[j]): (b[i, j], p[i, j]) for i, j in zip(*np.nonzero(p))}
+
+
+def test_flow_column_matches_row_wise_labels():
+    df = _packets(2000, np.random.default_rng(0))
+    df.loc[5, "proto"] = np.nan
+    expected = [f"{s}_{d}_{'?' if pd.isna(p) else p}" for s, d, p in zip(df["src"], df["dst"], df["proto"])]
+    assert flow_column(df).astype(str).tolist() == expected
+
+
+def test_series_match_groupby_and_incremental_build():
+    rng = np.random.default_rng(1)
+    df = _packets(20_000, rng)
+    full = Rollups()
+    full.add(df["ts"], flow_column(df), df["length"])
+    inc = Rollups()
+    shuffled = df.sample(frac=1, random_state=0)
+    for i in range(0, len(df), 3000):      # any order, in pieces
+        chunk = shuffled.iloc[i:i + 3000]
+        inc.add(chunk["ts"], flow_column(chunk), chunk["length"])
+
+    start, end = df["ts"].iloc[0] + 17.3, df["ts"].iloc[0] + 412.9
+    for res in [0.1, 1.0, 10.0, 60.0]:
+        lo, ref = _reference(df, res, start, end)
+        ref = {k: (float(v["sum"]), int(v["size"])) for k, v in ref.iterrows()}
+        for r in (full, inc):
+            times, b, p = r.series(start, end, res)
+            assert times[0] == lo * res
+            assert _as_dict(lo, b, p, r.labels) == ref
+    assert full.pick(start, end, max_bins=500) == 1.0
+
+
+def test_too_fine_resolution_is_dropped_and_binned_from_the_window():
+    rng = np.random.default_rng(2)
+    df = _packets(5000, rng, span=36_000.0)
+    r = Rollups(max_cells=1_000_000)
+    r.add(df["ts"], flow_column(df), df["length"])
+    assert 0.01 in r.dropped and 0.1 in r.dropped and 1.0 not in r.dropped
+    assert r.series(df["ts"].iloc[0], df["ts"].iloc[-1], 0.1) is None
+
+    start, end = df["ts"].iloc[100], df["ts"].iloc[200]
+    times, b, p, labels = window_rollup(df["ts"], flow_column(df), df["length"], start, end, 0.1)
+    lo, ref = _reference(df[(df["ts"] >= start) & (df["ts"] <= end)], 0.1, start, end)
+    assert _as_dict(lo, b, p, labels) == {k: (float(v["sum"]), int(v["size"])) for k, v in ref.iterrows()}
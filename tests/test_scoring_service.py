@@ -0,0 +1,91 @@
+# tests/test_scoring_service.py
+"""
+Scoring service core: same scores as the offline pipeline, micro-batching.
+Run: pytest -q
+"""
+import glob
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from fusion.pipeline import process_flow, window_views
+from service.scoring import Scorer, MicroBatcher, result_rows, OUTPUTS
+
+
+@pytest.fixture(scope="module")
+def scorer():
+    return Scorer()
+
+
+@pytest.fixture(scope="module")
+def flow():
+    path = sorted(glob.glob("preprocessed/flows/*.csv"))[0]
+    return path, pd.read_csv(path, usecols=["ipd"])["ipd"].to_numpy()
+
+
+def test_ipd_windows_match_pipeline(scorer, flow):
+    path, ipd = flow
+    ref, detail = process_flow(path, scorer.assets)
+    _, views = window_views(ipd)
+    got = scorer.score([("ipds", w) for w in views])
+    assert got.shape == (len(ref), len(OUTPUTS))
+    for i, col in enumerate(OUTPUTS):
+        assert np.allclose(got[:, i], ref[col].to_numpy(), equal_nan=True), col
+
+    # precomputed feature rows: same RF / IF scores, no stat score
+    feats = [{c: detail[c].iloc[j] for c in scorer.feature_columns} for j in range(len(ref))]
+    rows = scorer.score([("features", f) for f in feats])
+    assert np.allclose(rows[:, 0], ref["ml_prob"].to_numpy())
+    assert np.allclose(rows[:, 2], ref["iforest_risk"].to_numpy())
+    assert np.isnan(rows[:, 1]).all()
+    out = result_rows(rows[:2])
+    assert out[0]["suspicion_score"] is None and out[0]["decision"]
+
+
+def test_short_sequence_rejected(scorer):
+    with pytest.raises(ValueError):
+        scorer.score([("ipds", [0.1, 0.2])])
+
+
+def test_micro_batcher_merges_and_splits():
+    calls = []
+
+    def score_fn(items):
+        calls.append(len(items))
+        if any(v < 0 for _, v in items):
+            raise ValueError("negative")
+        return np.array([[v, v, v, v] for _, v in items], dtype=float)
+
+    batcher = MicroBatcher(score_fn, max_batch=64, max_wait_ms=50, workers=2)
+    try:
+        futures = [None] * 8
+        start = threading.Barrier(8)
+
+        def submit(i):
+            start.wait()
+            futures[i] = batcher.submit([("x", float(i))] * (i + 1))
+
+        threads = [threading.Thread(target=submit, args=(i,)) for i in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        for i, fut in enumerate(futures):
+            res = fut.result(timeout=5)
+            assert res.shape == (i + 1, 4) and (res == i).all()
+        assert len(calls) < 8          # requests shared batches
+
+        bad = batcher.submit([("x", -1.0)])
+        good = batcher.submit([("x", 3.0)])
+        with pytest.raises(ValueError):
+            bad.result(timeout=5)
+        assert good.result(timeout=5)[0, 0] == 3.0
+
+        m = batcher.metrics()
+        assert m["requests"] == 9 and m["errors"] == 1
+        assert m["items"] == 36 + 1
+        assert m["latency"]["request"]["count"] == 9
+    finally:
+        batcher.close()
@@ -0,0 +1,90 @@
+# tests/test_sender_simulator.py
+"""
+Vectorised traffic generator: per-flow streams, encodings, chunked output.
+Run: pytest -q
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from sender.sender_simulator import (
+    build_flows, generate_chunks, write_chunks, parse_mix, flow_addresses,
+    COLUMNS, SHORT, LONG, SEND_S, SLOT, LEVELS,
+)
+
+T0 = 1_700_000_000.0
+
+
+def collect(flows, **kw):
+    chunks = list(generate_chunks(flows, T0, **kw))
+    return tuple(np.concatenate(c) for c in zip(*chunks)), len(chunks)
+
+
+def test_chunks_time_ordered_and_complete():
+    flows = build_flows(parse_mix("exp=20,pareto=10,onoff=10,binary=2,slots=2"), T0, seed=3, rate=200)
+    (ts, flow, length), n_chunks = collect(flows, chunk_s=0.5, duration=5)
+    assert n_chunks == 10
+    assert (np.diff(ts) >= 0).all() and ts[0] > T0 and ts[-1] < T0 + 5
+    counts = np.bincount(flow, minlength=len(flows))
+    # normal flows near their mean rate (200/s for 5 s)
+    assert 600 < counts[:40].mean() < 1400
+    # per-flow sequence continues across chunk boundaries
+    for i in (0, 25, 41):
+        assert (np.diff(ts[flow == i]) > 0).all()
+    assert ((length >= 60) & (length <= 1500)).all()
+
+
+def test_flow_streams_independent_of_mix():
+    a = build_flows(parse_mix("exp=1,binary=1"), T0, seed=7, rate=100)
+    b = build_flows(parse_mix("exp=1,binary=1,pareto=50"), T0, seed=7, rate=100)
+    (ta, fa, _), _ = collect(a, duration=3)
+    (tb, fb, _), _ = collect(b, duration=3, chunk_s=0.25)
+    for i in (0, 1):
+        assert np.array_equal(ta[fa == i], tb[fb == i])
+
+
+def test_covert_encodings_carry_bits():
+    bits = "1011001"
+    mix = parse_mix("binary,multilevel,slots")
+    flows = build_flows(mix, T0, seed=1, bits=bits, covert_pkts=len(bits) * 3)
+    (ts, flow, _), _ = collect(flows)
+    b = np.array([int(c) for c in bits])
+
+    ipd = np.diff(np.r_[T0, ts[flow == 0]])[:len(bits)]
+    assert np.array_equal(ipd > (SHORT + LONG) / 2 + SEND_S, b.astype(bool))
+
+    # 2 bits per packet, 4 levels ("10 11 00 1|0"; the 4th is followed by the repeat gap)
+    ipd = np.diff(np.r_[T0, ts[flow == 1]])[:4]
+    sym = np.abs(ipd[:3, None] - SEND_S - LEVELS).argmin(axis=1)
+    assert list(sym) == [2, 3, 0]
+    assert ipd[3] > SEND_S + LEVELS[2] + 0.2
+
+    # slots: slots between consecutive '1' bits (positions 0, 2, 3, 6, then wrap)
+    ipd = np.diff(np.r_[T0, ts[flow == 2]])[:4]
+    assert list(np.round(ipd / SLOT)) == [2, 1, 3, 1]
+    assert all(f.done for f in flows)
+
+
+def test_default_pair_and_csv_output(tmp_path):
+    flows = build_flows([("exp", 1), ("binary", 1)], T0, seed=0, normal_pkts=300, covert_pkts=70)
+    assert (flows[0].src, flows[0].dst) == ("10.0.0.1", "10.0.0.2")
+    assert (flows[1].src, flows[1].dst, flows[1].proto) == ("10.0.0.3", "10.0.0.4", "ICMP")
+    assert flow_addresses(251, covert=False) == ("10.1.1.2", "10.0.0.2")
+
+    out = tmp_path / "packets.csv"
+    total = write_chunks(generate_chunks(flows, T0, chunk_s=2.0), flows, str(out))
+    df = pd.read_csv(out)
+    assert total == len(df) == 370
+    assert list(df.columns) == COLUMNS
+    assert df["ts"].is_monotonic_increasing
+    assert (df["src"] == "10.0.0.1").sum() == 300
+    assert (df.loc[df["proto"] == "ICMP", "length"] == 64).all()
+
+
+def test_invalid_inputs():
+    with pytest.raises(ValueError):
+        parse_mix("exp=2,morse=1")
+    with pytest.raises(ValueError):
+        build_flows(parse_mix("binary"), T0, bits="10x")
+    with pytest.raises(ValueError):
+        next(generate_chunks(build_flows(parse_mix("exp"), T0), T0))
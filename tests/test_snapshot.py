@@ -0,0 +1,78 @@
+# tests/test_snapshot.py
+"""
+Flow-table snapshots: exact restore of the ring buffers, idle flows dropped.
+Run: pytest -q
+"""
+import os
+
+import numpy as np
+
+from live.flow_state import FlowState, NS_PER_S
+from live.snapshot import SnapshotWriter, evict_idle, load_snapshot, save_snapshot
+
+
+def _table(n_flows, window, rng):
+    buffers = {}
+    for i in range(n_flows):
+        state = FlowState(window)
+        t = 1_700_000_000 * NS_PER_S + i * NS_PER_S
+        for _ in range(rng.integers(1, 2 * window)):
+            t += int(rng.integers(1_000, 50_000_000))
+            state.push(t)
+        state.last_risk = None if i % 3 == 0 else float(i)
+        buffers[f"10.0.0.{i}_10.0.0.254_UDP"] = state
+    return buffers
+
+
+def test_restore_is_exact_and_drops_idle_flows(tmp_path):
+    rng = np.random.default_rng(0)
+    buffers = _table(50, 40, rng)
+    path = str(tmp_path / "flows.npz")
+    stats = save_snapshot(buffers, 40, path)
+    assert stats["flows"] == 50 and not os.path.exists(path + ".tmp")
+
+    newest = max(s.last_seen_ns for s in buffers.values())
+    restored, info = load_snapshot(path, 40, idle_timeout_s=1e9, now_ns=newest)
+    assert info["flows"] == 50
+    for flow, s in buffers.items():
+        r = restored[flow]
+        assert list(r.times) == list(s.times) and list(r.ipds) == list(s.ipds)
+        assert (r.ipd_sum, r.ipd_sumsq, r.last_seen_ns, r.last_risk) == \
+               (s.ipd_sum, s.ipd_sumsq, s.last_seen_ns, s.last_risk)
+        assert r.ready() == s.ready()
+
+    # flows idle for more than 10 s at `newest` are dropped
+    restored, info = load_snapshot(path, 40, idle_timeout_s=10, now_ns=newest)
+    expected = {f for f, s in buffers.items() if newest - s.last_seen_ns <= 10 * NS_PER_S}
+    assert set(restored) == expected and info["expired"] == 50 - len(expected)
+
+
+def test_writer_final_snapshot(tmp_path):
+    import threading
+
+    buffers = _table(5, 10, np.random.default_rng(1))
+    path = str(tmp_path / "flows.npz")
+    writer = SnapshotWriter(buffers, threading.Lock(), 10, path, interval=3600).start()
+    last = writer.stop()
+    assert last["flows"] == 5 and os.path.exists(path)
+
+
+def test_live_capture_evicts_idle_flows(monkeypatch):
+    import live.realtime_detector as det
+
+    monkeypatch.setattr(det, "buffers", det.defaultdict(lambda: FlowState(det.WINDOW_SIZE)))
+    monkeypatch.setattr(det, "IDLE_TIMEOUT", 10.0)
+    monkeypatch.setattr(det, "next_sweep_ns", 0)
+    monkeypatch.setattr(det, "evicted_flows", 0)
+    t0 = 1_700_000_000 * NS_PER_S
+    for i in range(100):                       # one-packet flows, never scored
+        det.process_packet(f"10.0.{i}.1_10.0.0.2_UDP", "UDP", f"10.0.{i}.1", t0 + i * NS_PER_S // 10)
+    assert len(det.buffers) == 100
+
+    # 20 s later: only the flow that is still sending remains
+    det.process_packet("10.0.0.9_10.0.0.2_UDP", "UDP", "10.0.0.9", t0 + 30 * NS_PER_S)
+    assert list(det.buffers) == ["10.0.0.9_10.0.0.2_UDP"] and det.evicted_flows == 100
+
+    buffers = _table(5, 10, np.random.default_rng(2))
+    newest = max(s.last_seen_ns for s in buffers.values())
+    assert evict_idle(buffers, newest, idle_timeout_s=1e9) == 0 and len(buffers) == 5
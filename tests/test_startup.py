@@ -0,0 +1,34 @@
+# tests/test_startup.py
+"""
+Startup: importing the detector defers heavy imports and model loading.
+Run: pytest -q
+"""
+import os
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def test_detector_import_is_lazy():
+    code = (
+        "import sys, live.realtime_detector as d\n"
+        "heavy = [m for m in ('scapy.all', 'scapy.sendrecv', 'pandas', 'scipy.stats', 'sklearn') if m in sys.modules]\n"
+        "print(heavy, d.model_bundle is None)"
+    )
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "[] True"
+
+
+def test_detector_loads_memory_mapped_model(tmp_path):
+    out = str(tmp_path / "rf.mmap")
+    code = (
+        "import numpy as np, live.realtime_detector as d\n"
+        "from models.artifacts import export_mmap\n"
+        f"d.MODEL_PATH = export_mmap('models/rf_detector.joblib', {out!r})\n"
+        "d.load_model()\n"
+        "print(isinstance(d.BACKEND.compiled['threshold'], np.memmap), d.BACKEND.name == 'compiled', "
+        "d.BACKEND.model is None)"
+    )
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "True True True"
@@ -0,0 +1,48 @@
+# tests/test_train_streaming.py
+"""
+Out-of-core training: reservoir sampling + unchanged artifact format.
+Run: pytest -q
+"""
+import json
+
+import joblib
+import numpy as np
+
+from models.train_model import StratifiedReservoir, train_streaming
+
+
+def test_reservoir_is_uniform_and_stratified():
+    counts = np.zeros(1000)
+    for seed in range(200):
+        res = StratifiedReservoir(50, 1, seed=seed)
+        for start in range(0, 1000, 130):      # uneven chunks
+            idx = np.arange(start, min(start + 130, 1000))
+            res.add(idx[:, None].astype(float), (idx >= 900).astype(int))
+        X, y = res.sample()
+        assert (y == 1).sum() == 50 and (y == 0).sum() == 50
+        counts[X[y == 0, 0].astype(int)] += 1
+    # early and late class-0 windows are kept equally often
+    assert 0.45 < counts[:450].sum() / counts[:900].sum() < 0.55
+
+
+def test_streamed_artifact_matches_format(tmp_path):
+    rng = np.random.default_rng(1)
+    path = tmp_path / "features.jsonl"
+    with open(path, "w") as f:
+        for i in range(600):
+            covert = i % 3 == 0
+            f.write(json.dumps({
+                "flow": "10.0.0.3_10.0.0.4_ICMP" if covert else "10.0.0.1_10.0.0.2_TCP",
+                "window_start": i, "window_end": i + 50,
+                "ipd_mean": float(rng.normal(0.1 if covert else 0.05, 0.01)),
+                "ipd_std": float(rng.normal(0.02, 0.005)),
+            }) + "\n")
+
+    for model in ("rf", "hgb", "sgd"):
+        out = tmp_path / f"{model}.joblib"
+        train_streaming(str(path), str(out), model=model, chunk_size=64, reservoir=200)
+        art = joblib.load(out)
+        assert {"model", "scaler", "columns"} <= set(art)
+        assert art["columns"] == ["ipd_mean", "ipd_std"]
+        assert np.isclose(art["scaler"].n_samples_seen_, 600)
+        assert ("compiled" in art) == (model == "rf")
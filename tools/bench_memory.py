@@ -0,0 +1,107 @@
+# tools/bench_memory.py
+"""
+Per-worker memory of N processes holding the detector models.
+
+Starts --workers fresh interpreters that load the RF + Isolation Forest
+either with joblib (every process unpickles its own trees) or from the
+.mmap exports (models/artifacts.py: one page-cache copy shared by all),
+then reads RSS / PSS of each from /proc/<pid>/smaps_rollup while they are
+all alive. PSS splits shared pages among the processes, so
+sum(PSS) ≈ total physical memory of the pool → use it to size the
+worker count. Linux only.
+
+Usage:
+    python models/artifacts.py export models/rf_detector.joblib models/iforest_detector.joblib
+    python tools/bench_memory.py --workers 4 --out results/memory.json
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+
+# ---------------------------------------------------------
+# Ensure project root is on PYTHONPATH
+# ---------------------------------------------------------
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(THIS_DIR, ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from live.perf import memory_usage
+
+PY = sys.executable
+MODELS = ["models/rf_detector.joblib", "models/iforest_detector.joblib"]
+
+# Loads the models, touches every array page (as scoring would), then idles
+WORKER = """
+import sys, numpy as np
+from models.artifacts import load_artifact, load_mmap_artifact, mmap_path
+mode, paths = sys.argv[1], sys.argv[2:]
+keep = []
+for p in paths:
+    if mode == "mmap":
+        art = load_mmap_artifact(mmap_path(p), verify=False)
+        for a in art["compiled"].values():
+            if isinstance(a, np.ndarray):
+                a.sum()
+    else:
+        art = load_artifact(p, mmap_mode=None)
+    keep.append(art)
+print("ready", flush=True)
+sys.stdin.read()
+"""
+
+# ---------------------------------------------------------
+def measure(mode, n_workers, models=MODELS):
+    procs = [
+        subprocess.Popen([PY, "-c", WORKER, mode] + models, cwd=PROJECT_ROOT,
+                         stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        for _ in range(n_workers)
+    ]
+    try:
+        for p in procs:
+            if p.stdout.readline().strip() != b"ready":
+                raise RuntimeError(f"{mode} worker failed to load the models")
+        time.sleep(0.2)
+        per_worker = [memory_usage(p.pid) for p in procs]
+    finally:
+        for p in procs:
+            p.stdin.close()
+            p.wait()
+
+    if any(m is None or "pss_kb" not in m for m in per_worker):
+        raise RuntimeError("needs /proc/<pid>/smaps_rollup (Linux)")
+    return {
+        "mode": mode,
+        "workers": n_workers,
+        "per_worker": per_worker,
+        "rss_mb": sum(m["rss_kb"] for m in per_worker) / 1024,
+        "pss_mb": sum(m["pss_kb"] for m in per_worker) / 1024,
+        "pss_mb_per_worker": sum(m["pss_kb"] for m in per_worker) / 1024 / n_workers,
+    }
+
+def run(n_workers, modes=("joblib", "mmap")):
+    results = []
+    for mode in modes:
+        r = measure(mode, n_workers)
+        results.append(r)
+        print(f"{mode:7s} {n_workers} workers: total PSS {r['pss_mb']:7.1f} MB "
+              f"({r['pss_mb_per_worker']:.1f} MB / worker), total RSS {r['rss_mb']:7.1f} MB")
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-process memory of N model workers (joblib vs mmap)")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--modes", nargs="+", choices=["joblib", "mmap"], default=["joblib", "mmap"])
+    parser.add_argument("--out", help="write results as JSON")
+    args = parser.parse_args()
+
+    results = run(args.workers, args.modes)
+    if args.out:
+        os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"[+] Saved → {args.out}")
@@ -0,0 +1,95 @@
+# tools/bench_startup.py
+"""
+Startup-time benchmark for every entry point.
+
+Each entry point is launched as a fresh interpreter (like run_all.py and
+tools/sweep_jitter.py do) with --help, so the time measured is imports +
+argument parsing. The detector is also measured up to "ready" (model and
+fusion assets loaded).
+
+Usage:
+    python tools/bench_startup.py --repeat 5 --out results/startup.json
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+
+# ---------------------------------------------------------
+# Ensure project root is on PYTHONPATH
+# ---------------------------------------------------------
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(THIS_DIR, ".."))
+
+PY = sys.executable
+
+ENTRY_POINTS = [
+    ("realtime_detector --help", ["-m", "live.realtime_detector", "--help"]),
+    ("realtime_detector ready", ["-c", "import live.realtime_detector as d; d.load_model(); d.load_fusion_assets()"]),
+    ("live_logger", ["live/live_logger.py", "--help"]),
+    ("live_capture", ["live/live_capture.py", "--help"]),
+    ("replay", ["-m", "live.replay", "--help"]),
+    ("cascade", ["-m", "live.cascade", "--help"]),
+    ("capture_live", ["capture/capture_live.py", "--help"]),
+    ("feature_extractor", ["features/feature_extractor.py", "--help"]),
+    ("make_noisy_flow", ["tools/make_noisy_flow.py", "--help"]),
+    ("train_model", ["models/train_model.py", "--help"]),
+    # plain sys.argv wrapper without --help: time its imports
+    ("eval_cv_save import", ["-c", "import models.eval_cv_save"]),
+    ("iforest_detect", ["models/iforest_detect.py", "--help"]),
+    ("compiled_forest", ["models/compiled_forest.py", "--help"]),
+    ("fusion profiles", ["fusion/profiles.py", "--help"]),
+    ("risk_engine", ["fusion/risk_engine.py", "--help"]),
+    ("fusion pipeline", ["fusion/pipeline.py", "--help"]),
+    ("alert_store", ["storage/alert_store.py", "--help"]),
+    ("scoring service", ["-m", "service.api", "--help"]),
+    ("load_test", ["tools/load_test.py", "--help"]),
+    ("sender_simulator", ["sender/sender_simulator.py", "--help"]),
+]
+
+# ---------------------------------------------------------
+def time_entry(argv, repeat):
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        proc = subprocess.run([PY] + argv, cwd=PROJECT_ROOT, capture_output=True)
+        samples.append(time.perf_counter() - t0)
+        if proc.returncode != 0:
+            err = proc.stderr.decode("utf-8", errors="ignore").strip().splitlines()
+            return {"error": err[-1] if err else f"exit {proc.returncode}"}
+    return {
+        "min_ms": min(samples) * 1e3,
+        "median_ms": statistics.median(samples) * 1e3,
+        "max_ms": max(samples) * 1e3,
+    }
+
+def run(repeat=5, only=None):
+    results = {}
+    for name, argv in ENTRY_POINTS:
+        if only and only not in name:
+            continue
+        res = time_entry(argv, repeat)
+        results[name] = res
+        if "error" in res:
+            print(f"{name:<26} FAILED  {res['error']}")
+        else:
+            print(f"{name:<26} min {res['min_ms']:8.1f} ms   median {res['median_ms']:8.1f} ms")
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure start-up time of every entry point")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", help="only entry points whose name contains this")
+    parser.add_argument("--out", help="write results as JSON")
+    args = parser.parse_args()
+
+    results = run(args.repeat, args.only)
+    if args.out:
+        os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+        with open(args.out, "w") as f:
+            json.dump({"python": sys.version.split()[0], "repeat": args.repeat, "results": results}, f, indent=2)
+        print(f"[+] Saved → {args.out}")
@@ -0,0 +1,109 @@
+# tools/load_test.py
+"""
+Load test for the scoring service (service/api.py).
+
+N client threads send batches of synthetic IPD windows (exponential, i.e.
+normal-looking timing) as fast as the service answers, for a fixed
+duration. Reports requests/s, windows/s and client-side latency
+percentiles, plus the service's own /metrics (mean micro-batch size).
+
+Usage:
+    python -m service.api --port 8000 &
+    python tools/load_test.py --url http://127.0.0.1:8000 --clients 16 --batch 32 --duration 20
+    python tools/load_test.py --binary --clients 16 --batch 32
+"""
+
+import io
+import json
+import time
+import argparse
+import threading
+import urllib.request
+
+import numpy as np
+
+WINDOW = 50
+
+# ---------------------------------------------------------
+def make_payload(rng, batch, window, binary):
+    ipds = rng.exponential(0.05, size=(batch, window))
+    if binary:
+        buf = io.BytesIO()
+        np.save(buf, ipds)
+        return buf.getvalue(), {"Content-Type": "application/x-npy", "Accept": "application/x-npy"}
+    return json.dumps({"ipds": ipds.tolist()}).encode(), {"Content-Type": "application/json"}
+
+def client(url, args, seed, deadline, latencies, errors):
+    rng = np.random.default_rng(seed)
+    path = "/score/npy?kind=ipds" if args.binary else "/score"
+    # a few distinct payloads so the service does not see one body over and over
+    payloads = [make_payload(rng, args.batch, args.window, args.binary) for _ in range(8)]
+    i = 0
+    while time.perf_counter() < deadline:
+        body, headers = payloads[i % len(payloads)]
+        i += 1
+        t0 = time.perf_counter()
+        try:
+            with urllib.request.urlopen(urllib.request.Request(url + path, body, headers), timeout=30) as r:
+                r.read()
+        except OSError:
+            errors.append(1)
+            continue
+        latencies.append(time.perf_counter() - t0)
+
+def get_json(url):
+    with urllib.request.urlopen(url, timeout=10) as r:
+        return json.loads(r.read())
+
+def main():
+    parser = argparse.ArgumentParser(description="Requests/s of the scoring service")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--clients", type=int, default=8, help="concurrent client threads")
+    parser.add_argument("--batch", type=int, default=16, help="windows per request")
+    parser.add_argument("--window", type=int, default=WINDOW, help="IPDs per window")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds")
+    parser.add_argument("--binary", action="store_true", help="send .npy bodies instead of JSON")
+    parser.add_argument("--out", help="write the results as JSON")
+    args = parser.parse_args()
+
+    url = args.url.rstrip("/")
+    get_json(url + "/health")
+    before = get_json(url + "/metrics")
+
+    latencies, errors = [], []
+    deadline = time.perf_counter() + args.duration
+    threads = [threading.Thread(target=client, args=(url, args, seed, deadline, latencies, errors))
+               for seed in range(args.clients)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t0
+    after = get_json(url + "/metrics")
+
+    lat = np.array(latencies) * 1e3
+    batches = after["batches"] - before["batches"]
+    result = {
+        "clients": args.clients,
+        "batch": args.batch,
+        "binary": args.binary,
+        "requests": len(latencies),
+        "errors": len(errors),
+        "requests_per_s": len(latencies) / elapsed,
+        "windows_per_s": len(latencies) * args.batch / elapsed,
+        "p50_ms": float(np.percentile(lat, 50)) if len(lat) else None,
+        "p99_ms": float(np.percentile(lat, 99)) if len(lat) else None,
+        "mean_micro_batch": (after["items"] - before["items"]) / batches if batches else 0.0,
+    }
+    print(f"[+] {result['requests']} requests in {elapsed:.1f}s ({result['errors']} errors)")
+    print(f"    {result['requests_per_s']:.1f} req/s, {result['windows_per_s']:.0f} windows/s")
+    if len(lat):
+        print(f"    latency p50 {result['p50_ms']:.1f} ms, p99 {result['p99_ms']:.1f} ms")
+    print(f"    mean micro-batch {result['mean_micro_batch']:.1f} windows")
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(result, f, indent=2)
+
+if __name__ == "__main__":
+    main()